@@ -7,16 +7,19 @@ Supports both Firebase Functions deployment and local development.
 import json
 import asyncio
 import os
+import threading
 from functools import partial
 from urllib.parse import parse_qs, urlparse
 
 import firebase_functions
-from firebase_functions import https_fn
+from firebase_functions import https_fn, scheduler_fn
 from firebase_admin import initialize_app
 
 # Import our FastAPI app
 from src.coworkly_partner_api.app import app
 from src.coworkly_partner_api.utils.config import settings
+from src.coworkly_partner_api.jobs.precompute_dashboard_metrics import run_precompute
+from src.coworkly_partner_api.jobs.rollup_post_counters import run_rollup
 
 # Initialize Firebase Admin SDK only if not already initialized
 try:
@@ -25,6 +28,12 @@ except ValueError:
     # App already initialized, continue
     pass
 
+# Run every request on one long-lived event loop, so pooled upstream
+# connections (e.g. to Amplitude) are reused on warm instances instead of
+# being torn down with a per-request loop.
+_event_loop = asyncio.new_event_loop()
+threading.Thread(target=_event_loop.run_forever, name="asgi-event-loop", daemon=True).start()
+
 @https_fn.on_request()
 def coworkly_partner_api(req: https_fn.Request) -> https_fn.Response:
     """Firebase Function entry point for the CoWorkly Partner Dashboard API"""
@@ -84,7 +93,7 @@ def coworkly_partner_api(req: https_fn.Request) -> https_fn.Response:
         print(f"ASGI scope created: {scope}")
         
         # Process the request
-        response = asyncio.run(handle_request(scope, req))
+        response = asyncio.run_coroutine_threadsafe(handle_request(scope, req), _event_loop).result()
         print(f"Response status: {response.status}")
         print(f"Response headers: {response.headers}")
         return response
@@ -110,6 +119,18 @@ def coworkly_partner_api(req: https_fn.Request) -> https_fn.Response:
             })
         )
 
+@scheduler_fn.on_schedule(schedule="every 60 minutes")
+def precompute_dashboard_metrics(event: scheduler_fn.ScheduledEvent) -> None:
+    """Scheduled Firebase Function that materializes partner dashboard metrics"""
+    summary = asyncio.run_coroutine_threadsafe(run_precompute(), _event_loop).result()
+    print(f"Dashboard metrics precomputed: {summary}")
+
+@scheduler_fn.on_schedule(schedule="every 5 minutes")
+def rollup_post_counters(event: scheduler_fn.ScheduledEvent) -> None:
+    """Scheduled Firebase Function that writes sharded like and comment counts into posts"""
+    summary = asyncio.run_coroutine_threadsafe(run_rollup(), _event_loop).result()
+    print(f"Post counters rolled up: {summary}")
+
 async def handle_request(scope, req):
     """Handle the ASGI request and return a Firebase Function response"""
     
@@ -1,23 +1,151 @@
 """Dashboard metrics API routes."""
 
-from typing import Optional, List
-from datetime import datetime
-from fastapi import APIRouter, HTTPException, Depends, Query
+import asyncio
+import math
+import logging
+from typing import Optional, List, Literal, Dict, Any, Set, Tuple
+from datetime import datetime, timezone
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
 
-from ..models.dashboard_metrics import DashboardMetrics
-from ..services.auth import verify_firebase_token
-from ..services.firestore import get_firestore_client, doc_to_dict
-from ..services.amplitude_service import get_amplitude_service
+from ..models.dashboard_metrics import DashboardMetrics, DashboardMetricsSeries
+from ..models.partner_profile import PartnerContext
+from ..services.auth import get_partner_context
+from ..services.firestore import get_async_firestore_client
+from ..services.amplitude_service import get_amplitude_service, AmplitudeError, AmplitudeUnavailableError
+from ..services.metrics_snapshots import match_standard_window, read_snapshot
+from ..services.metrics_cache import CachedMetrics, get_dashboard_metrics_cache, dashboard_cache_key
+from ..utils.responses import ModelJSONResponse
 
 router = APIRouter(prefix="/dashboard-metrics", tags=["dashboard-metrics"])
 
+# Running background refreshes; the loop only keeps weak references to tasks
+_refresh_tasks: Set[asyncio.Task] = set()
+
+
+def _set_data_age_headers(response: Response, cached: CachedMetrics, cache_status: str):
+    """Expose how old the served metrics are."""
+    response.headers["Age"] = str(int(cached.age_seconds()))
+    response.headers["X-Data-Computed-At"] = cached.computed_at.isoformat()
+    response.headers["X-Cache"] = cache_status
+
+
+async def _compute_dashboard_metrics(
+    partner: PartnerContext,
+    space_ids: Optional[List[str]],
+    start_date: Optional[datetime],
+    end_date: Optional[datetime],
+    granularity: Optional[str],
+    fresh_snapshot_only: bool = False
+) -> Tuple[Dict[str, Any], datetime]:
+    """Compute a dashboard response, returning it with when it was computed.
+    
+    A refresh passes ``fresh_snapshot_only``, since a snapshot that is not
+    fresh would leave the refreshed response stale.
+    """
+    # Serve the precomputed snapshot of the partner's own spaces when the
+    # request matches a standard window and the spaces have not changed
+    window = match_standard_window(start_date, end_date)
+    if window is not None and granularity is None and space_ids is None:
+        snapshot = await read_snapshot(get_async_firestore_client(), partner.uid, window, partner.spaceIds)
+        if snapshot is not None:
+            # The snapshot is cached and served like a computed response, so
+            # it is held to the same stale tolerance
+            served = CachedMetrics(snapshot["metrics"], snapshot["computed_at"])
+            if served.is_fresh() if fresh_snapshot_only else served.is_servable():
+                return DashboardMetrics(**snapshot["metrics"]).model_dump(), snapshot["computed_at"]
+    
+    # Handle space_ids parameter
+    if space_ids is None:
+        # Fallback to the space IDs of the partner's profile
+        if not partner.spaceIds:
+            raise HTTPException(
+                status_code=400, 
+                detail="Partner space IDs not found in user profile"
+            )
+        
+        space_ids = partner.spaceIds
+    else:
+        # Validate that space_ids is a list
+        if not isinstance(space_ids, list) or len(space_ids) == 0:
+            raise HTTPException(
+                status_code=400,
+                detail="space_ids must be a non-empty list"
+            )
+    
+    # Get Amplitude service and fetch metrics
+    amplitude_service = get_amplitude_service()
+    computed_at = datetime.now(timezone.utc)
+    
+    if granularity:
+        series_data = await amplitude_service.get_dashboard_timeseries(
+            space_ids, 
+            start_date=start_date, 
+            end_date=end_date,
+            granularity=granularity
+        )
+        series_model = DashboardMetricsSeries(**series_data)
+        return series_model.model_dump(), computed_at
+    
+    metrics_data = await amplitude_service.get_dashboard_metrics(
+        space_ids, 
+        start_date=start_date, 
+        end_date=end_date
+    )
+    
+    # Convert to Pydantic model for consistent response
+    metrics_model = DashboardMetrics(**metrics_data)
+    return metrics_model.model_dump(), computed_at
+
+
+async def _refresh_dashboard_metrics(
+    cache_key: Tuple,
+    partner: PartnerContext,
+    space_ids: Optional[List[str]],
+    start_date: Optional[datetime],
+    end_date: Optional[datetime],
+    granularity: Optional[str]
+):
+    """Recompute a stale cached response; on failure the stale one is kept."""
+    cache = get_dashboard_metrics_cache()
+    try:
+        data, computed_at = await _compute_dashboard_metrics(
+            partner, 
+            space_ids, 
+            start_date, 
+            end_date, 
+            granularity,
+            fresh_snapshot_only=True
+        )
+        cache.set(cache_key, data, computed_at)
+    except Exception as e:
+        logging.warning(f"Dashboard metrics refresh failed for {partner.uid}: {str(e)}")
+    finally:
+        cache.end_refresh(cache_key)
+
+
+def _schedule_refresh(*args):
+    """Run ``_refresh_dashboard_metrics`` detached from the request.
+    
+    Background tasks would run inside the ASGI call, and the Firebase
+    adapter only responds once that call returns, so the refresh runs as a
+    task on the long-lived event loop instead.
+    """
+    task = asyncio.get_running_loop().create_task(_refresh_dashboard_metrics(*args))
+    _refresh_tasks.add(task)
+    task.add_done_callback(_refresh_tasks.discard)
+    return task
+
 
 @router.get("/")
 async def get_dashboard_metrics(
-    uid: str = Depends(verify_firebase_token),
+    partner: PartnerContext = Depends(get_partner_context),
     space_ids: Optional[List[str]] = Query(None, description="Comma-separated list of space IDs to query"),
     start_date: Optional[str] = Query(None, description="Start date in YYYY-MM-DD format"),
-    end_date: Optional[str] = Query(None, description="End date in YYYY-MM-DD format")
+    end_date: Optional[str] = Query(None, description="End date in YYYY-MM-DD format"),
+    granularity: Optional[Literal["day", "week", "month"]] = Query(
+        None, 
+        description="Return per-bucket time series at this granularity instead of totals"
+    )
 ):
     """Fetch dashboard analytics metrics for the authenticated partner within a date range."""
     try:
@@ -50,52 +178,62 @@ async def get_dashboard_metrics(
                 detail="start_date cannot be after end_date"
             )
         
-        # Handle space_ids parameter
-        if space_ids is None:
-            # Fallback to getting space IDs from user profile
-            db = get_firestore_client()
-            user_profile_ref = db.collection('partner_profiles').document(uid)
-            user_profile = user_profile_ref.get()
-            
-            if not user_profile.exists:
-                raise HTTPException(status_code=404, detail="User profile not found")
-            
-            user_data = doc_to_dict(user_profile)
-            user_space_ids = user_data.get('spaceIds', [])  # Now expecting array of strings
-            
-            if not user_space_ids:
-                raise HTTPException(
-                    status_code=400, 
-                    detail="Partner space IDs not found in user profile"
-                )
-            
-            # If it's a single string, convert to list
-            if isinstance(user_space_ids, str):
-                user_space_ids = [user_space_ids]
-            
-            space_ids = user_space_ids
-        else:
-            # Validate that space_ids is a list
-            if not isinstance(space_ids, list) or len(space_ids) == 0:
-                raise HTTPException(
-                    status_code=400,
-                    detail="space_ids must be a non-empty list"
-                )
-        
-        # Get Amplitude service and fetch metrics
-        amplitude_service = get_amplitude_service()
-        metrics_data = amplitude_service.get_dashboard_metrics(
-            space_ids, 
-            start_date=parsed_start_date, 
-            end_date=parsed_end_date
+        cache = get_dashboard_metrics_cache()
+        cache_key = dashboard_cache_key(
+            partner.uid, 
+            tuple(space_ids or partner.spaceIds), 
+            start_date, 
+            end_date, 
+            granularity
         )
         
-        # Convert to Pydantic model for consistent response
-        metrics_model = DashboardMetrics(**metrics_data)
-        return metrics_model.model_dump()
+        # Serve the last computed response immediately while it is within
+        # the stale tolerance, refreshing it in the background once stale
+        cached = cache.get(cache_key)
+        if cached is not None and cached.is_servable():
+            if cached.is_fresh():
+                cache_status = "HIT"
+            else:
+                cache_status = "STALE"
+                if cache.begin_refresh(cache_key):
+                    _schedule_refresh(
+                        cache_key, 
+                        partner, 
+                        space_ids, 
+                        parsed_start_date, 
+                        parsed_end_date, 
+                        granularity
+                    )
+            response = ModelJSONResponse(cached.data)
+            _set_data_age_headers(response, cached, cache_status)
+            return response
         
+        data, computed_at = await _compute_dashboard_metrics(
+            partner, 
+            space_ids, 
+            parsed_start_date, 
+            parsed_end_date, 
+            granularity
+        )
+        cached = cache.set(cache_key, data, computed_at)
+        response = ModelJSONResponse(cached.data)
+        _set_data_age_headers(response, cached, "MISS")
+        return response
+    
     except HTTPException:
         raise
+    except AmplitudeUnavailableError as e:
+        # Distinguish "analytics unavailable" from a genuine zero count
+        headers = None
+        if e.retry_after is not None:
+            headers = {"Retry-After": str(math.ceil(e.retry_after))}
+        raise HTTPException(
+            status_code=503,
+            detail=f"Analytics temporarily unavailable: {str(e)}",
+            headers=headers
+        )
+    except AmplitudeError as e:
+        raise HTTPException(status_code=502, detail=str(e))
     except ValueError as e:
         # Amplitude credentials not configured
         raise HTTPException(status_code=500, detail=str(e))
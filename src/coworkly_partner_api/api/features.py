@@ -1,50 +1,51 @@
 """Feature-related API routes."""
 
-from fastapi import APIRouter, HTTPException, Depends, Query
-from typing import List, Literal
+from fastapi import APIRouter, HTTPException, Depends, Query, Header, Response
+from typing import List, Literal, Optional
 
-from ..services.auth import verify_firebase_token
-from ..services.firestore import get_firestore_client, doc_to_dict
+from ..models.partner_profile import PartnerContext
+from ..services.auth import get_partner_context
+from ..services.feature_catalogue import get_feature_catalogue
 from ..models.feature import Feature
+from ..utils.config import settings
 
 router = APIRouter(prefix="/features", tags=["features"])
 
 
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag."""
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in [tag[2:] if tag.startswith("W/") else tag for tag in tags]
+
+
 @router.get("/", response_model=List[Feature])
 async def get_features(
     feature_type: Literal["workspace_features", "coliving_features"] = Query(
         ..., 
         description="Type of features to retrieve: 'workspace_features' or 'coliving_features'"
     ),
-    uid: str = Depends(verify_firebase_token)
+    lang: Optional[Literal["en", "es", "fr"]] = Query(
+        None,
+        description="Only include translations in this language"
+    ),
+    if_none_match: Optional[str] = Header(None),
+    partner: PartnerContext = Depends(get_partner_context)
 ):
-    """Query features from the specified collection"""
+    """Serve features of the specified type from the cached catalogue"""
     try:
-        # Query documents from the specific features collection
-        db = get_firestore_client()
+        snapshot = await get_feature_catalogue().get_snapshot()
+        rendered = snapshot.get(feature_type, lang)
         
-        # Get all subtype documents within the feature_type collection
-        subtype_docs = db.collection(feature_type).stream()
+        headers = {
+            "ETag": rendered.etag,
+            "Cache-Control": f"private, max-age={settings.FEATURES_CACHE_CONTROL_MAX_AGE_SECONDS}",
+            "Vary": "Authorization"
+        }
         
-        features = []
-        for subtype_doc in subtype_docs:
-            # For each subtype, get all features from its features subcollection
-            features_query = subtype_doc.reference.collection('features')
-            features_docs = features_query.stream()
-            
-            for doc in features_docs:
-                feature_data = doc_to_dict(doc)
-                # Create Feature object with proper structure
-                feature = Feature(
-                    id=doc.id,
-                    translations={
-                        'en': feature_data.get('en', ''),
-                        'es': feature_data.get('es', ''),
-                        'fr': feature_data.get('fr', '')
-                    }
-                )
-                features.append(feature)
+        # Let clients revalidate without downloading the catalogue again
+        if if_none_match and _etag_matches(if_none_match, rendered.etag):
+            return Response(status_code=304, headers=headers)
         
-        return features
+        return Response(content=rendered.body, media_type="application/json", headers=headers)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching features: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error fetching features: {str(e)}")
@@ -4,6 +4,7 @@ from datetime import datetime
 from fastapi import APIRouter
 
 from ..models.health import HealthResponse
+from ..services.amplitude_service import get_amplitude_stats
 
 router = APIRouter(tags=["health"])
 
@@ -13,5 +14,6 @@ async def health_check():
     """Health check endpoint"""
     return HealthResponse(
         status="healthy",
-        timestamp=datetime.now()
+        timestamp=datetime.now(),
+        amplitude=get_amplitude_stats()
     ) 
\ No newline at end of file
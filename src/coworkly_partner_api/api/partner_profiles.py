@@ -1,16 +1,48 @@
 """Partner profile API routes."""
 
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, HTTPException, Depends, Query
 from firebase_admin import firestore
 
 from ..models.partner_profile import PartnerProfile, PartnerProfileCreate
 from ..services.auth import get_user_info
-from ..services.firestore import get_firestore_client, doc_to_dict
+from ..services.firestore import get_async_firestore_client, read_document
+from ..services.space_claims import claim_space_for_profile, has_legacy_claim, ProfileAlreadyExistsError, SpaceAlreadyClaimedError
+from ..utils.config import settings
 from ..utils.encoding import decrypt_space_id, decrypt_email
+from ..utils.fieldsets import Fieldset, fieldset_query
+from ..utils.responses import ModelJSONResponse
+from ..utils.validation import load_model
 
 router = APIRouter(prefix="/partner-profiles", tags=["partner-profiles"])
 
+@router.get("/me")
+async def get_my_partner_profile(
+    fieldset: Optional[Fieldset] = Depends(fieldset_query(PartnerProfile)),
+    user_info: dict = Depends(get_user_info)
+):
+    """Fetch the partner profile of the authenticated user"""
+    try:
+        db = get_async_firestore_client()
+        profile_data = await read_document(
+            db, 'partner_profiles', user_info['uid'], field_paths=fieldset.field_paths() if fieldset else None
+        )
+        
+        if profile_data is None:
+            raise HTTPException(status_code=404, detail="Partner profile not found")
+        
+        if fieldset is not None:
+            return ModelJSONResponse(fieldset.dump(profile_data))
+        return ModelJSONResponse(load_model(PartnerProfile, profile_data))
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, 
+            detail=f"Error fetching partner profile: {str(e)}"
+        )
+
 @router.post("/")
 async def create_partner_profile(
     profile_data: PartnerProfileCreate, 
@@ -18,7 +50,7 @@ async def create_partner_profile(
 ):
     """Create a new partner profile"""
     try:
-        db = get_firestore_client()
+        db = get_async_firestore_client()
         uid = user_info['uid']
         user_email = user_info['email']
         
@@ -30,31 +62,24 @@ async def create_partner_profile(
                 detail="Invalid encrypted space ID format"
             )
         
-        # Check if there's already a partner profile with the decoded space id
-        # Query partner_profiles collection for the decoded space id
-        profiles_query = db.collection('partner_profiles').where('spaceIds', 'array_contains', decoded_space_id)
-        existing_profiles = profiles_query.stream()
-        
-        # Check if any profile exists with this space ID
-        for doc in existing_profiles:
-            if doc.exists:
-                raise HTTPException(
-                    status_code=409, 
-                    detail="Partner profile already exists with this space ID"
-                )
+        # Profiles registered before space claims existed have no claim
+        # document, so they are found by querying for the space
+        if settings.PARTNER_PROFILE_LEGACY_CLAIM_CHECK and await has_legacy_claim(db, decoded_space_id):
+            raise HTTPException(
+                status_code=409, 
+                detail="Partner profile already exists with this space ID"
+            )
         
         # Query spaces collection to get space info
-        space_ref = db.collection('spaces').document(decoded_space_id)
-        space_doc = space_ref.get()
+        space_data = await read_document(db, 'spaces', decoded_space_id)
         
-        if not space_doc.exists:
+        if space_data is None:
             raise HTTPException(
                 status_code=404, 
                 detail="Space not found with the provided space ID"
             )
         
         # Get space data to verify email
-        space_data = doc_to_dict(space_doc)
         space_contact = space_data.get('details', {}).get('contact', {})
         space_email = space_contact.get('email', '')
         
@@ -74,18 +99,30 @@ async def create_partner_profile(
             'updated_at': firestore.SERVER_TIMESTAMP
         }
         
-        # Add to Firestore using the UID as document ID
-        partner_profiles_ref = db.collection('partner_profiles')
-        new_profile_ref = partner_profiles_ref.document(uid)
-        new_profile_ref.set(profile_dict)
-        
-        # Get the created document and convert to Pydantic model
-        created_profile = new_profile_ref.get()
-        profile_data_dict = doc_to_dict(created_profile)
-        profile_model = PartnerProfile(**profile_data_dict)
+        # Claim the space and write the profile, using the UID as document
+        # ID, in one atomic commit
+        try:
+            commit_time = await claim_space_for_profile(db, uid, decoded_space_id, profile_dict)
+        except SpaceAlreadyClaimedError:
+            raise HTTPException(
+                status_code=409, 
+                detail="Partner profile already exists with this space ID"
+            )
+        except ProfileAlreadyExistsError:
+            raise HTTPException(
+                status_code=409, 
+                detail="Partner profile already exists for this user"
+            )
         
-        return profile_model.model_dump()
+        # Server timestamps resolve to the commit time, so the created
+        # document is known without reading it back
+        profile_dict['created_at'] = commit_time
+        profile_dict['updated_at'] = commit_time
+        profile_dict['id'] = uid
+        profile_model = PartnerProfile(**profile_dict)
         
+        return ModelJSONResponse(profile_model)
+    
     except HTTPException:
         raise
     except Exception as e:
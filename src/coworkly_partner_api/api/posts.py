@@ -1,54 +1,210 @@
 """Post-related API routes."""
 
-from typing import List
-from fastapi import APIRouter, HTTPException, Depends
+import asyncio
+from typing import Dict, List, Optional
+from fastapi import APIRouter, HTTPException, Depends, Query
 from firebase_admin import firestore
+from google.api_core.exceptions import AlreadyExists, NotFound
+from pydantic import TypeAdapter
 
-from ..models.post import CommunityPost, PostUpdate
-from ..services.auth import verify_firebase_token
-from ..services.firestore import get_firestore_client, doc_to_dict
+from ..models.post import CommunityPost, PostUpdate, PostBulkCreate, PostBulkDelete, PostBulkItem, PostLikeResult
+from ..models.partner_profile import PartnerContext
+from ..services.auth import get_partner_context
+from ..services.counters import COUNTER_FIELDS, COUNTER_MODEL_FIELDS, SHARDS_COLLECTION, add_increment, sum_shards, aggregate_counts
+from ..services.firestore import get_async_firestore_client, doc_to_dict, update_document, ConcurrentUpdateError, chunked, delete_documents
+from ..utils.config import settings
+from ..utils.fieldsets import Fieldset, fieldset_query
+from ..utils.pagination import encode_cursor, decode_cursor, InvalidCursorError
+from ..utils.responses import ModelJSONResponse
+from ..utils.validation import load_model
 
 router = APIRouter(prefix="/posts", tags=["posts"])
 
+# Serializers for list responses, built once
+POST_LIST_ADAPTER = TypeAdapter(List[CommunityPost])
+POST_BULK_ITEMS_ADAPTER = TypeAdapter(List[PostBulkItem])
+
+# Subcollections of a post, which are not deleted along with it
+POST_SUBCOLLECTIONS = (SHARDS_COLLECTION, 'likes')
+
+
+def _new_post_data(post: CommunityPost) -> Dict:
+    """Document of a new post; counts start at zero whatever the client sent."""
+    post_data = post.model_dump(exclude={'id'}, by_alias=True)
+    post_data.update(dict.fromkeys(COUNTER_FIELDS, 0))
+    post_data['created_at'] = firestore.SERVER_TIMESTAMP
+    return post_data
+
+
+async def _subcollection_documents(post_ref) -> List:
+    """References to the counter shards and likes of a post."""
+    return [
+        doc_ref
+        for name in POST_SUBCOLLECTIONS
+        async for doc_ref in post_ref.collection(name).list_documents()
+    ]
+
 
 @router.post("/")
-async def create_post(post: CommunityPost, uid: str = Depends(verify_firebase_token)):
+async def create_post(post: CommunityPost, partner: PartnerContext = Depends(get_partner_context)):
     """Create a new community post"""
     try:
         # Prepare post data
-        post_data = post.dict(exclude={'id'}, by_alias=True)
-        post_data['created_at'] = firestore.SERVER_TIMESTAMP
+        post_data = _new_post_data(post)
         
         # Add to Firestore
-        db = get_firestore_client()
+        db = get_async_firestore_client()
         posts_ref = db.collection('posts')
-        new_post_ref = posts_ref.add(post_data)[1]
+        update_time, new_post_ref = await posts_ref.add(post_data)
         
-        # Get the created document and convert to Pydantic model
-        created_post = new_post_ref.get()
-        post_data = doc_to_dict(created_post)
+        # The server timestamp resolves to the commit time, so the created
+        # document is known without reading it back
+        post_data['created_at'] = update_time
+        post_data['id'] = new_post_ref.id
         post_model = CommunityPost(**post_data)
-        return post_model.model_dump()
+        return ModelJSONResponse(post_model)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error creating post: {str(e)}")
 
 
+def _check_bulk_size(count: int):
+    """Reject empty bulk requests and ones over ``POSTS_BULK_MAX_ITEMS``."""
+    if count == 0:
+        raise HTTPException(status_code=400, detail="No posts given")
+    if count > settings.POSTS_BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.POSTS_BULK_MAX_ITEMS} posts can be written at once"
+        )
+
+
+@router.post("/bulk")
+async def create_posts_bulk(request: PostBulkCreate, partner: PartnerContext = Depends(get_partner_context)):
+    """Create many community posts with batched writes"""
+    try:
+        _check_bulk_size(len(request.posts))
+        
+        db = get_async_firestore_client()
+        posts_ref = db.collection('posts')
+        
+        results = []
+        for chunk in chunked(request.posts):
+            batch = db.batch()
+            writes = []
+            for post in chunk:
+                post_data = _new_post_data(post)
+                new_post_ref = posts_ref.document()
+                batch.create(new_post_ref, post_data)
+                writes.append((new_post_ref, post_data))
+            
+            # A batch is atomic, so a failure fails every post in the chunk
+            try:
+                write_results = await batch.commit()
+            except Exception as e:
+                results.extend(
+                    PostBulkItem(id=new_post_ref.id, status="failed", error=str(e))
+                    for new_post_ref, _ in writes
+                )
+                continue
+            
+            for (new_post_ref, post_data), write_result in zip(writes, write_results):
+                post_data['created_at'] = write_result.update_time
+                post_data['id'] = new_post_ref.id
+                results.append(PostBulkItem(id=new_post_ref.id, status="created", post=CommunityPost(**post_data)))
+        
+        return ModelJSONResponse(results, adapter=POST_BULK_ITEMS_ADAPTER)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error creating posts: {str(e)}")
+
+
+@router.delete("/bulk")
+async def delete_posts_bulk(request: PostBulkDelete, partner: PartnerContext = Depends(get_partner_context)):
+    """Delete many posts with batched writes"""
+    try:
+        post_ids = list(dict.fromkeys(request.ids))
+        _check_bulk_size(len(post_ids))
+        
+        db = get_async_firestore_client()
+        posts_ref = db.collection('posts')
+        
+        statuses: Dict[str, PostBulkItem] = {}
+        references = []
+        for post_id in post_ids:
+            if not post_id or '/' in post_id:
+                statuses[post_id] = PostBulkItem(id=post_id, status="invalid", error="Invalid post ID")
+            else:
+                references.append(posts_ref.document(post_id))
+        
+        # Read every post in one call so missing ones are reported instead
+        # of failing the whole batch on a precondition
+        existing = []
+        async for post_doc in db.get_all(references):
+            if post_doc.exists:
+                existing.append(post_doc.reference)
+            else:
+                statuses[post_doc.id] = PostBulkItem(id=post_doc.id, status="not_found")
+        
+        for chunk in chunked(existing):
+            try:
+                # Counter shards and likes first, as for a single post
+                children = await asyncio.gather(*(_subcollection_documents(post_ref) for post_ref in chunk))
+                await delete_documents(db, [doc_ref for refs in children for doc_ref in refs])
+                
+                batch = db.batch()
+                for post_ref in chunk:
+                    batch.delete(post_ref)
+                await batch.commit()
+                status = {"status": "deleted"}
+            except Exception as e:
+                status = {"status": "failed", "error": str(e)}
+            for post_ref in chunk:
+                statuses[post_ref.id] = PostBulkItem(id=post_ref.id, **status)
+        
+        results = [statuses.get(post_id) or PostBulkItem(id=post_id, status="not_found") for post_id in post_ids]
+        return ModelJSONResponse(results, adapter=POST_BULK_ITEMS_ADAPTER)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error deleting posts: {str(e)}")
+
+
 @router.get("/{post_id}")
-async def get_post(post_id: str, uid: str = Depends(verify_firebase_token)):
+async def get_post(
+    post_id: str,
+    fieldset: Optional[Fieldset] = Depends(fieldset_query(CommunityPost)),
+    partner: PartnerContext = Depends(get_partner_context)
+):
     """Fetch a specific post by ID"""
     try:
-        db = get_firestore_client()
+        db = get_async_firestore_client()
         post_ref = db.collection('posts').document(post_id)
-        post_doc = post_ref.get()
+        field_paths = fieldset.field_paths() if fieldset else None
+        
+        # Like and comment counts are summed from the counter shards, read
+        # alongside the post
+        with_counts = fieldset is None or any(path[0] in COUNTER_MODEL_FIELDS for path in fieldset.paths)
+        if with_counts:
+            post_doc, (totals, has_base) = await asyncio.gather(
+                post_ref.get(field_paths=field_paths),
+                sum_shards(post_ref)
+            )
+        else:
+            post_doc = await post_ref.get(field_paths=field_paths)
         
         if not post_doc.exists:
             raise HTTPException(status_code=404, detail="Post not found")
         
         post_data = doc_to_dict(post_doc)
-        post_model = CommunityPost(**post_data)
-        return post_model.model_dump()
+        if with_counts:
+            post_data.update(aggregate_counts(post_data, totals, has_base))
+        if fieldset is not None:
+            return ModelJSONResponse(fieldset.dump(post_data))
+        post_model = load_model(CommunityPost, post_data)
+        return ModelJSONResponse(post_model)
     except HTTPException:
         raise
     except Exception as e:
@@ -59,7 +215,7 @@ async def get_post(post_id: str, uid: str = Depends(verify_firebase_token)):
 async def update_post(
     post_id: str, 
     update_data: PostUpdate, 
-    uid: str = Depends(verify_firebase_token)
+    partner: PartnerContext = Depends(get_partner_context)
 ):
     """Update specific fields of a post"""
     try:
@@ -69,42 +225,42 @@ async def update_post(
         if not update_dict:
             raise HTTPException(status_code=400, detail="No valid fields to update")
         
-        db = get_firestore_client()
+        db = get_async_firestore_client()
         post_ref = db.collection('posts').document(post_id)
         
-        # Check if post exists
-        post_doc = post_ref.get()
-        if not post_doc.exists:
+        # Update the document and merge the update into the version it was
+        # applied to
+        post_data = await update_document(post_ref, update_dict)
+        if post_data is None:
             raise HTTPException(status_code=404, detail="Post not found")
         
-        # Update the document
-        post_ref.update(update_dict)
-        
         # Return updated document using Pydantic model
-        updated_doc = post_ref.get()
-        post_data = doc_to_dict(updated_doc)
-        post_model = CommunityPost(**post_data)
-        return post_model.model_dump()
+        post_model = load_model(CommunityPost, post_data)
+        return ModelJSONResponse(post_model)
     except HTTPException:
         raise
+    except ConcurrentUpdateError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error updating post: {str(e)}")
 
 
 @router.delete("/{post_id}")
-async def delete_post(post_id: str, uid: str = Depends(verify_firebase_token)):
+async def delete_post(post_id: str, partner: PartnerContext = Depends(get_partner_context)):
     """Delete a post by ID"""
     try:
-        db = get_firestore_client()
+        db = get_async_firestore_client()
         post_ref = db.collection('posts').document(post_id)
         
-        # Check if post exists
-        post_doc = post_ref.get()
-        if not post_doc.exists:
-            raise HTTPException(status_code=404, detail="Post not found")
+        # Counter shards and likes are deleted first, so a failed request
+        # leaves the post in place to retry on
+        await delete_documents(db, await _subcollection_documents(post_ref))
         
-        # Delete the document
-        post_ref.delete()
+        # Delete the document, failing if it does not exist
+        try:
+            await post_ref.delete(option=db.write_option(exists=True))
+        except NotFound:
+            raise HTTPException(status_code=404, detail="Post not found")
         
         return {"message": "Post deleted successfully"}
     except HTTPException:
@@ -114,19 +270,115 @@ async def delete_post(post_id: str, uid: str = Depends(verify_firebase_token)):
 
 
 @router.get("/space/{space_id}")
-async def get_posts_by_space(space_id: str, uid: str = Depends(verify_firebase_token)):
-    """Fetch all posts for a specific space"""
+async def get_posts_by_space(
+    space_id: str,
+    limit: int = Query(
+        settings.POSTS_PAGE_SIZE_DEFAULT,
+        ge=1,
+        le=settings.POSTS_PAGE_SIZE_MAX,
+        description="Maximum number of posts to return"
+    ),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    fieldset: Optional[Fieldset] = Depends(fieldset_query(CommunityPost)),
+    partner: PartnerContext = Depends(get_partner_context)
+):
+    """Fetch a page of posts for a specific space, newest first"""
     try:
-        db = get_firestore_client()
-        posts_query = db.collection('posts').where('space_id', '==', space_id).order_by('created_at', direction=firestore.Query.DESCENDING)
-        posts_docs = posts_query.stream()
+        db = get_async_firestore_client()
+        posts_query = (
+            db.collection('posts')
+            .where('space_id', '==', space_id)
+            .order_by('created_at', direction=firestore.Query.DESCENDING)
+            .order_by('__name__', direction=firestore.Query.DESCENDING)
+        )
+        if cursor:
+            try:
+                created_at, doc_id = decode_cursor(cursor)
+            except InvalidCursorError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            posts_query = posts_query.start_after({'created_at': created_at, '__name__': doc_id})
+        if fieldset is not None:
+            # created_at is always read since the next cursor is built from it
+            posts_query = posts_query.select(sorted(set(fieldset.field_paths()) | {'created_at'}))
         
+        # Read one extra post to know whether there is a next page
         posts = []
-        for doc in posts_docs:
+        last_doc = None
+        has_more = False
+        async for doc in posts_query.limit(limit + 1).stream():
+            if len(posts) == limit:
+                has_more = True
+                break
             post_data = doc_to_dict(doc)
-            post_model = CommunityPost(**post_data)
-            posts.append(post_model.model_dump())
+            if fieldset is None:
+                posts.append(load_model(CommunityPost, post_data))
+            else:
+                posts.append(fieldset.dump(post_data))
+            last_doc = post_data
         
-        return posts
+        headers = None
+        if has_more:
+            headers = {"X-Next-Cursor": encode_cursor(last_doc['created_at'], last_doc['id'])}
+        
+        if fieldset is None:
+            return ModelJSONResponse(posts, headers=headers, adapter=POST_LIST_ADAPTER)
+        return ModelJSONResponse(posts, headers=headers)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching posts: {str(e)}") 
+
+
+@router.post("/{post_id}/like")
+async def like_post(post_id: str, partner: PartnerContext = Depends(get_partner_context)):
+    """Like a post as the authenticated partner"""
+    try:
+        db = get_async_firestore_client()
+        post_ref = db.collection('posts').document(post_id)
+        post_doc = await post_ref.get(field_paths=['created_at'])
+        if not post_doc.exists:
+            raise HTTPException(status_code=404, detail="Post not found")
+        
+        # The like document can only be created once per user, so the
+        # counter is incremented exactly once
+        batch = db.batch()
+        batch.create(
+            post_ref.collection('likes').document(partner.uid),
+            {'uid': partner.uid, 'created_at': firestore.SERVER_TIMESTAMP}
+        )
+        add_increment(batch, post_ref, 'likes_count', 1)
+        try:
+            await batch.commit()
+            changed = True
+        except AlreadyExists:
+            changed = False
+        
+        return ModelJSONResponse(PostLikeResult(postId=post_id, liked=True, changed=changed))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error liking post: {str(e)}")
+
+
+@router.delete("/{post_id}/like")
+async def unlike_post(post_id: str, partner: PartnerContext = Depends(get_partner_context)):
+    """Remove the authenticated partner's like from a post"""
+    try:
+        db = get_async_firestore_client()
+        post_ref = db.collection('posts').document(post_id)
+        
+        # Only decrement if this user's like document was deleted
+        batch = db.batch()
+        batch.delete(post_ref.collection('likes').document(partner.uid), option=db.write_option(exists=True))
+        add_increment(batch, post_ref, 'likes_count', -1)
+        try:
+            await batch.commit()
+            changed = True
+        except NotFound:
+            changed = False
+        
+        return ModelJSONResponse(PostLikeResult(postId=post_id, liked=False, changed=changed))
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching posts: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error unliking post: {str(e)}")
\ No newline at end of file
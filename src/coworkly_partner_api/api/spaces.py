@@ -1,34 +1,133 @@
 """Space-related API routes."""
 
 import logging
-from typing import Dict, Any
-from fastapi import APIRouter, HTTPException, Depends, Request
+from typing import Dict, Any, List, Optional, Union
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
 from firebase_admin import firestore
+from google.cloud.firestore import AsyncClient
+from pydantic import ValidationError
 
-from ..models.space import Space, SpaceUpdate
-from ..services.auth import verify_firebase_token
-from ..services.firestore import get_firestore_client, doc_to_dict
+from ..models.space import Space, SpaceBatchItem, SpaceUpdate
+from ..models.partner_profile import PartnerContext
+from ..services.auth import get_partner_context
+from ..services.firestore import get_async_firestore_client, doc_to_dict, read_document, update_document, ConcurrentUpdateError
+from ..utils.config import settings
+from ..utils.fieldsets import Fieldset, fieldset_query
+from ..utils.responses import ModelJSONResponse
+from ..utils.validation import load_model
 
 router = APIRouter(prefix="/spaces", tags=["spaces"])
 
 
+def _batch_item(space_id: str, status: str, space: Optional[Union[Space, Dict[str, Any]]] = None, error: Optional[str] = None) -> Dict[str, Any]:
+    item = SpaceBatchItem(id=space_id, status=status, error=error).model_dump()
+    item['space'] = space
+    return item
+
+
+async def fetch_spaces(
+    db: AsyncClient,
+    space_ids: List[str],
+    fieldset: Optional[Fieldset] = None
+) -> List[Dict[str, Any]]:
+    """Load spaces with a single ``get_all`` call, one result per ID in order.
+    
+    ``space`` holds the ``Space`` model, or the selected fields with a fieldset.
+    """
+    items: Dict[str, Dict[str, Any]] = {}
+    references = []
+    for space_id in dict.fromkeys(space_ids):
+        if '/' in space_id:
+            items[space_id] = _batch_item(space_id, "invalid", error="Invalid space ID")
+        else:
+            references.append(db.collection('spaces').document(space_id))
+    
+    # get_all returns documents in any order, missing ones as non-existent snapshots
+    field_paths = fieldset.field_paths() if fieldset else None
+    async for space_doc in db.get_all(references, field_paths=field_paths):
+        if not space_doc.exists:
+            items[space_doc.id] = _batch_item(space_doc.id, "not_found")
+            continue
+        try:
+            space_data = doc_to_dict(space_doc)
+            space = fieldset.dump(space_data) if fieldset else load_model(Space, space_data)
+            items[space_doc.id] = _batch_item(space_doc.id, "found", space)
+        except ValidationError as e:
+            logging.warning(f"Space batch: invalid document {space_doc.id} - {str(e)}")
+            items[space_doc.id] = _batch_item(space_doc.id, "invalid", error="Invalid space document")
+    
+    return [
+        items.get(space_id) or _batch_item(space_id, "not_found")
+        for space_id in dict.fromkeys(space_ids)
+    ]
+
+
+@router.get("/")
+async def get_spaces(
+    ids: str = Query(..., description="Comma-separated space IDs"),
+    fieldset: Optional[Fieldset] = Depends(fieldset_query(Space)),
+    partner: PartnerContext = Depends(get_partner_context)
+):
+    """Fetch several spaces in one request"""
+    try:
+        space_ids = [space_id.strip() for space_id in ids.split(",") if space_id.strip()]
+        if not space_ids:
+            raise HTTPException(status_code=400, detail="No space IDs given")
+        if len(set(space_ids)) > settings.SPACES_BATCH_MAX_IDS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"At most {settings.SPACES_BATCH_MAX_IDS} space IDs can be fetched at once"
+            )
+        
+        logging.info(f"Space batch get started: {len(space_ids)} spaces by {partner.uid}")
+        return ModelJSONResponse(await fetch_spaces(get_async_firestore_client(), space_ids, fieldset))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching spaces: {str(e)}")
+
+
+@router.get("/mine")
+async def get_my_spaces(
+    fieldset: Optional[Fieldset] = Depends(fieldset_query(Space)),
+    partner: PartnerContext = Depends(get_partner_context)
+):
+    """Fetch every space in the partner's profile"""
+    try:
+        if not partner.spaceIds:
+            return []
+        
+        logging.info(f"Space batch get started: profile spaces of {partner.uid}")
+        return ModelJSONResponse(await fetch_spaces(get_async_firestore_client(), partner.spaceIds, fieldset))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching spaces: {str(e)}")
+
+
 @router.get("/{space_id}")
-async def get_space(space_id: str, uid: str = Depends(verify_firebase_token)):
+async def get_space(
+    space_id: str,
+    fieldset: Optional[Fieldset] = Depends(fieldset_query(Space)),
+    partner: PartnerContext = Depends(get_partner_context)
+):
     """Fetch a space document from spaces/{spaceId}"""
     try:
-        logging.info(f"Space get started: {space_id} by {uid}")
-
-        db = get_firestore_client()
-        space_ref = db.collection('spaces').document(space_id)
-        space_doc = space_ref.get()
+        logging.info(f"Space get started: {space_id} by {partner.uid}")
         
-        if not space_doc.exists:
+        db = get_async_firestore_client()
+        space_data = await read_document(
+            db, 'spaces', space_id, field_paths=fieldset.field_paths() if fieldset else None
+        )
+        
+        if space_data is None:
             raise HTTPException(status_code=404, detail="Space not found")
         
         # Convert Firestore data to Pydantic model, then dump with aliases
-        space_data = doc_to_dict(space_doc)
-        space = Space(**space_data)
-        return space.model_dump()
+        if fieldset is not None:
+            return ModelJSONResponse(fieldset.dump(space_data))
+        space = load_model(Space, space_data)
+        return ModelJSONResponse(space)
     except HTTPException:
         raise
     except Exception as e:
@@ -39,11 +138,11 @@ async def get_space(space_id: str, uid: str = Depends(verify_firebase_token)):
 async def update_space(
     space_id: str, 
     update_data: SpaceUpdate, 
-    uid: str = Depends(verify_firebase_token)
+    partner: PartnerContext = Depends(get_partner_context)
 ):
     """Update fields on spaces/{spaceId}"""
     try:
-        logging.info(f"Space update started: {space_id} by {uid}")
+        logging.info(f"Space update started: {space_id} by {partner.uid}")
         
         # Convert Pydantic model to dict, excluding None values
         update_dict = update_data.model_dump(exclude_none=True, by_alias=True)
@@ -52,29 +151,28 @@ async def update_space(
             logging.warning(f"Space update: no valid fields for {space_id}")
             raise HTTPException(status_code=400, detail="No valid fields to update")
         
-        db = get_firestore_client()
+        db = get_async_firestore_client()
         space_ref = db.collection('spaces').document(space_id)
         
-        # Check if space exists
-        space_doc = space_ref.get()
-        if not space_doc.exists:
+        # Update the document in Firestore, merging the update into the
+        # version it was applied to instead of reading it back
+        space_data = await update_document(space_ref, update_dict)
+        if space_data is None:
             logging.warning(f"Space update: not found {space_id}")
             raise HTTPException(status_code=404, detail="Space not found")
-        
-        # Update the document in Firestore
-        space_ref.update(update_dict)
         logging.info(f"Space update completed: {space_id}")
         
         # Return updated document using Pydantic model with aliases
-        updated_doc = space_ref.get()
-        space_data = doc_to_dict(updated_doc)
-        space = Space(**space_data)
-        
-        return space.model_dump()
+        space = load_model(Space, space_data)
         
+        return ModelJSONResponse(space)
+    
     except HTTPException:
         logging.error(f"HTTPException in space update: {space_id}")
         raise
+    except ConcurrentUpdateError as e:
+        logging.warning(f"Space update conflict: {space_id}")
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         logging.error(f"Space update error: {space_id} - {str(e)}")
         logging.error(f"Error type: {type(e)}")
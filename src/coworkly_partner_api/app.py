@@ -1,6 +1,7 @@
 """Main FastAPI application."""
 
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, status
 from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
@@ -8,12 +9,30 @@ from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 
 from .services.auth import initialize_firebase
+from .services.amplitude_service import close_amplitude_service
+from .services.token_verifier import get_token_verifier
+from .services.firestore import close_document_mirror
 from .api import spaces_router, posts_router, features_router, health_router, dashboard_metrics_router, partner_profiles_router
 from .utils.config import settings
+from .utils.responses import ModelJSONResponse
 
 # Initialize Firebase
 initialize_firebase()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Prefetch token signing keys at startup and release upstream clients and listeners at shutdown."""
+    try:
+        await get_token_verifier().refresh_keys()
+    except Exception as e:
+        # Keys are fetched on the first request instead
+        logging.warning(f"Could not prefetch token signing keys: {str(e)}")
+    yield
+    await close_amplitude_service()
+    await close_document_mirror()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="CoWorkly Partner Dashboard API",
@@ -21,6 +40,8 @@ app = FastAPI(
     description="API for CoWorkly Partner Dashboard",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
+    default_response_class=ModelJSONResponse,
 )
 
 # Add CORS middleware
@@ -30,6 +51,7 @@ app.add_middleware(
     allow_credentials=False,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 @app.exception_handler(RequestValidationError)
@@ -0,0 +1 @@
+"""Batch jobs for the CoWorkly Partner Dashboard API."""
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Create space claim documents for partner profiles registered before claims.
+
+Once this has run, PARTNER_PROFILE_LEGACY_CLAIM_CHECK can be set to false
+so profile registration no longer queries partner_profiles by space.
+
+Usage:
+    python -m src.coworkly_partner_api.jobs.backfill_space_claims
+"""
+
+import asyncio
+from typing import Dict
+
+from ..services.auth import initialize_firebase
+from ..services.firestore import get_async_firestore_client
+from ..services.space_claims import backfill_space_claims
+
+
+async def run_backfill() -> Dict[str, int]:
+    """Backfill claims for every existing partner profile."""
+    return await backfill_space_claims(get_async_firestore_client())
+
+
+def main():
+    """Command line entry point."""
+    initialize_firebase()
+    summary = asyncio.run(run_backfill())
+    print(f"Space claims backfilled: {summary}")
+
+
+if __name__ == "__main__":
+    main()
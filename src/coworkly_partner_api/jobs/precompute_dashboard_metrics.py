@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Precompute dashboard metrics for every active partner into Firestore.
+
+Computes the standard 7/30/90-day windows with bounded parallelism and
+writes them to the dashboard metrics snapshot collection, which
+GET /dashboard-metrics/ serves from when the requested window matches.
+
+Usage:
+    python -m src.coworkly_partner_api.jobs.precompute_dashboard_metrics [--concurrency N]
+"""
+
+import argparse
+import asyncio
+from typing import Dict, Optional
+
+from ..services.auth import initialize_firebase
+from ..services.firestore import get_async_firestore_client
+from ..services.amplitude_service import get_amplitude_service, close_amplitude_service
+from ..services.metrics_snapshots import precompute_all_partner_metrics
+
+
+async def run_precompute(concurrency: Optional[int] = None) -> Dict[str, int]:
+    """Precompute all partners' dashboard metrics and close upstream clients."""
+    try:
+        return await precompute_all_partner_metrics(
+            get_async_firestore_client(),
+            get_amplitude_service(),
+            concurrency=concurrency
+        )
+    finally:
+        await close_amplitude_service()
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Precompute dashboard metrics snapshots")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="Maximum partners computed at once (default: DASHBOARD_METRICS_PRECOMPUTE_CONCURRENCY)"
+    )
+    args = parser.parse_args()
+    
+    initialize_firebase()
+    summary = asyncio.run(run_precompute(args.concurrency))
+    print(f"Dashboard metrics precomputed: {summary}")
+
+
+if __name__ == "__main__":
+    main()
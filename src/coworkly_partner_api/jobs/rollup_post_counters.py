@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Roll up sharded post counters into their posts.
+
+Sums the counter shards of every post liked or unliked within the window
+and writes the totals to the post's likes_count and comments_count, which
+the posts feed returns.
+
+Usage:
+    python -m src.coworkly_partner_api.jobs.rollup_post_counters [--window-seconds N]
+"""
+
+import argparse
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from ..services.auth import initialize_firebase
+from ..services.counters import rollup_counters_since
+from ..services.firestore import get_async_firestore_client
+from ..utils.config import settings
+
+
+async def run_rollup(window_seconds: Optional[float] = None) -> Dict[str, int]:
+    """Roll up the counters of posts whose shards changed within the window."""
+    if window_seconds is None:
+        window_seconds = settings.POSTS_COUNTER_ROLLUP_WINDOW_SECONDS
+    since = datetime.now(timezone.utc) - timedelta(seconds=window_seconds)
+    return await rollup_counters_since(get_async_firestore_client(), since)
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Roll up sharded post counters")
+    parser.add_argument(
+        "--window-seconds",
+        type=float,
+        default=None,
+        help="Roll up posts whose counters changed this long ago (default: POSTS_COUNTER_ROLLUP_WINDOW_SECONDS)"
+    )
+    args = parser.parse_args()
+    
+    initialize_firebase()
+    summary = asyncio.run(run_rollup(args.window_seconds))
+    print(f"Post counters rolled up: {summary}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,31 @@
 """Data models for the CoWorkly Partner Dashboard API."""
 
 from .feature import Feature
-from .partner_profile import PartnerProfile, PartnerProfileCreate
-from .post import CommunityPost, PostUpdate
-from .space import Space, SpaceUpdate, SpaceDetails, SpaceContact, SpaceBusinessHours, BusinessHours
-from .dashboard_metrics import DashboardMetrics
+from .partner_profile import PartnerProfile, PartnerProfileCreate, PartnerContext
+from .post import CommunityPost, PostUpdate, PostBulkCreate, PostBulkDelete, PostBulkItem, PostLikeResult
+from .space import Space, SpaceBatchItem, SpaceUpdate, SpaceDetails, SpaceContact, SpaceBusinessHours, BusinessHours
+from .dashboard_metrics import DashboardMetrics, DashboardMetricsSeries
 from .health import HealthResponse
 
 __all__ = [
     "Feature",
     "PartnerProfile",
     "PartnerProfileCreate",
+    "PartnerContext",
     "CommunityPost", 
     "PostUpdate",
+    "PostBulkCreate",
+    "PostBulkDelete",
+    "PostBulkItem",
+    "PostLikeResult",
     "Space",
+    "SpaceBatchItem",
     "SpaceUpdate",
     "SpaceDetails",
     "SpaceContact", 
     "SpaceBusinessHours",
     "BusinessHours",
     "DashboardMetrics",
+    "DashboardMetricsSeries",
     "HealthResponse"
 ] 
\ No newline at end of file
@@ -1,5 +1,7 @@
 """Dashboard metrics data model."""
 
+from datetime import date
+from typing import List, Literal
 from pydantic import BaseModel, ConfigDict
 
 
@@ -14,4 +16,24 @@ class DashboardMetrics(BaseModel):
     listViewTaps: int = 0
     reviewsBrowsed: int = 0
     reviewsAdded: int = 0
-    externalLinks: int = 0 
\ No newline at end of file
+    externalLinks: int = 0 
+
+
+class DashboardMetricsSeries(BaseModel):
+    """Dashboard metrics as per-bucket arrays for charts.
+    
+    Each metric list is aligned with ``buckets``, which holds the first day
+    of every day, week (Monday) or month bucket in the requested range.
+    """
+    model_config = ConfigDict(populate_by_name=True)
+    
+    granularity: Literal["day", "week", "month"] = "day"
+    buckets: List[date] = []
+    profileViews: List[int] = []
+    favoritesAdded: List[int] = []
+    favoritesRemoved: List[int] = []
+    markerTaps: List[int] = []
+    listViewTaps: List[int] = []
+    reviewsBrowsed: List[int] = []
+    reviewsAdded: List[int] = []
+    externalLinks: List[int] = []
@@ -1,6 +1,7 @@
 """Health check data model."""
 
 from datetime import datetime
+from typing import Dict, Optional
 from pydantic import BaseModel, ConfigDict
 
 
@@ -9,4 +10,5 @@ class HealthResponse(BaseModel):
     model_config = ConfigDict(populate_by_name=True)
     
     status: str
-    timestamp: datetime 
\ No newline at end of file
+    timestamp: datetime
+    amplitude: Optional[Dict[str, int]] = None 
\ No newline at end of file
@@ -17,6 +17,16 @@ class PartnerProfile(BaseModel):
     updatedAt: Optional[datetime] = Field(None, alias="updated_at")
 
 
+class PartnerContext(BaseModel):
+    """Authenticated partner making the current request."""
+    model_config = ConfigDict(populate_by_name=True)
+    
+    uid: str
+    email: str = ""
+    status: str
+    spaceIds: List[str] = Field(default_factory=list, alias="space_ids")
+
+
 class PartnerProfileCreate(BaseModel):
     """Model for creating a partner profile."""
     model_config = ConfigDict(populate_by_name=True)
@@ -1,7 +1,7 @@
 """Community post data model."""
 
 from datetime import datetime
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Literal
 from pydantic import BaseModel, Field, field_validator, ConfigDict
 
 
@@ -19,7 +19,7 @@ class CommunityPost(BaseModel):
     likesCount: int = Field(default=0, alias="likes_count")
     commentsCount: int = Field(default=0, alias="comments_count")
     isLikedByUser: bool = Field(default=False, alias="is_liked_by_user")
-
+    
     @field_validator('author')
     @classmethod
     def validate_author(cls, v):
@@ -32,20 +32,50 @@ class CommunityPost(BaseModel):
 
 
 class PostUpdate(BaseModel):
-    """Model for updating post fields."""
+    """Model for updating post fields.
+    
+    Like and comment counts are sharded counters and cannot be set.
+    """
     model_config = ConfigDict(populate_by_name=True)
     
     content: Optional[str] = None
     imageUrls: Optional[List[str]] = Field(None, alias="image_urls")
     externalLinks: Optional[List[str]] = Field(None, alias="external_links")
-    likesCount: Optional[int] = Field(None, alias="likes_count")
-    commentsCount: Optional[int] = Field(None, alias="comments_count")
     isLikedByUser: Optional[bool] = Field(None, alias="is_liked_by_user")
-
+    
     @field_validator('content')
     @classmethod
     def validate_content(cls, v):
         """Validate that content is not empty if provided."""
         if v is not None and not v.strip():
             raise ValueError('Content cannot be empty')
-        return v 
\ No newline at end of file
+        return v 
+
+
+class PostBulkCreate(BaseModel):
+    """Posts to create in one request."""
+    posts: List[CommunityPost]
+
+
+class PostBulkDelete(BaseModel):
+    """IDs of posts to delete in one request."""
+    ids: List[str]
+
+
+class PostLikeResult(BaseModel):
+    """Outcome of liking or unliking a post."""
+    model_config = ConfigDict(populate_by_name=True)
+    
+    postId: str = Field(alias="post_id")
+    liked: bool
+    changed: bool = Field(description="False if the post already was in the requested state")
+
+
+class PostBulkItem(BaseModel):
+    """Result for one post of a bulk request."""
+    model_config = ConfigDict(populate_by_name=True)
+    
+    id: Optional[str] = None
+    status: Literal["created", "deleted", "not_found", "invalid", "failed"]
+    post: Optional[CommunityPost] = None
+    error: Optional[str] = None
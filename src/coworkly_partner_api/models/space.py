@@ -1,6 +1,6 @@
 """Space-related data models."""
 
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Optional, Union, Literal
 from pydantic import BaseModel, Field, field_validator, ConfigDict
 
 
@@ -24,7 +24,7 @@ class SpaceContact(BaseModel):
     twitter: str = Field(default="", alias="twitter")
     tiktok: str = Field(default="", alias="tiktok")
     linkedIn: str = Field(default="", alias="linkedin")
-
+    
     @field_validator('facebook', 'instagram', 'twitter', 'tiktok', 'linkedIn', mode='before')
     @classmethod
     def convert_none_to_empty(cls, v):
@@ -73,6 +73,16 @@ class Space(BaseModel):
     details: SpaceDetails
 
 
+class SpaceBatchItem(BaseModel):
+    """Result for one ID of a batch space fetch."""
+    model_config = ConfigDict(populate_by_name=True)
+    
+    id: str
+    status: Literal["found", "not_found", "invalid"]
+    space: Optional[Space] = None
+    error: Optional[str] = None
+
+
 class SpaceUpdate(BaseModel):
     """Model for updating space fields."""
     model_config = ConfigDict(populate_by_name=True)
@@ -1,10 +1,12 @@
 """Services for the CoWorkly Partner Dashboard API."""
 
-from .auth import verify_firebase_token
-from .firestore import get_firestore_client, doc_to_dict
+from .auth import verify_firebase_token, get_partner_context
+from .firestore import get_firestore_client, get_async_firestore_client, doc_to_dict
 
 __all__ = [
     "verify_firebase_token",
+    "get_partner_context",
     "get_firestore_client",
+    "get_async_firestore_client",
     "doc_to_dict"
 ] 
\ No newline at end of file
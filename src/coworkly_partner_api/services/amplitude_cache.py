@@ -0,0 +1,127 @@
+"""Persistent response caches for Amplitude segmentation queries."""
+
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Any, Optional
+
+from ..utils.config import settings
+
+
+class ResponseCache(ABC):
+    """Interface for caches pluggable into ``AmplitudeService``."""
+    
+    @abstractmethod
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a cached response, or None if missing or expired."""
+    
+    @abstractmethod
+    def set(self, key: str, response: Dict[str, Any], ttl: float):
+        """Cache a response for ``ttl`` seconds."""
+
+
+class SQLiteResponseCache(ResponseCache):
+    """SQLite-backed response cache that survives process restarts.
+    
+    It only survives cold starts if ``path`` is on a volume that outlives
+    the instance; a file in the temp directory is lost with it.
+    
+    Entries expire after their TTL and, once more than ``max_entries`` are
+    stored, the least recently used entries are evicted. Storage errors are
+    logged and treated as cache misses so they never fail a query.
+    """
+    
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        with self._lock:
+            # WAL lets several worker processes share the file
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)"
+            )
+            self._connection.commit()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        try:
+            with self._lock:
+                row = self._connection.execute(
+                    "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                if row[1] <= now:
+                    self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._connection.commit()
+                    return None
+                self._connection.execute(
+                    "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+                )
+                self._connection.commit()
+            return json.loads(row[0])
+        except (sqlite3.Error, ValueError) as e:
+            print(f"Amplitude response cache read error: {str(e)}")
+            return None
+    
+    def set(self, key: str, response: Dict[str, Any], ttl: float):
+        now = time.time()
+        try:
+            with self._lock:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, expires_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(response), now + ttl, now)
+                )
+                self._evict(now)
+                self._connection.commit()
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            print(f"Amplitude response cache write error: {str(e)}")
+    
+    def _evict(self, now: float):
+        """Drop expired entries, then the least recently used beyond the bound."""
+        self._connection.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+        (count,) = self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()
+        if count > self.max_entries:
+            self._connection.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY accessed_at LIMIT ?)",
+                (count - self.max_entries,)
+            )
+    
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()
+        return count
+    
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+def create_response_cache() -> Optional[ResponseCache]:
+    """Create the configured response cache, or None if disabled."""
+    if not settings.AMPLITUDE_RESPONSE_CACHE_PATH:
+        return None
+    try:
+        return SQLiteResponseCache(
+            settings.AMPLITUDE_RESPONSE_CACHE_PATH,
+            settings.AMPLITUDE_RESPONSE_CACHE_MAX_ENTRIES
+        )
+    except sqlite3.Error as e:
+        print(f"Amplitude response cache disabled: {str(e)}")
+        return None
@@ -3,18 +3,212 @@
 import os
 import base64
 import json
-import requests
-from typing import Dict, Any, Optional, List, Union
-from datetime import datetime, timedelta
-from fastapi import HTTPException
+import asyncio
+import importlib.util
+import random
+import time
+import httpx
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Optional, List, Union, Tuple
+from datetime import date, datetime, timedelta, timezone
 
+from .amplitude_cache import ResponseCache, create_response_cache
 from ..utils.config import settings
 
 
+# Amplitude events backing the dashboard metrics, in response order
+TARGET_EVENTS = [
+    "partner_profile_navigation",
+    "add_favorite", 
+    "remove_favorite",
+    "marker_tap",
+    "home_listview_item_tap",
+    "browse_reviews",
+    "add_review",
+    "external_link_navigation"
+]
+
+# The segmentation API accepts at most two event definitions (e, e2) per request
+MAX_EVENTS_PER_REQUEST = 2
+
+# HTTP/2 needs the optional h2 package (httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class AmplitudeError(Exception):
+    """Amplitude rejected a query (e.g. bad credentials or parameters)."""
+
+
+class AmplitudeUnavailableError(AmplitudeError):
+    """Amplitude is rate limiting, failing or unreachable.
+    
+    ``retry_after`` holds the number of seconds after which a retry may
+    succeed, when known.
+    """
+    
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Client-side rate limiter sized to the Amplitude query quota."""
+    
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+    
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    async def acquire(self):
+        """Wait until a request may be sent, then take a token."""
+        while True:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class CircuitBreaker:
+    """Fail fast while Amplitude is degraded.
+    
+    The circuit opens after ``failure_threshold`` consecutive failed queries.
+    Once ``reset_timeout`` seconds have passed a single trial query is let
+    through; its outcome closes or re-opens the circuit.
+    """
+    
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+    
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+    
+    def retry_after(self) -> float:
+        """Seconds until the next trial query is allowed."""
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+    
+    def allow(self) -> bool:
+        """Whether a query may be sent now."""
+        if self.opened_at is None:
+            return True
+        if self.retry_after() > 0 or self._trial_in_flight:
+            return False
+        self._trial_in_flight = True
+        return True
+    
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+    
+    def record_failure(self):
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def is_closed_day(day: date) -> bool:
+    """Whether Amplitude's counts for a day are final (before yesterday)."""
+    return day < date.today() - timedelta(days=1)
+
+
+def date_range(start_date: Optional[datetime], end_date: Optional[datetime]) -> List[date]:
+    """List the days covered by a query, defaulting to the last 30 days."""
+    if not start_date:
+        start_date = datetime.now() - timedelta(days=30)
+    if not end_date:
+        end_date = datetime.now()
+    
+    return [
+        start_date.date() + timedelta(days=i)
+        for i in range((end_date.date() - start_date.date()).days + 1)
+    ]
+
+
+def bucket_start(day: date, granularity: str) -> date:
+    """Get the first day of the day/week/month bucket containing a day."""
+    if granularity == "day":
+        return day
+    if granularity == "week":
+        # ISO weeks start on Monday
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    raise ValueError(f"Unsupported granularity: {granularity}")
+
+
+def rollup_daily_series(series: Dict[date, int], granularity: str) -> Dict[date, int]:
+    """Sum a daily series into ordered day/week/month buckets."""
+    buckets: Dict[date, int] = {}
+    for day in sorted(series):
+        key = bucket_start(day, granularity)
+        buckets[key] = buckets.get(key, 0) + series[day]
+    return buckets
+
+
+class DailySeriesCache:
+    """Bounded LRU cache of per-day event counts for closed days."""
+    
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, Tuple[str, ...], date], int]" = OrderedDict()
+    
+    def get(self, event_name: str, space_ids: List[str], day: date) -> Optional[int]:
+        """Get a cached count, or None if the day is not cached."""
+        key = (event_name, tuple(space_ids), day)
+        count = self._entries.get(key)
+        if count is not None:
+            self._entries.move_to_end(key)
+        return count
+    
+    def set(self, event_name: str, space_ids: List[str], day: date, count: int):
+        """Cache the count for a closed day, evicting the least recently used."""
+        key = (event_name, tuple(space_ids), day)
+        self._entries[key] = count
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
 class AmplitudeService:
     """Service for interacting with Amplitude Dashboard REST API."""
     
-    def __init__(self):
+    def __init__(self, response_cache: Optional[ResponseCache] = None):
         self.base_url = settings.AMPLITUDE_BASE_URL
         self.api_key = settings.AMPLITUDE_API_KEY
         self.secret_key = settings.AMPLITUDE_SECRET_KEY
@@ -26,54 +220,169 @@ class AmplitudeService:
         credentials = f"{self.api_key}:{self.secret_key}"
         encoded_credentials = base64.b64encode(credentials.encode()).decode()
         self.auth_header = f"Basic {encoded_credentials}"
+        
+        # Maximum number of Amplitude queries in flight per dashboard load
+        self.max_concurrency = max(1, settings.AMPLITUDE_MAX_CONCURRENCY)
+        
+        # Per-day counts for closed days, keyed by (event, space ids, day)
+        self.day_cache = DailySeriesCache(settings.AMPLITUDE_DAY_CACHE_MAX_ENTRIES)
+        
+        # Persistent segmentation response cache (SQLite by default)
+        self.response_cache = response_cache if response_cache is not None else create_response_cache()
+        
+        # Upstream fetches currently in flight, keyed by their canonical query
+        self._in_flight: Dict[Tuple, "asyncio.Future[Dict[str, Dict[date, int]]]"] = {}
+        
+        # Client-side rate limiting, retries and circuit breaking
+        self.rate_limiter = TokenBucket(
+            settings.AMPLITUDE_RATE_LIMIT_PER_SECOND,
+            settings.AMPLITUDE_RATE_LIMIT_BURST
+        )
+        self.circuit_breaker = CircuitBreaker(
+            settings.AMPLITUDE_CIRCUIT_FAILURE_THRESHOLD,
+            settings.AMPLITUDE_CIRCUIT_RESET_SECONDS
+        )
+        self.max_retries = max(0, settings.AMPLITUDE_MAX_RETRIES)
+        
+        # Counters exposed for monitoring
+        self.stats = {
+            "upstream_requests": 0,
+            "coalesced_requests": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "circuit_rejections": 0,
+            "response_cache_hits": 0
+        }
+        
+        # Long-lived pooled client, created lazily on the running event loop
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
     
-    def _make_request(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Make authenticated request to Amplitude API."""
-        try:
-            headers = {
+    def _create_client(self) -> httpx.AsyncClient:
+        """Create a keep-alive HTTP client for Amplitude."""
+        return httpx.AsyncClient(
+            headers={
                 "Authorization": self.auth_header,
                 "Content-Type": "application/json"
-            }
-            
-            response = requests.get(
-                self.base_url,
-                headers=headers,
-                params=params,
-                timeout=30
+            },
+            limits=httpx.Limits(
+                max_connections=settings.AMPLITUDE_POOL_SIZE,
+                max_keepalive_connections=settings.AMPLITUDE_POOL_SIZE,
+                keepalive_expiry=settings.AMPLITUDE_KEEPALIVE_EXPIRY_SECONDS
+            ),
+            timeout=httpx.Timeout(
+                settings.AMPLITUDE_READ_TIMEOUT_SECONDS,
+                connect=settings.AMPLITUDE_CONNECT_TIMEOUT_SECONDS
+            ),
+            http2=HTTP2_AVAILABLE
+        )
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get the pooled client for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            # Pooled connections are bound to the loop that opened them, so a
+            # client left over from a finished loop cannot be reused.
+            self._client = self._create_client()
+            self._client_loop = loop
+        return self._client
+    
+    async def aclose(self):
+        """Close the pooled client and its connections."""
+        if self._client is not None and not self._client.is_closed:
+            if self._client_loop is asyncio.get_running_loop():
+                await self._client.aclose()
+        self._client = None
+        self._client_loop = None
+    
+    def _backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff with full jitter for a retry attempt."""
+        ceiling = min(
+            settings.AMPLITUDE_BACKOFF_MAX_SECONDS,
+            settings.AMPLITUDE_BACKOFF_BASE_SECONDS * (2 ** attempt)
+        )
+        return random.uniform(0, ceiling)
+    
+    async def _make_request(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Make authenticated request to Amplitude API.
+        
+        Rate-limited (429), server error (5xx) and connection failures are
+        retried with jittered exponential backoff, honoring ``Retry-After``.
+        Raises ``AmplitudeUnavailableError`` once retries are exhausted or
+        while the circuit breaker is open, and ``AmplitudeError`` for other
+        rejected queries.
+        """
+        if not self.circuit_breaker.allow():
+            self.stats["circuit_rejections"] += 1
+            raise AmplitudeUnavailableError(
+                "Amplitude API temporarily unavailable (circuit open)",
+                retry_after=self.circuit_breaker.retry_after()
             )
+        
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.acquire()
+            retry_after = None
             
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Amplitude API error: {response.text}"
+            try:
+                response = await self._get_client().get(self.base_url, params=params)
+            except httpx.HTTPError as e:
+                error = AmplitudeUnavailableError(f"Failed to connect to Amplitude API: {str(e)}")
+            else:
+                if response.status_code == 200:
+                    self.circuit_breaker.record_success()
+                    return response.json()
+                
+                if response.status_code != 429 and response.status_code < 500:
+                    # Amplitude is up but rejected the query; retrying will not help
+                    self.circuit_breaker.record_success()
+                    raise AmplitudeError(
+                        f"Amplitude API error ({response.status_code}): {response.text}"
+                    )
+                
+                if response.status_code == 429:
+                    self.stats["rate_limited"] += 1
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                error = AmplitudeUnavailableError(
+                    f"Amplitude API error ({response.status_code}): {response.text}",
+                    retry_after=retry_after
                 )
             
-            return response.json()
+            delay = retry_after if retry_after is not None else self._backoff_delay(attempt)
+            if attempt == self.max_retries or delay > settings.AMPLITUDE_BACKOFF_MAX_SECONDS:
+                break
             
-        except requests.exceptions.RequestException as e:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Failed to connect to Amplitude API: {str(e)}"
-            )
+            self.stats["retries"] += 1
+            await asyncio.sleep(delay)
+        
+        self.circuit_breaker.record_failure()
+        raise error
     
-    def get_event_metrics(
-        self, 
-        partner_space_ids: Union[str, List[str]], 
-        event_name: str,
-        start_date: Optional[datetime] = None,
-        end_date: Optional[datetime] = None
-    ) -> int:
-        """Get event count for a specific event and partner space(s)."""
-        if not start_date:
-            start_date = datetime.now() - timedelta(days=30)
-        if not end_date:
-            end_date = datetime.now()
+    async def _make_cached_request(self, params: Dict[str, Any], end_day: date) -> Dict[str, Any]:
+        """Make a segmentation request through the persistent response cache.
         
-        # Convert single space ID to list for consistency
-        if isinstance(partner_space_ids, str):
-            partner_space_ids = [partner_space_ids]
+        Responses for closed ranges are kept for
+        ``AMPLITUDE_RESPONSE_CACHE_CLOSED_TTL_SECONDS``; ranges touching
+        today or yesterday only for ``AMPLITUDE_RESPONSE_CACHE_OPEN_TTL_SECONDS``.
+        """
+        if self.response_cache is None:
+            return await self._make_request(params)
+        
+        cache_key = json.dumps({"url": self.base_url, "params": params}, sort_keys=True)
+        response = await asyncio.to_thread(self.response_cache.get, cache_key)
+        if response is not None:
+            self.stats["response_cache_hits"] += 1
+            return response
         
-        # Build event filter as JSON string
+        response = await self._make_request(params)
+        if is_closed_day(end_day):
+            ttl = settings.AMPLITUDE_RESPONSE_CACHE_CLOSED_TTL_SECONDS
+        else:
+            ttl = settings.AMPLITUDE_RESPONSE_CACHE_OPEN_TTL_SECONDS
+        await asyncio.to_thread(self.response_cache.set, cache_key, response, ttl)
+        return response
+    
+    def _build_event_filter(self, event_name: str, partner_space_ids: List[str]) -> Dict[str, Any]:
+        """Build the segmentation event definition for one event."""
         event_filter = {"event_type": event_name}
         
         # Add partner_space_id filter if provided
@@ -86,65 +395,279 @@ class AmplitudeService:
                 # Amplitude supports OR conditions with array syntax
                 event_filter["user_properties"] = {"partner_space_id": partner_space_ids}
         
+        return event_filter
+    
+    def _check_event_batch(self, event_names: List[str]):
+        """Ensure a batch of events fits in one segmentation request."""
+        if len(event_names) > MAX_EVENTS_PER_REQUEST:
+            raise ValueError(
+                f"At most {MAX_EVENTS_PER_REQUEST} events can be queried per request"
+            )
+    
+    async def _fetch_daily_series(
+        self,
+        space_ids: List[str],
+        event_names: List[str],
+        start_day: date,
+        end_day: date
+    ) -> Dict[str, Dict[date, int]]:
+        """Fetch daily counts for up to ``MAX_EVENTS_PER_REQUEST`` events in one request.
+        
+        The events are sent as ``e``, ``e2``, ... and Amplitude returns one
+        series per event, in the same order.
+        """
         params = {
-            "e": json.dumps(event_filter),
-            "start": start_date.strftime("%Y%m%d"),
-            "end": end_date.strftime("%Y%m%d"),
+            "start": start_day.strftime("%Y%m%d"),
+            "end": end_day.strftime("%Y%m%d"),
             "i": "1",  # Daily counts
             "m": "totals"  # Total event counts
         }
         
+        # Build event filters as JSON strings: e, e2, e3, ...
+        for index, event_name in enumerate(event_names):
+            param_name = "e" if index == 0 else f"e{index + 1}"
+            params[param_name] = json.dumps(self._build_event_filter(event_name, space_ids))
+        
+        response = await self._make_cached_request(params, end_day)
+        data = response.get("data") or {}
+        series = data.get("series") or []
+        
+        # Prefer the bucket dates Amplitude reports; fall back to position
         try:
-            response = self._make_request(params)
-            
-            # Extract total count from response
-            if response.get("data") and response["data"].get("series"):
-                # Get the first (and only) series data
-                series_data = response["data"]["series"][0]
-                if series_data and len(series_data) > 0:
-                    # Sum all values in the series
-                    total_count = sum(series_data)
-                    return total_count
-            
-            return 0
+            x_days = [date.fromisoformat(str(x)[:10]) for x in data.get("xValues") or []]
+        except ValueError:
+            x_days = []
+        
+        daily_series = {}
+        for index, event_name in enumerate(event_names):
+            series_data = series[index] if index < len(series) else []
+            days = x_days
+            if len(days) != len(series_data):
+                days = [start_day + timedelta(days=i) for i in range(len(series_data))]
+            daily_series[event_name] = dict(zip(days, series_data))
+        
+        return daily_series
+    
+    async def _fetch_daily_series_shared(
+        self,
+        space_ids: List[str],
+        event_names: List[str],
+        start_day: date,
+        end_day: date
+    ) -> Dict[str, Dict[date, int]]:
+        """Fetch daily counts, sharing one upstream request between identical callers.
+        
+        Concurrent callers asking for the same (events, space ids, start, end)
+        await the fetch already in flight instead of issuing their own.
+        """
+        key = (tuple(event_names), tuple(space_ids), start_day, end_day)
+        loop = asyncio.get_running_loop()
+        
+        future = self._in_flight.get(key)
+        if future is not None and future.get_loop() is loop:
+            self.stats["coalesced_requests"] += 1
+        else:
+            self.stats["upstream_requests"] += 1
+            future = loop.create_task(
+                self._fetch_daily_series(space_ids, event_names, start_day, end_day)
+            )
+            self._in_flight[key] = future
+            future.add_done_callback(lambda done: self._finish_in_flight(key, done))
+        
+        # Shield the shared fetch so one cancelled caller does not cancel it for the others
+        return await asyncio.shield(future)
+    
+    def _finish_in_flight(self, key: Tuple, future: asyncio.Future):
+        """Forget a completed shared fetch."""
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+        if not future.cancelled():
+            # Mark the exception as retrieved even if every caller went away
+            future.exception()
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Get monitoring counters for upstream requests, retries and the circuit."""
+        return {
+            **self.stats,
+            "in_flight": len(self._in_flight),
+            "circuit_open": int(self.circuit_breaker.is_open)
+        }
+    
+    async def get_daily_series(
+        self,
+        partner_space_ids: Union[str, List[str]],
+        event_names: List[str],
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> Dict[str, Dict[date, int]]:
+        """Get per-day event counts, served from the day cache where possible.
+        
+        Only the span covering the days missing from the cache is requested
+        from Amplitude. Closed days are cached; today and yesterday are always
+        refetched.
+        """
+        self._check_event_batch(event_names)
+        
+        # Convert single space ID to list for consistency
+        if isinstance(partner_space_ids, str):
+            partner_space_ids = [partner_space_ids]
+        space_ids = sorted(set(partner_space_ids))
+        
+        days = date_range(start_date, end_date)
+        
+        daily_series = {event_name: {} for event_name in event_names}
+        missing = {}
+        for event_name in event_names:
+            for day in days:
+                count = self.day_cache.get(event_name, space_ids, day)
+                if count is None:
+                    missing.setdefault(event_name, []).append(day)
+                else:
+                    daily_series[event_name][day] = count
+        
+        if missing:
+            fetch_start = min(event_days[0] for event_days in missing.values())
+            fetch_end = max(event_days[-1] for event_days in missing.values())
+            fetched = await self._fetch_daily_series_shared(
+                space_ids, list(missing), fetch_start, fetch_end
+            )
             
-        except Exception as e:
-            # Log error but return 0 to avoid breaking the entire dashboard
-            print(f"Error fetching {event_name} metrics: {str(e)}")
-            return 0
+            for event_name, event_days in missing.items():
+                event_series = fetched.get(event_name, {})
+                for day in event_days:
+                    if day in event_series:
+                        daily_series[event_name][day] = event_series[day]
+                        if is_closed_day(day):
+                            self.day_cache.set(event_name, space_ids, day, event_series[day])
+        
+        # Days Amplitude did not report count as zero
+        return {
+            event_name: {day: daily_series[event_name].get(day, 0) for day in days}
+            for event_name in event_names
+        }
     
-    def get_dashboard_metrics(
+    async def get_events_metrics(
+        self,
+        partner_space_ids: Union[str, List[str]],
+        event_names: List[str],
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> Dict[str, int]:
+        """Get event counts for up to ``MAX_EVENTS_PER_REQUEST`` events in one request."""
+        daily_series = await self.get_daily_series(
+            partner_space_ids,
+            event_names,
+            start_date=start_date,
+            end_date=end_date
+        )
+        
+        # Sum all values in each series
+        return {
+            event_name: sum(daily_series[event_name].values())
+            for event_name in event_names
+        }
+    
+    async def get_event_metrics(
+        self, 
+        partner_space_ids: Union[str, List[str]], 
+        event_name: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> int:
+        """Get event count for a specific event and partner space(s)."""
+        counts = await self.get_events_metrics(
+            partner_space_ids,
+            [event_name],
+            start_date=start_date,
+            end_date=end_date
+        )
+        return counts[event_name]
+    
+    async def get_dashboard_daily_series(
+        self, 
+        partner_space_ids: Union[str, List[str]],
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> Dict[str, Dict[date, int]]:
+        """Get per-day counts for every dashboard metric, keyed by metric name.
+        
+        The target events are packed ``MAX_EVENTS_PER_REQUEST`` to a request,
+        and the requests are sent concurrently with at most
+        ``max_concurrency`` in flight at once.
+        """
+        event_batches = [
+            TARGET_EVENTS[i:i + MAX_EVENTS_PER_REQUEST]
+            for i in range(0, len(TARGET_EVENTS), MAX_EVENTS_PER_REQUEST)
+        ]
+        
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def fetch(events: List[str]) -> Dict[str, Dict[date, int]]:
+            async with semaphore:
+                return await self.get_daily_series(
+                    partner_space_ids, 
+                    events, 
+                    start_date=start_date, 
+                    end_date=end_date
+                )
+        
+        results = await asyncio.gather(*(fetch(batch) for batch in event_batches))
+        
+        daily_series = {}
+        for result in results:
+            daily_series.update(result)
+        
+        # Convert event names to camelCase for response
+        return {
+            self._event_to_metric_key(event): daily_series[event]
+            for event in TARGET_EVENTS
+        }
+    
+    async def get_dashboard_metrics(
         self, 
         partner_space_ids: Union[str, List[str]],
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None
     ) -> Dict[str, int]:
         """Get all dashboard metrics for partner space(s) within a date range."""
-        target_events = [
-            "partner_profile_navigation",
-            "add_favorite", 
-            "remove_favorite",
-            "marker_tap",
-            "home_listview_item_tap",
-            "browse_reviews",
-            "add_review",
-            "external_link_navigation"
-        ]
+        daily_series = await self.get_dashboard_daily_series(
+            partner_space_ids,
+            start_date=start_date,
+            end_date=end_date
+        )
+        return {
+            metric_key: sum(series.values())
+            for metric_key, series in daily_series.items()
+        }
+    
+    async def get_dashboard_timeseries(
+        self, 
+        partner_space_ids: Union[str, List[str]],
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        granularity: str = "day"
+    ) -> Dict[str, Any]:
+        """Get dashboard metrics as per-bucket arrays for charting.
         
-        metrics = {}
+        Weekly and monthly buckets are rolled up from the daily series, so
+        no granularity costs extra upstream requests.
+        """
+        daily_series = await self.get_dashboard_daily_series(
+            partner_space_ids,
+            start_date=start_date,
+            end_date=end_date
+        )
         
-        for event in target_events:
-            # Convert event name to camelCase for response
-            metric_key = self._event_to_metric_key(event)
-            count = self.get_event_metrics(
-                partner_space_ids, 
-                event, 
-                start_date=start_date, 
-                end_date=end_date
-            )
-            metrics[metric_key] = count
+        buckets = None
+        timeseries: Dict[str, Any] = {"granularity": granularity}
+        for metric_key, series in daily_series.items():
+            rolled_up = rollup_daily_series(series, granularity)
+            if buckets is None:
+                buckets = list(rolled_up)
+            timeseries[metric_key] = [rolled_up[bucket] for bucket in buckets]
+        timeseries["buckets"] = buckets or []
         
-        return metrics
+        return timeseries
     
     def _event_to_metric_key(self, event_name: str) -> str:
         """Convert event name to camelCase metric key."""
@@ -171,4 +694,17 @@ def get_amplitude_service() -> AmplitudeService:
     global amplitude_service
     if amplitude_service is None:
         amplitude_service = AmplitudeService()
-    return amplitude_service 
\ No newline at end of file
+    return amplitude_service 
+
+
+async def close_amplitude_service():
+    """Close the Amplitude service's pooled client, if one was created."""
+    if amplitude_service is not None:
+        await amplitude_service.aclose()
+
+
+def get_amplitude_stats() -> Optional[Dict[str, int]]:
+    """Get the Amplitude service's monitoring counters, if it has been created."""
+    if amplitude_service is None:
+        return None
+    return amplitude_service.get_stats()
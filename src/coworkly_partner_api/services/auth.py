@@ -1,10 +1,20 @@
 """Authentication services."""
 
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
 import firebase_admin
-from firebase_admin import credentials, auth
+from firebase_admin import credentials
 from fastapi import HTTPException, Header
 from google.cloud.firestore import Client
 
+from .token_verifier import get_token_verifier
+from ..models.partner_profile import PartnerContext
+from ..utils.config import settings
+
 
 def initialize_firebase():
     """Initialize Firebase Admin SDK."""
@@ -16,35 +26,174 @@ def initialize_firebase():
             firebase_admin.initialize_app()
 
 
-async def verify_firebase_token(authorization: str = Header(None)):
-    """Verify Firebase ID token and check partner space access."""
+# Returned for a partner profile that does not exist
+PROFILE_MISSING = object()
+
+
+def hash_token(token: str) -> str:
+    """Cache key for an ID token, so raw tokens are never kept in memory."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class VerifiedTokenCache:
+    """Bounded LRU cache of verified ID tokens.
+    
+    Decoded claims are kept until the token's ``exp``. The partner profile
+    fields used for authorization are kept for at most ``status_ttl``
+    seconds, so deactivating a partner takes effect without waiting for
+    token expiry.
+    """
+    
+    def __init__(self, max_entries: int, status_ttl: float):
+        self.max_entries = max(1, max_entries)
+        self.status_ttl = status_ttl
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def _get_entry(self, token_hash: str, now: float) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(token_hash)
+        if entry is None:
+            return None
+        if entry["expires_at"] <= now:
+            del self._entries[token_hash]
+            return None
+        self._entries.move_to_end(token_hash)
+        return entry
+    
+    def get_claims(self, token_hash: str) -> Optional[Dict[str, Any]]:
+        """Get the decoded claims of an unexpired verified token."""
+        with self._lock:
+            entry = self._get_entry(token_hash, time.time())
+            return entry["claims"] if entry is not None else None
+    
+    def set_claims(self, token_hash: str, claims: Dict[str, Any]):
+        """Cache the claims of a verified token until it expires."""
+        expires_at = claims.get("exp")
+        if not isinstance(expires_at, (int, float)) or expires_at <= time.time():
+            return
+        with self._lock:
+            self._entries[token_hash] = {
+                "claims": claims,
+                "expires_at": expires_at,
+                "profile": None,
+                "profile_expires_at": 0.0
+            }
+            self._entries.move_to_end(token_hash)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def get_profile(self, token_hash: str) -> Tuple[bool, Any]:
+        """Get ``(hit, profile)`` for the partner profile of a token."""
+        now = time.time()
+        with self._lock:
+            entry = self._get_entry(token_hash, now)
+            if entry is None or entry["profile_expires_at"] <= now:
+                return False, None
+            return True, entry["profile"]
+    
+    def set_profile(self, token_hash: str, profile: Any):
+        """Cache the partner profile fields."""
+        now = time.time()
+        with self._lock:
+            entry = self._get_entry(token_hash, now)
+            if entry is None:
+                return
+            entry["profile"] = profile
+            entry["profile_expires_at"] = min(entry["expires_at"], now + self.status_ttl)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Global verified-token cache
+token_cache = VerifiedTokenCache(
+    settings.AUTH_TOKEN_CACHE_MAX_ENTRIES,
+    settings.AUTH_PARTNER_STATUS_TTL_SECONDS
+)
+
+
+async def verify_token_claims(token: str) -> Dict[str, Any]:
+    """Verify an ID token, reusing the claims of recently verified tokens."""
+    token_hash = hash_token(token)
+    claims = token_cache.get_claims(token_hash)
+    if claims is None:
+        claims = await get_token_verifier().verify(token)
+        token_cache.set_claims(token_hash, claims)
+    return claims
+
+
+async def get_partner_profile(token: str, uid: str) -> Any:
+    """Get the status and space IDs of a verified token's partner profile.
+    
+    Returns ``PROFILE_MISSING`` when the user has no partner profile. That
+    is not cached, so a user who registers right after being rejected is
+    let in on the next request.
+    """
+    token_hash = hash_token(token)
+    hit, profile = token_cache.get_profile(token_hash)
+    if hit:
+        return profile
+    
+    from .firestore import get_async_firestore_client, read_document
+    db = get_async_firestore_client()
+    user_data = await read_document(db, 'partner_profiles', uid)
+    if user_data is None:
+        return PROFILE_MISSING
+    
+    space_ids = user_data.get('spaceIds') or []
+    # If it's a single string, convert to list
+    if isinstance(space_ids, str):
+        space_ids = [space_ids]
+    profile = {"status": user_data.get('status'), "spaceIds": space_ids}
+    
+    token_cache.set_profile(token_hash, profile)
+    return profile
+
+
+async def get_partner_context(authorization: str = Header(None)) -> PartnerContext:
+    """Verify Firebase ID token, check partner space access and load the partner.
+    
+    FastAPI caches dependencies per request, so routes and other
+    dependencies asking for the context share a single profile lookup.
+    """
     if not authorization:
         raise HTTPException(status_code=401, detail="Authorization header required")
     
     try:
         # Remove 'Bearer ' prefix if present
         token = authorization.replace('Bearer ', '')
-        decoded_token = auth.verify_id_token(token)
+        decoded_token = await verify_token_claims(token)
         uid = decoded_token['uid']
         
         # Check if user is a partner space
-        from .firestore import get_firestore_client
-        db = get_firestore_client()
-        user_profile_ref = db.collection('partner_profiles').document(uid)
-        user_profile = user_profile_ref.get()
+        profile = await get_partner_profile(token, uid)
         
-        if not user_profile.exists:
+        if profile is PROFILE_MISSING:
             raise HTTPException(status_code=403, detail="User profile not found")
         
-        user_data = user_profile.to_dict()
-        if user_data.get('status') != 'active':
+        if profile["status"] != 'active':
             raise HTTPException(status_code=403, detail="Access denied. Partner space required.")
         
-        return uid
+        return PartnerContext(
+            uid=uid,
+            email=decoded_token.get('email', ''),
+            status=profile["status"],
+            spaceIds=profile["spaceIds"]
+        )
     except Exception as e:
         raise HTTPException(status_code=401, detail=f"Invalid token: {str(e)}")
 
 
+async def verify_firebase_token(authorization: str = Header(None)):
+    """Verify Firebase ID token and check partner space access."""
+    partner = await get_partner_context(authorization)
+    return partner.uid
+
+
 async def get_user_info(authorization: str = Header(None)):
     """Verify Firebase ID token and return user info (uid and email)."""
     if not authorization:
@@ -53,7 +202,7 @@ async def get_user_info(authorization: str = Header(None)):
     try:
         # Remove 'Bearer ' prefix if present
         token = authorization.replace('Bearer ', '')
-        decoded_token = auth.verify_id_token(token)
+        decoded_token = await verify_token_claims(token)
         uid = decoded_token['uid']
         email = decoded_token.get('email', '')
         
@@ -0,0 +1,125 @@
+"""Sharded counters for post likes and comments.
+
+Each post's counts are spread over ``posts/{postId}/counter_shards/{n}``
+documents, incremented with ``Increment`` transforms, so concurrent likes
+do not contend on the post document. The rollup job periodically writes
+the sums back into the post's ``likes_count`` and ``comments_count``.
+"""
+
+import random
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from firebase_admin import firestore
+from google.api_core.exceptions import AlreadyExists, NotFound
+from google.cloud.firestore import AsyncClient, AsyncDocumentReference, AsyncWriteBatch
+
+from ..utils.config import settings
+
+
+# Counter fields, named as on the post document
+COUNTER_FIELDS = ("likes_count", "comments_count")
+
+# The same fields, named as on the CommunityPost model and in responses
+COUNTER_MODEL_FIELDS = ("likesCount", "commentsCount")
+
+SHARDS_COLLECTION = "counter_shards"
+
+# Shard holding the counts a post had before its counters were sharded
+BASE_SHARD_ID = "base"
+
+
+def random_shard(post_ref: AsyncDocumentReference) -> AsyncDocumentReference:
+    """Pick one of the post's ``POSTS_COUNTER_SHARDS`` shards."""
+    shard_id = str(random.randrange(settings.POSTS_COUNTER_SHARDS))
+    return post_ref.collection(SHARDS_COLLECTION).document(shard_id)
+
+
+def add_increment(batch: AsyncWriteBatch, post_ref: AsyncDocumentReference, field: str, amount: int):
+    """Add an increment of a post counter to a batch."""
+    if field not in COUNTER_FIELDS:
+        raise ValueError(f"Unknown counter: {field}")
+    batch.set(
+        random_shard(post_ref),
+        {field: firestore.Increment(amount), 'updated_at': firestore.SERVER_TIMESTAMP},
+        merge=True
+    )
+
+
+async def increment_counter(db: AsyncClient, post_ref: AsyncDocumentReference, field: str, amount: int = 1):
+    """Increment a post counter."""
+    batch = db.batch()
+    add_increment(batch, post_ref, field, amount)
+    await batch.commit()
+
+
+async def sum_shards(post_ref: AsyncDocumentReference) -> Tuple[Dict[str, int], bool]:
+    """Sum a post's shards; also returns whether the base shard exists."""
+    totals = {field: 0 for field in COUNTER_FIELDS}
+    has_base = False
+    async for shard in post_ref.collection(SHARDS_COLLECTION).stream():
+        data = shard.to_dict() or {}
+        has_base = has_base or shard.id == BASE_SHARD_ID
+        for field in COUNTER_FIELDS:
+            totals[field] += int(data.get(field) or 0)
+    return totals, has_base
+
+
+def aggregate_counts(post_data: Dict, totals: Dict[str, int], has_base: bool) -> Dict[str, int]:
+    """A post's counts from its shards.
+    
+    Until the first rollup moves them into the base shard, the counts
+    stored on the post are added on top.
+    """
+    if has_base:
+        return dict(totals)
+    return {field: totals[field] + int(post_data.get(field) or 0) for field in COUNTER_FIELDS}
+
+
+async def read_counts(post_ref: AsyncDocumentReference, post_data: Dict) -> Dict[str, int]:
+    """Current counts of a post whose data has been read."""
+    totals, has_base = await sum_shards(post_ref)
+    return aggregate_counts(post_data, totals, has_base)
+
+
+async def rollup_post_counters(post_ref: AsyncDocumentReference) -> Optional[Dict[str, int]]:
+    """Write the sum of a post's shards into the post; None if it was deleted."""
+    snapshot = await post_ref.get(field_paths=list(COUNTER_FIELDS))
+    if not snapshot.exists:
+        return None
+    
+    totals, has_base = await sum_shards(post_ref)
+    if not has_base:
+        legacy = {field: int((snapshot.to_dict() or {}).get(field) or 0) for field in COUNTER_FIELDS}
+        try:
+            await post_ref.collection(SHARDS_COLLECTION).document(BASE_SHARD_ID).create(legacy)
+            totals = {field: totals[field] + legacy[field] for field in COUNTER_FIELDS}
+        except AlreadyExists:
+            # Created by a concurrent rollup
+            totals, _ = await sum_shards(post_ref)
+    
+    try:
+        await post_ref.update(totals)
+    except NotFound:
+        return None
+    return totals
+
+
+async def rollup_counters_since(db: AsyncClient, since: datetime) -> Dict[str, int]:
+    """Roll up the counters of every post with a shard updated since ``since``."""
+    post_refs = {}
+    shards_query = db.collection_group(SHARDS_COLLECTION).where('updated_at', '>=', since)
+    async for shard in shards_query.stream():
+        post_ref = shard.reference.parent.parent
+        post_refs[post_ref.path] = post_ref
+    
+    summary = {"posts": len(post_refs), "rolled_up": 0, "deleted": 0, "failed": 0}
+    for post_ref in post_refs.values():
+        try:
+            totals = await rollup_post_counters(post_ref)
+        except Exception as e:
+            print(f"Error rolling up counters of {post_ref.path}: {str(e)}")
+            summary["failed"] += 1
+            continue
+        summary["rolled_up" if totals is not None else "deleted"] += 1
+    return summary
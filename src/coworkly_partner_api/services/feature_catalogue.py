@@ -0,0 +1,154 @@
+"""In-process catalogue of workspace and coliving features."""
+
+import asyncio
+import hashlib
+import json
+import time
+from typing import Dict, List, Optional, Tuple, NamedTuple
+
+from google.cloud.firestore import AsyncClient
+
+from .firestore import get_async_firestore_client, doc_to_dict
+from ..models.feature import Feature
+from ..utils.config import settings
+
+
+# Top-level collections holding feature subtypes
+FEATURE_TYPES = ("workspace_features", "coliving_features")
+
+# Languages features are translated into
+FEATURE_LANGUAGES = ("en", "es", "fr")
+
+
+class RenderedFeatures(NamedTuple):
+    """A pre-rendered JSON payload and its ETag."""
+    body: bytes
+    etag: str
+
+
+def render_features(features: List[Feature], lang: Optional[str] = None) -> RenderedFeatures:
+    """Render features to JSON, keeping only one language if given."""
+    items = []
+    for feature in features:
+        item = feature.model_dump()
+        if lang is not None:
+            item["translations"] = {lang: item["translations"].get(lang, "")}
+        items.append(item)
+    body = json.dumps(items, ensure_ascii=False, separators=(",", ":")).encode()
+    return RenderedFeatures(body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+
+
+class CatalogueSnapshot:
+    """One loaded version of the catalogue with its rendered payloads."""
+    
+    def __init__(self, features: Dict[str, List[Feature]], version: int, loaded_at: float):
+        self.features = features
+        self.version = version
+        self.loaded_at = loaded_at
+        self.rendered: Dict[Tuple[str, Optional[str]], RenderedFeatures] = {
+            (feature_type, lang): render_features(features.get(feature_type, []), lang)
+            for feature_type in FEATURE_TYPES
+            for lang in (None,) + FEATURE_LANGUAGES
+        }
+        self.content_hash = hashlib.sha256(
+            b"".join(self.rendered[(feature_type, None)].body for feature_type in FEATURE_TYPES)
+        ).hexdigest()
+    
+    def get(self, feature_type: str, lang: Optional[str] = None) -> RenderedFeatures:
+        return self.rendered[(feature_type, lang)]
+
+
+async def load_features(db: AsyncClient) -> Dict[str, List[Feature]]:
+    """Load every feature type with a single collection-group query.
+    
+    Features live in ``{feature_type}/{subtype}/features/{featureId}``;
+    other collections named ``features`` are skipped by their parent path.
+    """
+    features: Dict[str, List[Feature]] = {feature_type: [] for feature_type in FEATURE_TYPES}
+    
+    async for doc in db.collection_group('features').stream():
+        subtype_ref = doc.reference.parent.parent
+        if subtype_ref is None:
+            continue
+        feature_type = subtype_ref.parent.id
+        if feature_type not in features:
+            continue
+        
+        feature_data = doc_to_dict(doc)
+        features[feature_type].append(Feature(
+            id=doc.id,
+            translations={lang: feature_data.get(lang, '') for lang in FEATURE_LANGUAGES}
+        ))
+    
+    return features
+
+
+class FeatureCatalogue:
+    """Feature catalogue cached in memory for ``FEATURES_CATALOGUE_TTL_SECONDS``.
+    
+    The version only changes when a reload finds different content, so
+    clients revalidating with ``If-None-Match`` keep getting 304s across
+    reloads. Concurrent reloads are shared, and if a reload fails the
+    previous version is served.
+    """
+    
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = settings.FEATURES_CATALOGUE_TTL_SECONDS if ttl is None else ttl
+        self._snapshot: Optional[CatalogueSnapshot] = None
+        self._loading: Optional[asyncio.Task] = None
+        self._loading_loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    def _is_fresh(self) -> bool:
+        return (
+            self._snapshot is not None
+            and time.monotonic() - self._snapshot.loaded_at < self.ttl
+        )
+    
+    async def _load(self) -> CatalogueSnapshot:
+        features = await load_features(get_async_firestore_client())
+        previous = self._snapshot
+        version = previous.version if previous is not None else 0
+        snapshot = CatalogueSnapshot(features, version + 1, time.monotonic())
+        if previous is not None and previous.content_hash == snapshot.content_hash:
+            snapshot.version = previous.version
+        self._snapshot = snapshot
+        return snapshot
+    
+    async def get_snapshot(self) -> CatalogueSnapshot:
+        """Get the current catalogue, reloading it once the TTL has passed."""
+        if self._is_fresh():
+            return self._snapshot
+        
+        loop = asyncio.get_running_loop()
+        task = self._loading
+        if task is None or task.done() or self._loading_loop is not loop:
+            task = loop.create_task(self._load())
+            self._loading = task
+            self._loading_loop = loop
+        
+        try:
+            return await asyncio.shield(task)
+        except Exception as e:
+            if self._snapshot is None:
+                raise
+            print(f"Feature catalogue reload failed, serving version {self._snapshot.version}: {str(e)}")
+            return self._snapshot
+    
+    def invalidate(self):
+        """Force the next request to reload the catalogue."""
+        if self._snapshot is not None:
+            self._snapshot.loaded_at = float("-inf")
+    
+    def clear(self):
+        self._snapshot = None
+        self._loading = None
+        self._loading_loop = None
+
+
+# Global catalogue instance
+feature_catalogue = FeatureCatalogue()
+
+
+def get_feature_catalogue() -> FeatureCatalogue:
+    """Get the feature catalogue instance."""
+    return feature_catalogue
@@ -1,18 +1,395 @@
 """Firestore database services."""
 
+import asyncio
+import copy
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from datetime import datetime
+from functools import partial
+from typing import Dict, Any, Optional, List, Sequence, Tuple, TypeVar, NamedTuple, Callable
+
+import firebase_admin
 from firebase_admin import firestore
-from google.cloud.firestore import Client
+from google.api_core.exceptions import NotFound, FailedPrecondition
+from google.cloud.firestore import Client, AsyncClient, AsyncDocumentReference
+
+from ..utils.config import settings
+
+
+# Most writes Firestore accepts in one batch commit
+MAX_BATCH_WRITES = 500
+
+T = TypeVar("T")
+
+# One AsyncClient per event loop, since its gRPC channel is bound to the
+# loop it was first used on
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncClient]" = weakref.WeakKeyDictionary()
+_async_clients_lock = threading.Lock()
 
 
 def get_firestore_client() -> Client:
-    """Get Firestore client instance."""
+    """Get Firestore client instance.
+    
+    Blocking; used by background jobs. Request handlers use
+    ``get_async_firestore_client``.
+    """
     return firestore.client()
 
 
+def _create_async_client() -> AsyncClient:
+    """Create an AsyncClient for the default Firebase app."""
+    app = firebase_admin.get_app()
+    if not app.project_id:
+        raise ValueError("Project ID is required to access Firestore")
+    return AsyncClient(credentials=app.credential.get_credential(), project=app.project_id)
+
+
+def get_async_firestore_client() -> AsyncClient:
+    """Get the async Firestore client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _async_clients_lock:
+        client = _async_clients.get(loop)
+        if client is None:
+            client = _create_async_client()
+            _async_clients[loop] = client
+        return client
+
+
+class MirroredDocument(NamedTuple):
+    """A mirrored document; ``data`` is None when it does not exist."""
+    data: Optional[Dict[str, Any]]
+    update_time: Optional[datetime]
+    read_time: Optional[datetime]
+    received_at: float
+
+
+class DocumentMirror:
+    """In-memory mirror of hot documents kept current by snapshot listeners.
+    
+    The first read of a document fetches it and starts an ``on_snapshot``
+    listener, which pushes every later change (deletions included, kept as
+    tombstones) into the mirror, so further reads need no RPC. Listeners
+    only exist on the sync client and deliver on their own threads.
+    
+    Every listener is its own gRPC stream and thread, so at most
+    ``max_listeners`` run at once, far fewer than ``max_entries``: a new
+    listener takes over the one of the least recently used document holding
+    one. Entries are ordered by ``read_time`` so an older snapshot never
+    replaces a newer one. Entries whose listener is not running are only
+    served for ``max_staleness`` seconds. The least recently used documents
+    are evicted, and their listeners stopped, beyond ``max_entries``.
+    """
+    
+    def __init__(
+        self,
+        collections: Sequence[str],
+        max_entries: int,
+        max_staleness: float,
+        max_listeners: int,
+        listen_client: Callable[[], Any] = get_firestore_client,
+        read_client: Callable[[], Any] = get_async_firestore_client
+    ):
+        self.collections = frozenset(collections)
+        self.max_entries = max(1, max_entries)
+        self.max_staleness = max_staleness
+        self.max_listeners = max(1, max_listeners)
+        self._listen_client = listen_client
+        self._read_client = read_client
+        self._entries: "OrderedDict[Tuple[str, str], MirroredDocument]" = OrderedDict()
+        self._watches: Dict[Tuple[str, str], Any] = {}
+        self._synced = set()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "listener_updates": 0, "evictions": 0, "listener_evictions": 0}
+    
+    def covers(self, collection: str) -> bool:
+        return collection in self.collections
+    
+    def _is_live(self, key: Tuple[str, str]) -> bool:
+        """Whether a running listener has delivered the document."""
+        watch = self._watches.get(key)
+        return watch is not None and key in self._synced and getattr(watch, "is_active", True)
+    
+    def lookup(self, collection: str, doc_id: str) -> Optional[MirroredDocument]:
+        """Get a document if it can be served without an RPC."""
+        key = (collection, doc_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if not self._is_live(key) and time.monotonic() - entry.received_at > self.max_staleness:
+                return None
+            self._entries.move_to_end(key)
+            return entry
+    
+    def staleness(self, collection: str, doc_id: str) -> Optional[float]:
+        """Seconds the mirrored document may lag behind Firestore, None if not mirrored."""
+        key = (collection, doc_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            return 0.0 if self._is_live(key) else time.monotonic() - entry.received_at
+    
+    async def get(self, collection: str, doc_id: str) -> Optional[Dict[str, Any]]:
+        """Read a document's data with ID, or None if it does not exist."""
+        entry = self.lookup(collection, doc_id)
+        if entry is not None:
+            self.stats["hits"] += 1
+        else:
+            self.stats["misses"] += 1
+            snapshot = await self._read_client().collection(collection).document(doc_id).get()
+            entry = self._snapshot_entry(snapshot, snapshot.read_time)
+            self._apply((collection, doc_id), entry, insert=True)
+            self._ensure_listener((collection, doc_id))
+        return copy.deepcopy(entry.data)
+    
+    def record_write(self, collection: str, doc_id: str, data: Dict[str, Any], update_time: datetime):
+        """Apply a write made by this instance to a mirrored document."""
+        self._apply((collection, doc_id), MirroredDocument(copy.deepcopy(data), update_time, update_time, time.monotonic()))
+    
+    @staticmethod
+    def _snapshot_entry(snapshot: Any, read_time: Optional[datetime]) -> MirroredDocument:
+        if snapshot is None or not snapshot.exists:
+            return MirroredDocument(None, None, read_time, time.monotonic())
+        return MirroredDocument(doc_to_dict(snapshot), snapshot.update_time, read_time, time.monotonic())
+    
+    def _apply(self, key: Tuple[str, str], entry: MirroredDocument, insert: bool = False) -> bool:
+        """Store an entry unless a newer one is held; only ``insert`` adds new keys."""
+        evicted = []
+        with self._lock:
+            current = self._entries.get(key)
+            if current is None and not insert:
+                return False
+            if (
+                current is not None
+                and current.read_time is not None
+                and entry.read_time is not None
+                and current.read_time > entry.read_time
+            ):
+                return False
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted_key, _ = self._entries.popitem(last=False)
+                self._synced.discard(evicted_key)
+                watch = self._watches.pop(evicted_key, None)
+                if watch is not None:
+                    evicted.append(watch)
+                self.stats["evictions"] += 1
+        for watch in evicted:
+            self._stop_watch(watch)
+        return True
+    
+    def _on_snapshot(self, key: Tuple[str, str], docs: List[Any], changes: Any, read_time: datetime):
+        """Listener callback, run on the listener's thread."""
+        self._apply(key, self._snapshot_entry(docs[0] if docs else None, read_time))
+        with self._lock:
+            # May run before on_snapshot returns, so the watch is not stored yet
+            if key in self._entries:
+                self._synced.add(key)
+        self.stats["listener_updates"] += 1
+    
+    def _ensure_listener(self, key: Tuple[str, str]):
+        """Start a listener for a document unless one is running."""
+        with self._lock:
+            if key not in self._entries:
+                return
+            watch = self._watches.get(key)
+            if watch is not None and getattr(watch, "is_active", True):
+                return
+            stopped = [self._watches.pop(key, None)]
+            self._synced.discard(key)
+            if len(self._watches) >= self.max_listeners:
+                stopped.append(self._release_listener(key))
+        for stale_watch in stopped:
+            if stale_watch is not None:
+                self._stop_watch(stale_watch)
+        
+        # Started outside the lock since the first snapshot may be delivered
+        # before on_snapshot returns
+        collection, doc_id = key
+        doc_ref = self._listen_client().collection(collection).document(doc_id)
+        watch = doc_ref.on_snapshot(partial(self._on_snapshot, key))
+        with self._lock:
+            if (
+                key in self._entries
+                and key not in self._watches
+                and len(self._watches) < self.max_listeners
+            ):
+                self._watches[key] = watch
+                watch = None
+        if watch is not None:
+            # Evicted meanwhile, another listener won the race, or the cap
+            # was reached by concurrent misses
+            self._stop_watch(watch)
+    
+    def _release_listener(self, keep: Tuple[str, str]) -> Optional[Any]:
+        """Take the listener of the least recently used document; call with the lock held."""
+        for key in self._entries:
+            if key != keep and key in self._watches:
+                self._synced.discard(key)
+                self.stats["listener_evictions"] += 1
+                return self._watches.pop(key)
+        return None
+    
+    @staticmethod
+    def _stop_watch(watch: Any):
+        """Stop a listener without blocking the event loop on its thread."""
+        try:
+            asyncio.get_running_loop().run_in_executor(None, watch.unsubscribe)
+        except RuntimeError:
+            threading.Thread(target=watch.unsubscribe, daemon=True).start()
+    
+    async def close(self):
+        """Stop every listener and drop all entries."""
+        with self._lock:
+            watches = list(self._watches.values())
+            self._watches.clear()
+            self._entries.clear()
+            self._synced.clear()
+        await asyncio.gather(*(asyncio.to_thread(watch.unsubscribe) for watch in watches))
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_document_mirror: Optional[DocumentMirror] = None
+_document_mirror_lock = threading.Lock()
+
+
+def get_document_mirror() -> Optional[DocumentMirror]:
+    """Get the document mirror, or None unless ``FIRESTORE_MIRROR_ENABLED``."""
+    global _document_mirror
+    if not settings.FIRESTORE_MIRROR_ENABLED:
+        return None
+    with _document_mirror_lock:
+        if _document_mirror is None:
+            _document_mirror = DocumentMirror(
+                settings.FIRESTORE_MIRROR_COLLECTIONS,
+                settings.FIRESTORE_MIRROR_MAX_ENTRIES,
+                settings.FIRESTORE_MIRROR_MAX_STALENESS_SECONDS,
+                settings.FIRESTORE_MIRROR_MAX_LISTENERS
+            )
+        return _document_mirror
+
+
+async def close_document_mirror():
+    """Stop the mirror's listeners, if it was started."""
+    global _document_mirror
+    with _document_mirror_lock:
+        mirror, _document_mirror = _document_mirror, None
+    if mirror is not None:
+        await mirror.close()
+
+
+async def read_document(
+    db: AsyncClient,
+    collection: str,
+    doc_id: str,
+    field_paths: Optional[List[str]] = None
+) -> Optional[Dict[str, Any]]:
+    """Read a document's data with ID, or None if it does not exist.
+    
+    Served from the document mirror when it covers the collection, in which
+    case every field is returned regardless of ``field_paths``.
+    """
+    mirror = get_document_mirror()
+    if mirror is not None and mirror.covers(collection):
+        return await mirror.get(collection, doc_id)
+    snapshot = await db.collection(collection).document(doc_id).get(field_paths=field_paths)
+    return doc_to_dict(snapshot)
+
+
+class ConcurrentUpdateError(Exception):
+    """Raised when a document keeps changing between read and update."""
+
+
+def merge_update(data: Dict[str, Any], field_updates: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply an ``update()`` payload to a copy of a document's data.
+    
+    Keys are field paths, so ``"a.b"`` replaces only ``b`` inside map ``a``
+    while a top-level key replaces the whole field, as Firestore does.
+    """
+    merged = copy.deepcopy(data)
+    for field_path, value in field_updates.items():
+        *parents, leaf = field_path.split('.')
+        target = merged
+        for part in parents:
+            if not isinstance(target.get(part), dict):
+                target[part] = {}
+            target = target[part]
+        target[leaf] = value
+    return merged
+
+
+async def update_document(
+    doc_ref: AsyncDocumentReference,
+    field_updates: Dict[str, Any]
+) -> Optional[Dict[str, Any]]:
+    """Update a document and return its new data with ID, or None if missing.
+    
+    The update is conditioned on the document not having changed since it
+    was read, so merging it into the read data locally gives the stored
+    result without reading the document back. When the document mirror
+    holds the document, its copy is used as the read, making the update a
+    single RPC. Concurrent changes are retried up to
+    ``FIRESTORE_UPDATE_MAX_ATTEMPTS`` times.
+    """
+    collection = doc_ref.parent.id
+    mirror = get_document_mirror()
+    if mirror is not None and not mirror.covers(collection):
+        mirror = None
+    cached = mirror.lookup(collection, doc_ref.id) if mirror is not None else None
+    
+    for _ in range(settings.FIRESTORE_UPDATE_MAX_ATTEMPTS):
+        if cached is not None:
+            data, update_time = cached.data, cached.update_time
+            cached = None
+        else:
+            snapshot = await doc_ref.get()
+            data, update_time = doc_to_dict(snapshot), snapshot.update_time
+        if data is None:
+            return None
+        
+        try:
+            write_result = await doc_ref.update(
+                field_updates,
+                option=AsyncClient.write_option(last_update_time=update_time)
+            )
+        except NotFound:
+            return None
+        except FailedPrecondition:
+            # Modified since it was read; merge into the latest version instead
+            continue
+        
+        merged = merge_update(data, field_updates)
+        if mirror is not None:
+            mirror.record_write(collection, doc_ref.id, merged, write_result.update_time)
+        return merged
+    
+    raise ConcurrentUpdateError("Document was modified concurrently, please retry")
+
+
+def chunked(items: Sequence[T], size: int = MAX_BATCH_WRITES) -> List[Sequence[T]]:
+    """Split items into chunks that fit in one batch commit."""
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+async def delete_documents(db: AsyncClient, references: Sequence[AsyncDocumentReference]):
+    """Delete documents with batched writes."""
+    for chunk in chunked(references):
+        batch = db.batch()
+        for doc_ref in chunk:
+            batch.delete(doc_ref)
+        await batch.commit()
+
+
 def doc_to_dict(doc):
     """Convert Firestore document to dictionary with ID."""
     if not doc.exists:
         return None
     data = doc.to_dict()
     data['id'] = doc.id
-    return data 
\ No newline at end of file
+    return data
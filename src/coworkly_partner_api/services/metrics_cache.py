@@ -0,0 +1,119 @@
+"""In-process stale-while-revalidate cache for dashboard metrics responses."""
+
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, Tuple, Hashable, NamedTuple
+
+from ..utils.config import settings
+
+
+class CachedMetrics(NamedTuple):
+    """A cached dashboard metrics response and when it was computed."""
+    data: Dict[str, Any]
+    computed_at: datetime
+    
+    def age_seconds(self, now: Optional[datetime] = None) -> float:
+        """Seconds since the response was computed."""
+        now = now or datetime.now(timezone.utc)
+        return max(0.0, (now - self.computed_at).total_seconds())
+    
+    def is_fresh(self, now: Optional[datetime] = None) -> bool:
+        """Whether the response can be served without a refresh."""
+        return self.age_seconds(now) <= settings.DASHBOARD_METRICS_FRESH_SECONDS
+    
+    def is_servable(self, now: Optional[datetime] = None) -> bool:
+        """Whether the response is still within the stale tolerance."""
+        return self.age_seconds(now) <= settings.DASHBOARD_METRICS_MAX_STALE_SECONDS
+
+
+class DashboardMetricsCache:
+    """Bounded LRU of computed dashboard responses.
+    
+    Entries are kept past their freshness so they can be served while a
+    background refresh runs; ``begin_refresh`` makes sure only one refresh
+    per key is in progress at a time.
+    """
+    
+    def __init__(self, max_entries: int):
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[Hashable, CachedMetrics]" = OrderedDict()
+        self._refreshing = set()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable) -> Optional[CachedMetrics]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+    
+    def set(
+        self,
+        key: Hashable,
+        data: Dict[str, Any],
+        computed_at: Optional[datetime] = None
+    ) -> CachedMetrics:
+        entry = CachedMetrics(data, computed_at or datetime.now(timezone.utc))
+        with self._lock:
+            # Never replace a newer response with an older one
+            current = self._entries.get(key)
+            if current is not None and current.computed_at > entry.computed_at:
+                return current
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+    
+    def begin_refresh(self, key: Hashable) -> bool:
+        """Claim the refresh of a key; False if one is already running."""
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+    
+    def end_refresh(self, key: Hashable):
+        with self._lock:
+            self._refreshing.discard(key)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._refreshing.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def dashboard_cache_key(
+    uid: str,
+    space_ids: Optional[Tuple[str, ...]],
+    start_date: Optional[str],
+    end_date: Optional[str],
+    granularity: Optional[str]
+) -> Tuple:
+    """Cache key for a dashboard request.
+    
+    Today's date is part of the key so relative ranges (no dates given) roll
+    over at midnight instead of serving yesterday's window.
+    """
+    canonical_space_ids = tuple(sorted(set(space_ids))) if space_ids else None
+    return (
+        uid,
+        canonical_space_ids,
+        start_date,
+        end_date,
+        granularity,
+        datetime.now().date().isoformat()
+    )
+
+
+# Global cache instance
+dashboard_metrics_cache = DashboardMetricsCache(settings.DASHBOARD_METRICS_CACHE_MAX_ENTRIES)
+
+
+def get_dashboard_metrics_cache() -> DashboardMetricsCache:
+    """Get the dashboard metrics cache instance."""
+    return dashboard_metrics_cache
@@ -0,0 +1,157 @@
+"""Materialized dashboard metrics snapshots."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Optional, List
+from firebase_admin import firestore
+from google.cloud.firestore import AsyncClient
+
+from .amplitude_service import AmplitudeService
+from ..utils.config import settings
+
+
+# Standard dashboard windows, in days, that are precomputed for every partner
+STANDARD_WINDOWS = (7, 30, 90)
+
+# Window served when the dashboard is requested without dates
+DEFAULT_WINDOW = 30
+
+
+def match_standard_window(
+    start_date: Optional[datetime],
+    end_date: Optional[datetime]
+) -> Optional[int]:
+    """Get the standard window a requested date range corresponds to, if any.
+    
+    A window of N days runs from N days ago up to and including today, which
+    is also what the dashboard falls back to when no dates are given.
+    """
+    today = datetime.now().date()
+    
+    if start_date is None and end_date is None:
+        return DEFAULT_WINDOW
+    if start_date is None or (end_date is not None and end_date.date() != today):
+        return None
+    
+    window = (today - start_date.date()).days
+    return window if window in STANDARD_WINDOWS else None
+
+
+def snapshot_doc_id(uid: str, window: int) -> str:
+    """Document ID of a partner's snapshot for one window."""
+    return f"{uid}_{window}d"
+
+
+async def read_snapshot(
+    db: AsyncClient,
+    uid: str,
+    window: int,
+    space_ids: List[str]
+) -> Optional[Dict[str, Any]]:
+    """Read a usable snapshot for a partner and window, or None.
+    
+    A snapshot is only usable if it was computed today and within
+    ``DASHBOARD_METRICS_SNAPSHOT_MAX_AGE_SECONDS``, for the partner's
+    current ``space_ids`` (spaces claimed since are not in it).
+    """
+    collection = settings.COLLECTIONS["dashboard_metrics"]
+    snapshot_doc = await db.collection(collection).document(snapshot_doc_id(uid, window)).get()
+    if not snapshot_doc.exists:
+        return None
+    
+    snapshot = snapshot_doc.to_dict() or {}
+    metrics = snapshot.get("metrics")
+    computed_at = snapshot.get("computed_at")
+    if not isinstance(metrics, dict) or not isinstance(computed_at, datetime):
+        return None
+    
+    if snapshot.get("end_date") != datetime.now().date().isoformat():
+        return None
+    
+    if snapshot.get("space_ids") != sorted(set(space_ids)):
+        return None
+    
+    age = datetime.now(timezone.utc) - computed_at
+    if age.total_seconds() > settings.DASHBOARD_METRICS_SNAPSHOT_MAX_AGE_SECONDS:
+        return None
+    
+    return snapshot
+
+
+async def precompute_partner_metrics(
+    db: AsyncClient,
+    amplitude_service: AmplitudeService,
+    uid: str,
+    space_ids: List[str]
+) -> Dict[int, Dict[str, int]]:
+    """Compute and store every standard window's metrics for one partner.
+    
+    The longest window's daily series is fetched once and the shorter
+    windows are summed from it.
+    """
+    today = datetime.now()
+    longest = max(STANDARD_WINDOWS)
+    daily_series = await amplitude_service.get_dashboard_daily_series(
+        space_ids,
+        start_date=today - timedelta(days=longest),
+        end_date=today
+    )
+    
+    collection = db.collection(settings.COLLECTIONS["dashboard_metrics"])
+    results = {}
+    for window in STANDARD_WINDOWS:
+        window_start = (today - timedelta(days=window)).date()
+        metrics = {
+            metric_key: sum(count for day, count in series.items() if day >= window_start)
+            for metric_key, series in daily_series.items()
+        }
+        await collection.document(snapshot_doc_id(uid, window)).set({
+            "uid": uid,
+            "window_days": window,
+            "space_ids": sorted(set(space_ids)),
+            "start_date": window_start.isoformat(),
+            "end_date": today.date().isoformat(),
+            "metrics": metrics,
+            "computed_at": firestore.SERVER_TIMESTAMP
+        })
+        results[window] = metrics
+    
+    return results
+
+
+async def precompute_all_partner_metrics(
+    db: AsyncClient,
+    amplitude_service: AmplitudeService,
+    concurrency: Optional[int] = None
+) -> Dict[str, int]:
+    """Precompute standard windows for every active partner profile.
+    
+    At most ``concurrency`` partners are computed at once. Returns counts of
+    partners computed, skipped (no spaces) and failed.
+    """
+    semaphore = asyncio.Semaphore(concurrency or settings.DASHBOARD_METRICS_PRECOMPUTE_CONCURRENCY)
+    summary = {"computed": 0, "skipped": 0, "failed": 0}
+    
+    profiles = db.collection('partner_profiles').where('status', '==', 'active').stream()
+    
+    async def precompute(uid: str, space_ids: List[str]):
+        async with semaphore:
+            try:
+                await precompute_partner_metrics(db, amplitude_service, uid, space_ids)
+                summary["computed"] += 1
+            except Exception as e:
+                print(f"Error precomputing dashboard metrics for {uid}: {str(e)}")
+                summary["failed"] += 1
+    
+    tasks = []
+    async for profile in profiles:
+        space_ids = (profile.to_dict() or {}).get('spaceIds', [])
+        if isinstance(space_ids, str):
+            space_ids = [space_ids]
+        if not space_ids:
+            summary["skipped"] += 1
+            continue
+        tasks.append(precompute(profile.id, space_ids))
+    
+    await asyncio.gather(*tasks)
+    return summary
@@ -0,0 +1,82 @@
+"""Space claims: one ``space_claims/{spaceId}`` document per registered space."""
+
+from datetime import datetime
+from typing import Dict, Any
+
+from firebase_admin import firestore
+from google.api_core.exceptions import AlreadyExists
+from google.cloud.firestore import AsyncClient
+
+
+class SpaceAlreadyClaimedError(Exception):
+    """Raised when a space already belongs to a partner profile."""
+
+
+class ProfileAlreadyExistsError(Exception):
+    """Raised when the user registering a space already has a partner profile."""
+
+
+async def has_legacy_claim(db: AsyncClient, space_id: str) -> bool:
+    """Whether a profile registered before claims existed lists the space."""
+    profiles_query = (
+        db.collection('partner_profiles')
+        .where('spaceIds', 'array_contains', space_id)
+        .limit(1)
+    )
+    async for _ in profiles_query.stream():
+        return True
+    return False
+
+
+async def claim_space_for_profile(
+    db: AsyncClient,
+    uid: str,
+    space_id: str,
+    profile_data: Dict[str, Any]
+) -> datetime:
+    """Create a space's claim and the claiming profile in one commit.
+    
+    Both are created with an exists=False precondition, so of two
+    concurrent registrations for a space exactly one commits and the
+    other writes nothing, and an existing profile, whose claims point at
+    it, is never replaced. Returns the commit time.
+    """
+    profile_ref = db.collection('partner_profiles').document(uid)
+    batch = db.batch()
+    batch.create(
+        db.collection('space_claims').document(space_id),
+        {'uid': uid, 'created_at': firestore.SERVER_TIMESTAMP}
+    )
+    batch.create(profile_ref, profile_data)
+    
+    try:
+        write_results = await batch.commit()
+    except AlreadyExists:
+        # The error does not say which document exists
+        profile_doc = await profile_ref.get(field_paths=['status'])
+        if profile_doc.exists:
+            raise ProfileAlreadyExistsError(f"User {uid} already has a partner profile")
+        raise SpaceAlreadyClaimedError(f"Space {space_id} is already claimed")
+    return write_results[-1].update_time
+
+
+async def backfill_space_claims(db: AsyncClient) -> Dict[str, int]:
+    """Create missing claims for the spaces of existing partner profiles."""
+    summary = {"profiles": 0, "created": 0, "existing": 0}
+    
+    async for profile_doc in db.collection('partner_profiles').select(['spaceIds']).stream():
+        summary["profiles"] += 1
+        space_ids = (profile_doc.to_dict() or {}).get('spaceIds') or []
+        if isinstance(space_ids, str):
+            space_ids = [space_ids]
+        
+        for space_id in space_ids:
+            try:
+                await db.collection('space_claims').document(space_id).create(
+                    {'uid': profile_doc.id, 'created_at': firestore.SERVER_TIMESTAMP}
+                )
+                summary["created"] += 1
+            except AlreadyExists:
+                summary["existing"] += 1
+    
+    return summary
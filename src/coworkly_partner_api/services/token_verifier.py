@@ -0,0 +1,201 @@
+"""Non-blocking verification of Firebase ID tokens."""
+
+import asyncio
+import re
+import time
+from typing import Dict, Any, Optional
+
+import firebase_admin
+import httpx
+import jwt
+from cryptography.x509 import load_pem_x509_certificate
+
+from ..utils.config import settings
+
+
+# Public certificates used to sign Firebase ID tokens
+FIREBASE_CERTS_URL = (
+    "https://www.googleapis.com/robot/v1/metadata/x509/"
+    "securetoken@system.gserviceaccount.com"
+)
+
+# Used when the certificate response carries no max-age
+DEFAULT_CERTS_MAX_AGE_SECONDS = 3600
+
+
+class TokenVerificationError(ValueError):
+    """Raised when an ID token is malformed, expired or wrongly signed."""
+
+
+class CertificateFetchError(Exception):
+    """Raised when the signing certificates cannot be fetched."""
+
+
+def parse_max_age(cache_control: Optional[str]) -> int:
+    """Get the max-age from a Cache-Control header value."""
+    match = re.search(r"max-age=(\d+)", cache_control or "")
+    return int(match.group(1)) if match else DEFAULT_CERTS_MAX_AGE_SECONDS
+
+
+class FirebaseTokenVerifier:
+    """Verify Firebase ID tokens without blocking the event loop.
+    
+    Signing keys are kept in memory for the max-age Google sends with them
+    and refreshed in the background shortly before they expire, so
+    verification normally needs no I/O. An unknown ``kid`` triggers a
+    refresh to pick up rotated keys, at most once per
+    ``AUTH_CERTS_MIN_REFRESH_INTERVAL_SECONDS`` so that made-up key IDs
+    cannot make every request fetch the certificates; unknown key IDs are
+    rejected in between.
+    """
+    
+    def __init__(self, project_id: Optional[str] = None, certs_url: str = FIREBASE_CERTS_URL):
+        self._project_id = project_id
+        self.certs_url = certs_url
+        self.refresh_margin = settings.AUTH_CERTS_REFRESH_MARGIN_SECONDS
+        self.clock_skew = settings.AUTH_TOKEN_CLOCK_SKEW_SECONDS
+        self.min_refresh_interval = settings.AUTH_CERTS_MIN_REFRESH_INTERVAL_SECONDS
+        self._keys: Dict[str, Any] = {}
+        self._expires_at = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._refresh_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._forced_refresh_at = float("-inf")
+        self.stats = {"certificate_fetches": 0, "background_refreshes": 0, "forced_refreshes": 0}
+    
+    @property
+    def project_id(self) -> str:
+        """Firebase project the tokens must be issued for."""
+        if not self._project_id:
+            self._project_id = settings.FIREBASE_PROJECT_ID or firebase_admin.get_app().project_id
+        if not self._project_id:
+            raise TokenVerificationError("Firebase project ID not configured")
+        return self._project_id
+    
+    async def refresh_keys(self):
+        """Fetch the current signing certificates."""
+        timeout = httpx.Timeout(settings.AUTH_CERTS_TIMEOUT_SECONDS)
+        try:
+            async with httpx.AsyncClient(timeout=timeout) as client:
+                response = await client.get(self.certs_url)
+        except httpx.HTTPError as e:
+            raise CertificateFetchError(f"Error fetching signing certificates: {str(e)}")
+        
+        self.stats["certificate_fetches"] += 1
+        if response.status_code != 200:
+            raise CertificateFetchError(
+                f"Error fetching signing certificates: HTTP {response.status_code}"
+            )
+        
+        keys = {}
+        for kid, pem in response.json().items():
+            keys[kid] = load_pem_x509_certificate(pem.encode()).public_key()
+        
+        self._keys = keys
+        self._expires_at = time.time() + parse_max_age(response.headers.get("cache-control"))
+    
+    def _ensure_refresh_task(self) -> asyncio.Task:
+        """Get the refresh running on this loop, starting one if needed."""
+        loop = asyncio.get_running_loop()
+        task = self._refresh_task
+        if task is None or task.done() or self._refresh_loop is not loop:
+            task = loop.create_task(self.refresh_keys())
+            task.add_done_callback(self._log_refresh_error)
+            self._refresh_task = task
+            self._refresh_loop = loop
+        return task
+    
+    async def _refresh_shared(self):
+        """Refresh the keys, joining a refresh already in progress."""
+        await asyncio.shield(self._ensure_refresh_task())
+    
+    def _start_background_refresh(self):
+        """Refresh the keys without waiting for the result."""
+        task = self._refresh_task
+        if task is None or task.done():
+            self.stats["background_refreshes"] += 1
+        self._ensure_refresh_task()
+    
+    def _may_force_refresh(self) -> bool:
+        """Whether an unknown key ID may refresh the keys, joining a refresh in progress."""
+        task = self._refresh_task
+        if task is not None and not task.done() and self._refresh_loop is asyncio.get_running_loop():
+            return True
+        now = time.monotonic()
+        if now - self._forced_refresh_at < self.min_refresh_interval:
+            return False
+        self._forced_refresh_at = now
+        self.stats["forced_refreshes"] += 1
+        return True
+    
+    @staticmethod
+    def _log_refresh_error(task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Signing certificate refresh failed: {str(task.exception())}")
+    
+    async def _get_key(self, kid: str) -> Any:
+        """Get the public key for a key ID, refreshing the keys if needed."""
+        now = time.time()
+        if now >= self._expires_at:
+            try:
+                await self._refresh_shared()
+            except CertificateFetchError:
+                # Keep using expired keys rather than rejecting every request
+                if not self._keys:
+                    raise
+        elif now >= self._expires_at - self.refresh_margin:
+            self._start_background_refresh()
+        
+        key = self._keys.get(kid)
+        if key is None and self._may_force_refresh():
+            # The keys may have been rotated since they were fetched
+            await self._refresh_shared()
+            key = self._keys.get(kid)
+        if key is None:
+            raise TokenVerificationError("ID token has an unknown key ID")
+        return key
+    
+    async def verify(self, token: str) -> Dict[str, Any]:
+        """Verify an ID token and return its claims, with ``uid`` set."""
+        try:
+            header = jwt.get_unverified_header(token)
+        except jwt.PyJWTError as e:
+            raise TokenVerificationError(f"Malformed ID token: {str(e)}")
+        
+        if header.get("alg") != "RS256":
+            raise TokenVerificationError("ID token has an incorrect algorithm")
+        kid = header.get("kid")
+        if not kid:
+            raise TokenVerificationError("ID token has no key ID")
+        
+        project_id = self.project_id
+        key = await self._get_key(kid)
+        try:
+            claims = jwt.decode(
+                token,
+                key,
+                algorithms=["RS256"],
+                audience=project_id,
+                issuer=f"https://securetoken.google.com/{project_id}",
+                leeway=self.clock_skew,
+                options={"require": ["exp", "iat", "sub", "auth_time"]}
+            )
+        except jwt.PyJWTError as e:
+            raise TokenVerificationError(f"Invalid ID token: {str(e)}")
+        
+        subject = claims["sub"]
+        if not isinstance(subject, str) or not subject or len(subject) > 128:
+            raise TokenVerificationError("ID token has an invalid subject")
+        if claims["auth_time"] > time.time() + self.clock_skew:
+            raise TokenVerificationError("ID token has an auth_time in the future")
+        
+        claims["uid"] = subject
+        return claims
+
+
+# Global verifier instance
+token_verifier = FirebaseTokenVerifier()
+
+
+def get_token_verifier() -> FirebaseTokenVerifier:
+    """Get the Firebase ID token verifier instance."""
+    return token_verifier
@@ -1,6 +1,7 @@
 """Configuration utilities."""
 
 import os
+import tempfile
 from typing import List
 from pathlib import Path
 
@@ -53,7 +54,9 @@ class Settings:
         "spaces": "spaces",
         "posts": "posts",
         "partner_profiles": "partner_profiles",
-        "features": "features"
+        "features": "features",
+        "space_claims": "space_claims",
+        "dashboard_metrics": "dashboard_metrics_snapshots"
     }
     
     # Amplitude Configuration
@@ -63,6 +66,96 @@ class Settings:
         "AMPLITUDE_BASE_URL",
         "https://amplitude.com/api/2/segmentation"
     )
+    AMPLITUDE_MAX_CONCURRENCY: int = int(os.getenv("AMPLITUDE_MAX_CONCURRENCY", "8"))
+    AMPLITUDE_POOL_SIZE: int = int(os.getenv("AMPLITUDE_POOL_SIZE", "10"))
+    AMPLITUDE_KEEPALIVE_EXPIRY_SECONDS: float = float(os.getenv("AMPLITUDE_KEEPALIVE_EXPIRY_SECONDS", "60"))
+    AMPLITUDE_CONNECT_TIMEOUT_SECONDS: float = float(os.getenv("AMPLITUDE_CONNECT_TIMEOUT_SECONDS", "5"))
+    AMPLITUDE_READ_TIMEOUT_SECONDS: float = float(os.getenv("AMPLITUDE_READ_TIMEOUT_SECONDS", "30"))
+    AMPLITUDE_DAY_CACHE_MAX_ENTRIES: int = int(os.getenv("AMPLITUDE_DAY_CACHE_MAX_ENTRIES", "200000"))
+    AMPLITUDE_RATE_LIMIT_PER_SECOND: float = float(os.getenv("AMPLITUDE_RATE_LIMIT_PER_SECOND", "5"))
+    AMPLITUDE_RATE_LIMIT_BURST: int = int(os.getenv("AMPLITUDE_RATE_LIMIT_BURST", "10"))
+    AMPLITUDE_MAX_RETRIES: int = int(os.getenv("AMPLITUDE_MAX_RETRIES", "3"))
+    AMPLITUDE_BACKOFF_BASE_SECONDS: float = float(os.getenv("AMPLITUDE_BACKOFF_BASE_SECONDS", "0.5"))
+    AMPLITUDE_BACKOFF_MAX_SECONDS: float = float(os.getenv("AMPLITUDE_BACKOFF_MAX_SECONDS", "8"))
+    AMPLITUDE_CIRCUIT_FAILURE_THRESHOLD: int = int(os.getenv("AMPLITUDE_CIRCUIT_FAILURE_THRESHOLD", "5"))
+    AMPLITUDE_CIRCUIT_RESET_SECONDS: float = float(os.getenv("AMPLITUDE_CIRCUIT_RESET_SECONDS", "30"))
+    
+    # Persistent Amplitude response cache (set the path to "" to disable).
+    # The default temp directory is wiped for every new Cloud Functions
+    # instance, so the cache only survives cold starts if the path is on a
+    # persistent volume; otherwise it lasts as long as the instance
+    AMPLITUDE_RESPONSE_CACHE_PATH: str = os.getenv(
+        "AMPLITUDE_RESPONSE_CACHE_PATH",
+        os.path.join(tempfile.gettempdir(), "coworkly_amplitude_cache.sqlite3")
+    )
+    AMPLITUDE_RESPONSE_CACHE_MAX_ENTRIES: int = int(os.getenv("AMPLITUDE_RESPONSE_CACHE_MAX_ENTRIES", "20000"))
+    AMPLITUDE_RESPONSE_CACHE_CLOSED_TTL_SECONDS: int = int(os.getenv("AMPLITUDE_RESPONSE_CACHE_CLOSED_TTL_SECONDS", "2592000"))
+    AMPLITUDE_RESPONSE_CACHE_OPEN_TTL_SECONDS: int = int(os.getenv("AMPLITUDE_RESPONSE_CACHE_OPEN_TTL_SECONDS", "300"))
+    
+    # Documents read back from Firestore are always validated; "sampled" also
+    # logs documents that validation changes, for one read in
+    # MODEL_VALIDATION_SAMPLE_RATE
+    MODEL_VALIDATION_MODE: str = os.getenv("MODEL_VALIDATION_MODE", "strict").lower()
+    MODEL_VALIDATION_SAMPLE_RATE: int = int(os.getenv("MODEL_VALIDATION_SAMPLE_RATE", "100"))
+    
+    # Firestore writes
+    FIRESTORE_UPDATE_MAX_ATTEMPTS: int = int(os.getenv("FIRESTORE_UPDATE_MAX_ATTEMPTS", "3"))
+    
+    # Listener-backed document mirror (opt-in)
+    FIRESTORE_MIRROR_ENABLED: bool = os.getenv("FIRESTORE_MIRROR_ENABLED", "false").lower() == "true"
+    FIRESTORE_MIRROR_COLLECTIONS: List[str] = [
+        name.strip()
+        for name in os.getenv("FIRESTORE_MIRROR_COLLECTIONS", "spaces,partner_profiles").split(",")
+        if name.strip()
+    ]
+    FIRESTORE_MIRROR_MAX_ENTRIES: int = int(os.getenv("FIRESTORE_MIRROR_MAX_ENTRIES", "2000"))
+    FIRESTORE_MIRROR_MAX_STALENESS_SECONDS: float = float(os.getenv("FIRESTORE_MIRROR_MAX_STALENESS_SECONDS", "30"))
+    # Each listener holds its own stream and thread; other mirrored
+    # documents are re-read once older than the staleness bound
+    FIRESTORE_MIRROR_MAX_LISTENERS: int = int(os.getenv("FIRESTORE_MIRROR_MAX_LISTENERS", "100"))
+    
+    # Partner registration: also look for profiles registered before space
+    # claims existed (disable once jobs.backfill_space_claims has run)
+    PARTNER_PROFILE_LEGACY_CLAIM_CHECK: bool = os.getenv("PARTNER_PROFILE_LEGACY_CLAIM_CHECK", "true").lower() == "true"
+    
+    # Batch space fetch
+    SPACES_BATCH_MAX_IDS: int = int(os.getenv("SPACES_BATCH_MAX_IDS", "100"))
+    
+    # Bulk post writes
+    POSTS_BULK_MAX_ITEMS: int = int(os.getenv("POSTS_BULK_MAX_ITEMS", "1000"))
+    
+    # Sharded post counters; the rollup window should cover at least two
+    # runs of the scheduled rollup (every 5 minutes)
+    POSTS_COUNTER_SHARDS: int = int(os.getenv("POSTS_COUNTER_SHARDS", "10"))
+    POSTS_COUNTER_ROLLUP_WINDOW_SECONDS: float = float(os.getenv("POSTS_COUNTER_ROLLUP_WINDOW_SECONDS", "900"))
+    
+    # Posts feed pagination
+    POSTS_PAGE_SIZE_DEFAULT: int = int(os.getenv("POSTS_PAGE_SIZE_DEFAULT", "20"))
+    POSTS_PAGE_SIZE_MAX: int = int(os.getenv("POSTS_PAGE_SIZE_MAX", "100"))
+    
+    # Feature catalogue
+    FEATURES_CATALOGUE_TTL_SECONDS: float = float(os.getenv("FEATURES_CATALOGUE_TTL_SECONDS", "3600"))
+    FEATURES_CACHE_CONTROL_MAX_AGE_SECONDS: int = int(os.getenv("FEATURES_CACHE_CONTROL_MAX_AGE_SECONDS", "300"))
+    
+    # Dashboard Metrics Precomputation
+    DASHBOARD_METRICS_PRECOMPUTE_CONCURRENCY: int = int(os.getenv("DASHBOARD_METRICS_PRECOMPUTE_CONCURRENCY", "4"))
+    DASHBOARD_METRICS_SNAPSHOT_MAX_AGE_SECONDS: int = int(os.getenv("DASHBOARD_METRICS_SNAPSHOT_MAX_AGE_SECONDS", "7200"))
+    
+    # Dashboard Metrics Stale-While-Revalidate
+    DASHBOARD_METRICS_FRESH_SECONDS: int = int(os.getenv("DASHBOARD_METRICS_FRESH_SECONDS", "300"))
+    DASHBOARD_METRICS_MAX_STALE_SECONDS: int = int(os.getenv("DASHBOARD_METRICS_MAX_STALE_SECONDS", "3600"))
+    DASHBOARD_METRICS_CACHE_MAX_ENTRIES: int = int(os.getenv("DASHBOARD_METRICS_CACHE_MAX_ENTRIES", "1000"))
+    
+    # Verified ID token cache
+    AUTH_TOKEN_CACHE_MAX_ENTRIES: int = int(os.getenv("AUTH_TOKEN_CACHE_MAX_ENTRIES", "10000"))
+    AUTH_PARTNER_STATUS_TTL_SECONDS: float = float(os.getenv("AUTH_PARTNER_STATUS_TTL_SECONDS", "60"))
+    
+    # ID token verification
+    AUTH_CERTS_REFRESH_MARGIN_SECONDS: float = float(os.getenv("AUTH_CERTS_REFRESH_MARGIN_SECONDS", "300"))
+    AUTH_CERTS_TIMEOUT_SECONDS: float = float(os.getenv("AUTH_CERTS_TIMEOUT_SECONDS", "10"))
+    # Tokens with an unknown key ID refresh the certificates at most this often
+    AUTH_CERTS_MIN_REFRESH_INTERVAL_SECONDS: float = float(os.getenv("AUTH_CERTS_MIN_REFRESH_INTERVAL_SECONDS", "60"))
+    AUTH_TOKEN_CLOCK_SKEW_SECONDS: int = int(os.getenv("AUTH_TOKEN_CLOCK_SKEW_SECONDS", "0"))
     
     # Encryption Configuration
     FERNET_KEY: str = os.getenv("FERNET_KEY", "")
@@ -0,0 +1,151 @@
+"""Sparse fieldsets for GET endpoints (``fields=`` query parameter)."""
+
+import types
+from functools import lru_cache
+from itertools import product
+from typing import Any, Dict, List, Optional, Tuple, Type, Union, Annotated, get_args, get_origin
+
+from fastapi import HTTPException, Query
+from pydantic import BaseModel, TypeAdapter
+
+
+FieldPath = Tuple[str, ...]
+
+_MISSING = object()
+
+
+class InvalidFieldsError(ValueError):
+    """Raised when a ``fields`` parameter names unknown fields."""
+
+
+def _nested_model(annotation: Any) -> Optional[Type[BaseModel]]:
+    """The model a field holds, if any, looking through Optional."""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    if get_origin(annotation) in (Union, types.UnionType):
+        models = [arg for arg in get_args(annotation) if _nested_model(arg)]
+        if len(models) == 1:
+            return models[0]
+    return None
+
+
+@lru_cache(maxsize=None)
+def _field_adapter(model: Type[BaseModel], name: str) -> TypeAdapter:
+    """Validator and serializer for one field of a model."""
+    field = model.model_fields[name]
+    if field.metadata:
+        return TypeAdapter(Annotated[(field.annotation, *field.metadata)])
+    return TypeAdapter(field.annotation)
+
+
+def _stored_names(model: Type[BaseModel], name: str) -> List[str]:
+    """Names a field may be stored under; documents use either the alias or the name."""
+    alias = model.model_fields[name].alias
+    return [alias, name] if alias and alias != name else [name]
+
+
+def _stored_value(model: Type[BaseModel], name: str, data: Dict[str, Any]) -> Any:
+    for stored_name in _stored_names(model, name):
+        if stored_name in data:
+            return data[stored_name]
+    return _MISSING
+
+
+class Fieldset:
+    """Fields of a model requested by a client.
+
+    Paths are model field names, dotted for fields of nested models
+    (``details.contact``). The document ID is always included.
+    """
+
+    def __init__(self, model: Type[BaseModel], paths: List[FieldPath]):
+        self.model = model
+        self.paths = paths
+
+    @classmethod
+    def parse(cls, model: Type[BaseModel], fields: Optional[str]) -> Optional["Fieldset"]:
+        """Parse a comma-separated ``fields`` value; None selects every field."""
+        if fields is None or not fields.strip():
+            return None
+
+        paths = []
+        unknown = []
+        for raw_path in fields.split(","):
+            raw_path = raw_path.strip()
+            if not raw_path:
+                continue
+            path = tuple(raw_path.split("."))
+            current = model
+            for name in path:
+                if current is None or name not in current.model_fields:
+                    unknown.append(raw_path)
+                    break
+                current = _nested_model(current.model_fields[name].annotation)
+            else:
+                if path not in paths:
+                    paths.append(path)
+
+        if unknown:
+            raise InvalidFieldsError(f"Unknown fields: {', '.join(unknown)}")
+        return cls(model, paths)
+
+    def field_paths(self) -> List[str]:
+        """Firestore field mask for the selected fields."""
+        mask = set()
+        for path in self.paths:
+            if path == ("id",):
+                continue
+            current = self.model
+            alternatives = []
+            for name in path:
+                alternatives.append(_stored_names(current, name))
+                current = _nested_model(current.model_fields[name].annotation)
+            mask.update(".".join(names) for names in product(*alternatives))
+        return sorted(mask)
+
+    def dump(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate and dump only the selected fields of a document."""
+        result = {}
+        if "id" in self.model.model_fields and "id" in data:
+            result["id"] = data["id"]
+        for path in self.paths:
+            self._dump_path(self.model, data, path, result)
+        return result
+
+    def _dump_path(self, model: Type[BaseModel], data: Dict[str, Any], path: FieldPath, out: Dict[str, Any]):
+        name, rest = path[0], path[1:]
+        value = _stored_value(model, name, data)
+
+        if rest:
+            if not isinstance(value, dict):
+                out.setdefault(name, None)
+                return
+            if not isinstance(out.get(name), dict):
+                out[name] = {}
+            nested = _nested_model(model.model_fields[name].annotation)
+            self._dump_path(nested, value, rest, out[name])
+            return
+
+        if value is _MISSING:
+            field = model.model_fields[name]
+            value = None if field.is_required() else field.get_default(call_default_factory=True)
+        if value is None:
+            out[name] = None
+            return
+        adapter = _field_adapter(model, name)
+        out[name] = adapter.dump_python(adapter.validate_python(value))
+
+
+def fieldset_query(model: Type[BaseModel]):
+    """Dependency parsing a ``fields`` query parameter for ``model``."""
+    def get_fieldset(
+        fields: Optional[str] = Query(
+            None,
+            description="Comma-separated fields to return, dotted for nested fields"
+        )
+    ) -> Optional[Fieldset]:
+        try:
+            return Fieldset.parse(model, fields)
+        except InvalidFieldsError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return get_fieldset
@@ -0,0 +1,28 @@
+"""Opaque cursors for paginated Firestore queries."""
+
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(created_at: datetime, doc_id: str) -> str:
+    """Encode the position after a document ordered by creation time."""
+    payload = json.dumps([created_at.isoformat(), doc_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode a cursor made by ``encode_cursor``."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, doc_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(doc_id, str) or not doc_id:
+            raise ValueError("cursor has no document ID")
+        return datetime.fromisoformat(created_at), doc_id
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {str(e)}")
@@ -0,0 +1,99 @@
+"""JSON responses serialized straight from models to bytes.
+
+FastAPI runs ``jsonable_encoder`` over anything a handler returns that is
+not already a response, so handlers return ``ModelJSONResponse`` themselves.
+Models are dumped by pydantic-core; plain data (fieldset dumps, cached
+metrics) goes through orjson, or the stdlib json module if orjson is not
+installed. Timestamps are written as ISO 8601 with ``Z`` for UTC either way.
+"""
+
+import json
+from datetime import datetime
+from typing import Any, Mapping, Optional
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+from starlette.background import BackgroundTask
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Lets orjson embed a model's own JSON (orjson 3.9+)
+_Fragment = getattr(orjson, "Fragment", None)
+
+
+def _model_json(model: BaseModel) -> bytes:
+    # What model_dump_json does, without decoding the bytes to str
+    return model.__pydantic_serializer__.to_json(model)
+
+
+def _isoformat(value: datetime) -> str:
+    text = value.isoformat()
+    if value.utcoffset() is not None and not value.utcoffset():
+        text = text[:-6] + "Z"
+    return text
+
+
+def _orjson_default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        if _Fragment is not None:
+            return _Fragment(_model_json(value))
+        return value.model_dump(mode="json")
+    if isinstance(value, datetime):
+        # Firestore timestamps are datetime subclasses, which orjson does not take
+        return _isoformat(value)
+    return jsonable_encoder(value)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, datetime):
+        return _isoformat(value)
+    return jsonable_encoder(value)
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize plain data that may contain models and datetimes."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_orjson_default, option=orjson.OPT_UTC_Z)
+    return json.dumps(
+        content,
+        default=_json_default,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class ModelJSONResponse(JSONResponse):
+    """JSON response rendering models, adapter-typed values and plain data.
+    
+    Pass ``adapter`` for lists of models, e.g. a module-level
+    ``TypeAdapter(List[CommunityPost])``, so the whole list is dumped by
+    one precompiled serializer.
+    """
+    
+    def __init__(
+        self,
+        content: Any,
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+        media_type: Optional[str] = None,
+        background: Optional[BackgroundTask] = None,
+        adapter: Optional[TypeAdapter] = None,
+    ):
+        self.adapter = adapter
+        super().__init__(content, status_code, headers, media_type, background)
+    
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        if self.adapter is not None:
+            return self.adapter.dump_json(content)
+        if isinstance(content, BaseModel):
+            return _model_json(content)
+        return dumps(content)
@@ -0,0 +1,59 @@
+"""Loading Firestore documents into models (``MODEL_VALIDATION_MODE``).
+
+Every document is validated. In ``sampled`` mode one read in
+``MODEL_VALIDATION_SAMPLE_RATE`` is also compared with what was stored, and
+documents that validation changes (coerced values, ``None`` turned into
+defaults) are logged, so bad data can be fixed at the source.
+"""
+
+import logging
+import random
+from typing import Any, Dict, List, Type, TypeVar
+
+from pydantic import BaseModel
+
+from .config import settings
+
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+_MISSING = object()
+
+
+def _stored_value(model: Type[BaseModel], name: str, data: Dict[str, Any]) -> Any:
+    alias = model.model_fields[name].alias
+    for stored_name in ((alias, name) if alias else (name,)):
+        if stored_name in data:
+            return data[stored_name]
+    return _MISSING
+
+
+def changed_fields(instance: BaseModel, data: Dict[str, Any], prefix: str = "") -> List[str]:
+    """Dotted paths of the stored fields whose validated value differs."""
+    changed = []
+    for name in type(instance).model_fields:
+        stored = _stored_value(type(instance), name, data)
+        if stored is _MISSING:
+            continue
+        value = getattr(instance, name)
+        if isinstance(value, BaseModel) and isinstance(stored, dict):
+            changed.extend(changed_fields(value, stored, f"{prefix}{name}."))
+        elif value != stored:
+            changed.append(f"{prefix}{name}")
+    return changed
+
+
+def load_model(model: Type[ModelT], data: Dict[str, Any]) -> ModelT:
+    """Validate a Firestore document into ``model``, logging drift on sampled reads."""
+    instance = model.model_validate(data)
+    if (
+        settings.MODEL_VALIDATION_MODE == "sampled"
+        and random.randrange(max(settings.MODEL_VALIDATION_SAMPLE_RATE, 1)) == 0
+    ):
+        changed = changed_fields(instance, data)
+        if changed:
+            logging.warning(
+                f"Model validation drift: {model.__name__} {data.get('id')} is changed by "
+                f"validation in {', '.join(changed)}"
+            )
+    return instance
@@ -0,0 +1,56 @@
+"""Shared pytest fixtures."""
+
+import pytest
+from unittest.mock import patch, AsyncMock
+
+
+@pytest.fixture
+def amplitude_settings():
+    """Patch Amplitude settings with test credentials and no persistent cache."""
+    with patch('src.coworkly_partner_api.services.amplitude_service.settings') as mock_settings, \
+         patch('src.coworkly_partner_api.services.amplitude_service.create_response_cache', return_value=None):
+        mock_settings.AMPLITUDE_API_KEY = "test-api-key"
+        mock_settings.AMPLITUDE_SECRET_KEY = "test-secret-key"
+        mock_settings.AMPLITUDE_BASE_URL = "https://amplitude.com/api/2/segmentation"
+        mock_settings.AMPLITUDE_MAX_CONCURRENCY = 8
+        mock_settings.AMPLITUDE_POOL_SIZE = 10
+        mock_settings.AMPLITUDE_KEEPALIVE_EXPIRY_SECONDS = 60
+        mock_settings.AMPLITUDE_CONNECT_TIMEOUT_SECONDS = 5
+        mock_settings.AMPLITUDE_READ_TIMEOUT_SECONDS = 30
+        mock_settings.AMPLITUDE_DAY_CACHE_MAX_ENTRIES = 1000
+        mock_settings.AMPLITUDE_RATE_LIMIT_PER_SECOND = 1000
+        mock_settings.AMPLITUDE_RATE_LIMIT_BURST = 100
+        mock_settings.AMPLITUDE_MAX_RETRIES = 2
+        mock_settings.AMPLITUDE_BACKOFF_BASE_SECONDS = 0
+        mock_settings.AMPLITUDE_BACKOFF_MAX_SECONDS = 1
+        mock_settings.AMPLITUDE_CIRCUIT_FAILURE_THRESHOLD = 2
+        mock_settings.AMPLITUDE_CIRCUIT_RESET_SECONDS = 30
+        mock_settings.AMPLITUDE_RESPONSE_CACHE_CLOSED_TTL_SECONDS = 3600
+        mock_settings.AMPLITUDE_RESPONSE_CACHE_OPEN_TTL_SECONDS = 60
+        mock_settings.FERNET_KEY = "test-fernet-key"
+        yield mock_settings
+
+
+@pytest.fixture
+def mock_amplitude_get():
+    """Mock the HTTP GET issued by the async Amplitude client."""
+    with patch(
+        'src.coworkly_partner_api.services.amplitude_service.httpx.AsyncClient.get',
+        new_callable=AsyncMock
+    ) as mock_get:
+        yield mock_get
+
+
+@pytest.fixture(autouse=True)
+def clear_process_caches():
+    """Start every test with empty in-process response, token and feature caches."""
+    from src.coworkly_partner_api.services.metrics_cache import dashboard_metrics_cache
+    from src.coworkly_partner_api.services.auth import token_cache
+    from src.coworkly_partner_api.services.feature_catalogue import feature_catalogue
+    dashboard_metrics_cache.clear()
+    token_cache.clear()
+    feature_catalogue.clear()
+    yield
+    dashboard_metrics_cache.clear()
+    token_cache.clear()
+    feature_catalogue.clear()
@@ -0,0 +1,141 @@
+"""In-memory fake of the Firestore clients, with snapshot listeners."""
+
+import threading
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from google.api_core.exceptions import FailedPrecondition, NotFound
+
+from src.coworkly_partner_api.services.firestore import merge_update
+
+
+class FakeSnapshot:
+    """Document snapshot as returned by reads and listeners."""
+    
+    def __init__(self, reference, data, update_time, read_time):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = data is not None
+        self._data = data
+        self.update_time = update_time
+        self.read_time = read_time
+    
+    def to_dict(self):
+        return dict(self._data) if self._data is not None else None
+
+
+class FakeWatch:
+    """Listener handle returned by ``on_snapshot``."""
+    
+    def __init__(self, firestore, key, callback):
+        self._firestore = firestore
+        self.key = key
+        self.callback = callback
+        self.is_active = True
+    
+    def unsubscribe(self):
+        self.is_active = False
+        self._firestore.remove_listener(self)
+
+
+class FakeDocumentReference:
+    """Document reference supporting both async reads/writes and listeners."""
+    
+    def __init__(self, firestore, collection, doc_id):
+        self._firestore = firestore
+        self.id = doc_id
+        self.parent = SimpleNamespace(id=collection)
+        self.key = (collection, doc_id)
+    
+    async def get(self, field_paths=None):
+        self._firestore.reads += 1
+        return self._firestore.snapshot(self)
+    
+    async def update(self, field_updates, option=None):
+        return self._firestore.update(self, field_updates, option)
+    
+    def on_snapshot(self, callback):
+        return self._firestore.add_listener(self, callback)
+
+
+class FakeFirestore:
+    """Stores documents in memory and notifies listeners synchronously.
+    
+    ``reads`` and ``writes`` count the RPCs a real client would make.
+    """
+    
+    def __init__(self):
+        self.documents = {}
+        self.update_times = {}
+        self.listeners = []
+        self.reads = 0
+        self.writes = 0
+        self._clock = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        self._lock = threading.RLock()
+    
+    def _tick(self):
+        self._clock += timedelta(microseconds=1)
+        return self._clock
+    
+    def collection(self, name):
+        return SimpleNamespace(document=lambda doc_id: FakeDocumentReference(self, name, doc_id))
+    
+    def snapshot(self, reference):
+        with self._lock:
+            return FakeSnapshot(
+                reference,
+                self.documents.get(reference.key),
+                self.update_times.get(reference.key),
+                self._tick()
+            )
+    
+    def set(self, collection, doc_id, data):
+        """Write a document as another instance would, notifying listeners."""
+        with self._lock:
+            key = (collection, doc_id)
+            self.documents[key] = dict(data)
+            self.update_times[key] = self._tick()
+            self._notify(key)
+            return self.update_times[key]
+    
+    def delete(self, collection, doc_id):
+        with self._lock:
+            key = (collection, doc_id)
+            self.documents.pop(key, None)
+            self.update_times.pop(key, None)
+            self._notify(key)
+    
+    def update(self, reference, field_updates, option=None):
+        with self._lock:
+            self.writes += 1
+            if reference.key not in self.documents:
+                raise NotFound("No document to update")
+            last_update_time = getattr(option, "_last_update_time", None)
+            if last_update_time is not None and last_update_time != self.update_times[reference.key]:
+                raise FailedPrecondition("Document was modified")
+            data = merge_update(self.documents[reference.key], field_updates)
+            self.documents[reference.key] = data
+            self.update_times[reference.key] = self._tick()
+            self._notify(reference.key)
+            return SimpleNamespace(update_time=self.update_times[reference.key])
+    
+    def add_listener(self, reference, callback):
+        with self._lock:
+            watch = FakeWatch(self, reference.key, callback)
+            self.listeners.append(watch)
+            self._push(watch, reference)
+            return watch
+    
+    def remove_listener(self, watch):
+        with self._lock:
+            if watch in self.listeners:
+                self.listeners.remove(watch)
+    
+    def _notify(self, key):
+        for watch in list(self.listeners):
+            if watch.key == key and watch.is_active:
+                self._push(watch, FakeDocumentReference(self, *key))
+    
+    def _push(self, watch, reference):
+        snapshot = self.snapshot(reference)
+        watch.callback([snapshot] if snapshot.exists else [], [], snapshot.read_time)
@@ -0,0 +1,37 @@
+"""Helpers for mocking the async Firestore client in tests."""
+
+from unittest.mock import Mock, AsyncMock
+
+
+def async_stream(docs):
+    """Build the async iterator returned by ``AsyncQuery.stream``."""
+    async def stream():
+        for doc in docs:
+            yield doc
+    return stream()
+
+
+def mock_snapshot(doc_id, data=None, exists=True):
+    """Build a mock document snapshot."""
+    snapshot = Mock()
+    snapshot.id = doc_id
+    snapshot.exists = exists
+    snapshot.to_dict.return_value = dict(data) if data is not None else None
+    return snapshot
+
+
+def mock_document(snapshot=None):
+    """Build a mock async document reference whose get returns ``snapshot``."""
+    document = Mock()
+    document.get = AsyncMock(return_value=snapshot)
+    document.set = AsyncMock()
+    document.update = AsyncMock()
+    document.delete = AsyncMock()
+    return document
+
+
+def mock_async_db(collections):
+    """Build a mock AsyncClient from a ``{name: collection_mock}`` mapping."""
+    db = Mock()
+    db.collection.side_effect = lambda name: collections[name]
+    return db
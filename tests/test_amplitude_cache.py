@@ -0,0 +1,118 @@
+"""Tests for the persistent Amplitude response cache."""
+
+import time
+import pytest
+from datetime import datetime
+from unittest.mock import patch
+
+from src.coworkly_partner_api.services.amplitude_cache import ResponseCache, SQLiteResponseCache
+from src.coworkly_partner_api.services.amplitude_service import AmplitudeService
+from tests.test_dashboard_metrics import amplitude_response
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    """Path of a fresh SQLite cache file."""
+    return str(tmp_path / "amplitude_cache.sqlite3")
+
+
+class TestSQLiteResponseCache:
+    """Test cases for the SQLite response cache."""
+    
+    def test_interface_is_abstract(self):
+        """Test that caches must implement get and set."""
+        class PartialCache(ResponseCache):
+            def get(self, key):
+                return None
+        
+        with pytest.raises(TypeError):
+            ResponseCache()
+        with pytest.raises(TypeError):
+            PartialCache()
+    
+    def test_set_and_get(self, cache_path):
+        """Test storing and reading back a response."""
+        cache = SQLiteResponseCache(cache_path, max_entries=10)
+        cache.set("key", {"data": {"series": [[1, 2]]}}, ttl=60)
+        
+        assert cache.get("key") == {"data": {"series": [[1, 2]]}}
+        assert cache.get("missing") is None
+    
+    def test_expired_entries_are_misses(self, cache_path):
+        """Test that entries past their TTL are not served."""
+        cache = SQLiteResponseCache(cache_path, max_entries=10)
+        cache.set("key", {"data": {}}, ttl=60)
+        
+        with patch('src.coworkly_partner_api.services.amplitude_cache.time.time', return_value=time.time() + 61):
+            assert cache.get("key") is None
+        assert len(cache) == 0
+    
+    def test_least_recently_used_entries_are_evicted(self, cache_path):
+        """Test that the cache stays within its size bound."""
+        cache = SQLiteResponseCache(cache_path, max_entries=2)
+        cache.set("a", {"n": 1}, ttl=60)
+        time.sleep(0.01)
+        cache.set("b", {"n": 2}, ttl=60)
+        time.sleep(0.01)
+        cache.get("a")
+        time.sleep(0.01)
+        cache.set("c", {"n": 3}, ttl=60)
+        
+        assert len(cache) == 2
+        assert cache.get("b") is None
+        assert cache.get("a") == {"n": 1}
+        assert cache.get("c") == {"n": 3}
+    
+    def test_cache_survives_reopening(self, cache_path):
+        """Test that a new process can read what a previous one cached."""
+        SQLiteResponseCache(cache_path, max_entries=10).set("key", {"n": 1}, ttl=60)
+        
+        assert SQLiteResponseCache(cache_path, max_entries=10).get("key") == {"n": 1}
+
+
+class TestAmplitudeServiceResponseCache:
+    """Test cases for the response cache plugged into AmplitudeService."""
+    
+    @pytest.mark.asyncio
+    async def test_fresh_service_answers_from_persistent_cache(
+        self, 
+        amplitude_settings, 
+        mock_amplitude_get, 
+        cache_path
+    ):
+        """Test that a freshly started service reuses responses cached on disk."""
+        mock_amplitude_get.return_value = amplitude_response(
+            [[1, 2]], 
+            x_values=["2024-01-01", "2024-01-02"]
+        )
+        
+        first = AmplitudeService(response_cache=SQLiteResponseCache(cache_path, max_entries=10))
+        assert await first.get_event_metrics(
+            "test-space-id", "test-event", datetime(2024, 1, 1), datetime(2024, 1, 2)
+        ) == 3
+        
+        # A new instance has an empty in-memory day cache
+        second = AmplitudeService(response_cache=SQLiteResponseCache(cache_path, max_entries=10))
+        assert await second.get_event_metrics(
+            "test-space-id", "test-event", datetime(2024, 1, 1), datetime(2024, 1, 2)
+        ) == 3
+        
+        assert mock_amplitude_get.call_count == 1
+        assert second.get_stats()["response_cache_hits"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_ranges_touching_today_use_short_ttl(
+        self, 
+        amplitude_settings, 
+        mock_amplitude_get, 
+        cache_path
+    ):
+        """Test that open ranges are cached with the short TTL."""
+        mock_amplitude_get.return_value = amplitude_response([[1]])
+        cache = SQLiteResponseCache(cache_path, max_entries=10)
+        
+        service = AmplitudeService(response_cache=cache)
+        with patch.object(cache, 'set', wraps=cache.set) as mock_set:
+            await service.get_event_metrics("test-space-id", "test-event", datetime.now(), datetime.now())
+        
+        assert mock_set.call_args[0][2] == amplitude_settings.AMPLITUDE_RESPONSE_CACHE_OPEN_TTL_SECONDS
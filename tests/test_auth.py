@@ -0,0 +1,358 @@
+"""Tests for authentication services."""
+
+import pytest
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock, AsyncMock, patch
+
+import jwt
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from fastapi import HTTPException
+
+from src.coworkly_partner_api.services import auth as auth_module
+from src.coworkly_partner_api.services.auth import (
+    VerifiedTokenCache,
+    hash_token,
+    verify_firebase_token,
+    get_partner_context,
+    get_user_info,
+)
+from src.coworkly_partner_api.services.token_verifier import (
+    FirebaseTokenVerifier,
+    TokenVerificationError,
+    parse_max_age,
+    token_verifier,
+)
+
+
+PROJECT_ID = "test-project"
+
+
+def profile_snapshot(status="active", exists=True, space_ids=("space1",)):
+    """Build a mock partner profile document."""
+    snapshot = Mock()
+    snapshot.exists = exists
+    snapshot.to_dict.return_value = {"status": status, "spaceIds": list(space_ids)}
+    return snapshot
+
+
+@pytest.fixture
+def mock_verify_id_token():
+    """Mock Firebase ID token verification."""
+    with patch.object(token_verifier, 'verify', new_callable=AsyncMock) as mock:
+        mock.return_value = {
+            "uid": "test-user-id",
+            "email": "partner@example.com",
+            "exp": time.time() + 3600
+        }
+        yield mock
+
+
+@pytest.fixture(scope="module")
+def signing_key():
+    """Local stand-in for Google's token signing key and certificate."""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "securetoken.test")])
+    now = datetime.now(timezone.utc)
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(private_key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(days=1))
+        .not_valid_after(now + timedelta(days=1))
+        .sign(private_key, hashes.SHA256())
+    )
+    pem = certificate.public_bytes(serialization.Encoding.PEM).decode()
+    return private_key, pem
+
+
+def certs_response(certs, max_age=3600, status_code=200):
+    """Build a mock response of the securetoken certificate endpoint."""
+    mock_response = Mock()
+    mock_response.status_code = status_code
+    mock_response.json.return_value = certs
+    mock_response.headers = {"cache-control": f"public, max-age={max_age}, must-revalidate"}
+    return mock_response
+
+
+def make_token(private_key, kid="key-1", **overrides):
+    """Sign an ID token the way Firebase Auth does."""
+    now = int(time.time())
+    claims = {
+        "iss": f"https://securetoken.google.com/{PROJECT_ID}",
+        "aud": PROJECT_ID,
+        "sub": "test-user-id",
+        "auth_time": now - 60,
+        "iat": now - 60,
+        "exp": now + 3600,
+        "email": "partner@example.com",
+    }
+    claims.update(overrides)
+    return jwt.encode(claims, private_key, algorithm="RS256", headers={"kid": kid})
+
+
+@pytest.fixture
+def mock_certs_get(signing_key):
+    """Mock the HTTP GET of the signing certificates."""
+    with patch(
+        'src.coworkly_partner_api.services.token_verifier.httpx.AsyncClient.get',
+        new_callable=AsyncMock
+    ) as mock_get:
+        mock_get.return_value = certs_response({"key-1": signing_key[1]})
+        yield mock_get
+
+
+@pytest.fixture
+def mock_profile_get():
+    """Mock the partner profile read made during authorization."""
+    with patch('src.coworkly_partner_api.services.firestore.get_async_firestore_client') as mock:
+        profile_get = AsyncMock(return_value=profile_snapshot())
+        mock.return_value.collection.return_value.document.return_value.get = profile_get
+        yield profile_get
+
+
+class TestVerifiedTokenCache:
+    """Test cases for the verified-token cache."""
+    
+    def test_claims_cached_until_expiry(self):
+        """Test that claims are dropped once the token expires."""
+        cache = VerifiedTokenCache(max_entries=10, status_ttl=60)
+        cache.set_claims("a", {"uid": "u1", "exp": time.time() + 60})
+        cache.set_claims("b", {"uid": "u2", "exp": time.time() - 1})
+        
+        assert cache.get_claims("a")["uid"] == "u1"
+        assert cache.get_claims("b") is None
+        
+        with patch.object(auth_module.time, 'time', return_value=time.time() + 120):
+            assert cache.get_claims("a") is None
+    
+    def test_profile_expires_before_claims(self):
+        """Test that the partner profile uses the shorter TTL."""
+        cache = VerifiedTokenCache(max_entries=10, status_ttl=30)
+        now = time.time()
+        profile = {"status": "active", "spaceIds": ["space1"]}
+        cache.set_claims("a", {"uid": "u1", "exp": now + 3600})
+        cache.set_profile("a", profile)
+        
+        assert cache.get_profile("a") == (True, profile)
+        with patch.object(auth_module.time, 'time', return_value=now + 60):
+            assert cache.get_profile("a") == (False, None)
+            assert cache.get_claims("a") is not None
+    
+    def test_least_recently_used_evicted(self):
+        """Test that the cache stays within its bound."""
+        cache = VerifiedTokenCache(max_entries=2, status_ttl=60)
+        exp = time.time() + 60
+        cache.set_claims("a", {"uid": "u1", "exp": exp})
+        cache.set_claims("b", {"uid": "u2", "exp": exp})
+        cache.get_claims("a")
+        cache.set_claims("c", {"uid": "u3", "exp": exp})
+        
+        assert len(cache) == 2
+        assert cache.get_claims("b") is None
+        assert cache.get_claims("a") is not None
+    
+    def test_hash_token_does_not_keep_raw_token(self):
+        """Test that cache keys are digests of the token."""
+        assert hash_token("secret-token") != "secret-token"
+        assert hash_token("secret-token") == hash_token("secret-token")
+
+
+class TestVerifyFirebaseToken:
+    """Test cases for verify_firebase_token."""
+    
+    @pytest.mark.asyncio
+    async def test_repeat_calls_skip_verification_and_profile_read(
+        self, mock_verify_id_token, mock_profile_get
+    ):
+        """Test that a repeated token is served from the cache."""
+        for _ in range(5):
+            assert await verify_firebase_token("Bearer test-token") == "test-user-id"
+        
+        mock_verify_id_token.assert_called_once_with("test-token")
+        mock_profile_get.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_partner_context_exposes_profile(self, mock_verify_id_token, mock_profile_get):
+        """Test that the partner context carries the profile loaded for authorization."""
+        partner = await get_partner_context("Bearer test-token")
+        
+        assert partner.uid == "test-user-id"
+        assert partner.email == "partner@example.com"
+        assert partner.status == "active"
+        assert partner.spaceIds == ["space1"]
+        mock_profile_get.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_get_user_info_shares_cached_claims(self, mock_verify_id_token, mock_profile_get):
+        """Test that user info reuses claims verified for another route."""
+        await verify_firebase_token("Bearer test-token")
+        user_info = await get_user_info("Bearer test-token")
+        
+        assert user_info == {"uid": "test-user-id", "email": "partner@example.com"}
+        mock_verify_id_token.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_inactive_partner_rejected_from_cache(self, mock_verify_id_token, mock_profile_get):
+        """Test that a cached inactive status is still rejected."""
+        mock_profile_get.return_value = profile_snapshot(status="suspended")
+        
+        for _ in range(2):
+            with pytest.raises(HTTPException) as exc_info:
+                await verify_firebase_token("Bearer test-token")
+            assert exc_info.value.status_code == 401
+            assert "Partner space required" in exc_info.value.detail
+        
+        mock_profile_get.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_register_after_rejected_call(self, mock_verify_id_token, mock_profile_get):
+        """Test that a missing profile is not cached, so registering takes effect at once."""
+        mock_profile_get.return_value = profile_snapshot(exists=False)
+        with pytest.raises(HTTPException) as exc_info:
+            await get_partner_context("Bearer test-token")
+        assert "User profile not found" in exc_info.value.detail
+        
+        mock_profile_get.return_value = profile_snapshot()
+        partner = await get_partner_context("Bearer test-token")
+        
+        assert partner.spaceIds == ["space1"]
+        assert mock_profile_get.call_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_invalid_token_not_cached(self, mock_verify_id_token):
+        """Test that failed verifications are retried on the next call."""
+        mock_verify_id_token.side_effect = ValueError("bad signature")
+        
+        for _ in range(2):
+            with pytest.raises(HTTPException) as exc_info:
+                await verify_firebase_token("Bearer invalid-token")
+            assert exc_info.value.status_code == 401
+        
+        assert mock_verify_id_token.call_count == 2
+
+
+class TestFirebaseTokenVerifier:
+    """Test cases for the async Firebase ID token verifier."""
+    
+    @pytest.mark.asyncio
+    async def test_verify_valid_token(self, signing_key, mock_certs_get):
+        """Test that a correctly signed token is verified."""
+        verifier = FirebaseTokenVerifier(project_id=PROJECT_ID)
+        
+        claims = await verifier.verify(make_token(signing_key[0]))
+        
+        assert claims["uid"] == "test-user-id"
+        assert claims["email"] == "partner@example.com"
+    
+    @pytest.mark.asyncio
+    async def test_keys_fetched_once_for_many_tokens(self, signing_key, mock_certs_get):
+        """Test that concurrent verifications share one certificate fetch."""
+        verifier = FirebaseTokenVerifier(project_id=PROJECT_ID)
+        tokens = [make_token(signing_key[0], sub=f"user-{i}") for i in range(5)]
+        
+        results = await asyncio.gather(*(verifier.verify(token) for token in tokens))
+        
+        assert [claims["uid"] for claims in results] == [f"user-{i}" for i in range(5)]
+        mock_certs_get.assert_called_once()
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("overrides", [
+        {"aud": "other-project"},
+        {"iss": "https://securetoken.google.com/other-project"},
+        {"exp": int(time.time()) - 10},
+        {"sub": ""},
+        {"auth_time": int(time.time()) + 3600},
+    ])
+    async def test_invalid_claims_rejected(self, signing_key, mock_certs_get, overrides):
+        """Test that tokens with wrong claims are rejected."""
+        verifier = FirebaseTokenVerifier(project_id=PROJECT_ID)
+        
+        with pytest.raises(TokenVerificationError):
+            await verifier.verify(make_token(signing_key[0], **overrides))
+    
+    @pytest.mark.asyncio
+    async def test_wrong_signature_rejected(self, signing_key, mock_certs_get):
+        """Test that a token signed by another key is rejected."""
+        verifier = FirebaseTokenVerifier(project_id=PROJECT_ID)
+        other_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        
+        with pytest.raises(TokenVerificationError):
+            await verifier.verify(make_token(other_key))
+    
+    @pytest.mark.asyncio
+    async def test_malformed_token_rejected_without_fetch(self, mock_certs_get):
+        """Test that garbage tokens are rejected before any network I/O."""
+        verifier = FirebaseTokenVerifier(project_id=PROJECT_ID)
+        
+        with pytest.raises(TokenVerificationError):
+            await verifier.verify("invalid-token")
+        mock_certs_get.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_unknown_kid_refreshes_keys(self, signing_key, mock_certs_get):
+        """Test that a rotated key is picked up with one extra fetch."""
+        verifier = FirebaseTokenVerifier(project_id=PROJECT_ID)
+        mock_certs_get.return_value = certs_response({"old-key": signing_key[1]})
+        await verifier.refresh_keys()
+        mock_certs_get.return_value = certs_response({"key-2": signing_key[1]})
+        
+        claims = await verifier.verify(make_token(signing_key[0], kid="key-2"))
+        
+        assert claims["uid"] == "test-user-id"
+        assert mock_certs_get.call_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_unknown_kid_refreshes_rate_limited(self, signing_key, mock_certs_get):
+        """Test that made-up key IDs force at most one fetch per interval."""
+        verifier = FirebaseTokenVerifier(project_id=PROJECT_ID)
+        await verifier.refresh_keys()
+        
+        for i in range(5):
+            with pytest.raises(TokenVerificationError):
+                await verifier.verify(make_token(signing_key[0], kid=f"made-up-{i}"))
+        
+        assert mock_certs_get.call_count == 2
+        assert verifier.stats["forced_refreshes"] == 1
+        
+        verifier.min_refresh_interval = 0
+        with pytest.raises(TokenVerificationError):
+            await verifier.verify(make_token(signing_key[0], kid="made-up"))
+        assert mock_certs_get.call_count == 3
+    
+    @pytest.mark.asyncio
+    async def test_keys_refreshed_in_background_before_expiry(self, signing_key, mock_certs_get):
+        """Test that keys close to expiry are served while refreshing."""
+        verifier = FirebaseTokenVerifier(project_id=PROJECT_ID)
+        mock_certs_get.return_value = certs_response({"key-1": signing_key[1]}, max_age=10)
+        await verifier.refresh_keys()
+        
+        claims = await verifier.verify(make_token(signing_key[0]))
+        await asyncio.sleep(0)
+        
+        assert claims["uid"] == "test-user-id"
+        assert verifier.stats["background_refreshes"] == 1
+        assert mock_certs_get.call_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_expired_keys_used_when_refresh_fails(self, signing_key, mock_certs_get):
+        """Test that an unreachable certificate endpoint does not reject valid tokens."""
+        verifier = FirebaseTokenVerifier(project_id=PROJECT_ID)
+        mock_certs_get.return_value = certs_response({"key-1": signing_key[1]}, max_age=0)
+        await verifier.refresh_keys()
+        mock_certs_get.return_value = certs_response({}, status_code=503)
+        
+        claims = await verifier.verify(make_token(signing_key[0]))
+        
+        assert claims["uid"] == "test-user-id"
+    
+    def test_parse_max_age(self):
+        """Test parsing of the certificate Cache-Control header."""
+        assert parse_max_age("public, max-age=19742, must-revalidate") == 19742
+        assert parse_max_age(None) == 3600
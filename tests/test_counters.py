@@ -0,0 +1,88 @@
+"""Tests for sharded post counters."""
+
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import Mock, AsyncMock
+from google.api_core.exceptions import NotFound
+
+from src.coworkly_partner_api.services.counters import (
+    aggregate_counts,
+    rollup_post_counters,
+    rollup_counters_since,
+)
+from tests.firestore_mocks import async_stream, mock_snapshot, mock_document
+
+
+def post_with_shards(post_data, shards):
+    """Mock a post reference whose counter_shards collection holds ``shards``."""
+    post_ref = mock_document(mock_snapshot('post1', post_data, exists=post_data is not None))
+    post_ref.path = 'posts/post1'
+    shards = dict(shards)
+    
+    def document(shard_id):
+        shard_ref = Mock()
+        
+        async def create(data):
+            shards[shard_id] = data
+        
+        shard_ref.create = AsyncMock(side_effect=create)
+        return shard_ref
+    
+    post_ref.collection.return_value.stream.side_effect = lambda: async_stream([
+        mock_snapshot(shard_id, data) for shard_id, data in shards.items()
+    ])
+    post_ref.collection.return_value.document.side_effect = document
+    post_ref.shards = shards
+    return post_ref
+
+
+class TestCounters:
+    """Test cases for counter aggregation and rollup."""
+    
+    def test_aggregate_counts(self):
+        totals = {'likes_count': 3, 'comments_count': 1}
+        
+        assert aggregate_counts({'likes_count': 5}, totals, has_base=False) == {'likes_count': 8, 'comments_count': 1}
+        assert aggregate_counts({'likes_count': 5}, totals, has_base=True) == totals
+    
+    @pytest.mark.asyncio
+    async def test_first_rollup_keeps_stored_counts(self):
+        """Test that the counts a post had are moved into the base shard once."""
+        post_ref = post_with_shards({'likes_count': 5}, {'0': {'likes_count': 2}, '3': {'likes_count': -1}})
+        
+        assert await rollup_post_counters(post_ref) == {'likes_count': 6, 'comments_count': 0}
+        assert post_ref.shards['base'] == {'likes_count': 5, 'comments_count': 0}
+        post_ref.update.assert_awaited_once_with({'likes_count': 6, 'comments_count': 0})
+        
+        # The post now holds the total, which must not be counted again
+        post_ref.get.return_value = mock_snapshot('post1', {'likes_count': 6})
+        assert await rollup_post_counters(post_ref) == {'likes_count': 6, 'comments_count': 0}
+    
+    @pytest.mark.asyncio
+    async def test_rollup_deleted_post(self):
+        post_ref = post_with_shards(None, {'0': {'likes_count': 1}})
+        
+        assert await rollup_post_counters(post_ref) is None
+        post_ref.update.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_rollup_recently_changed_posts(self):
+        """Test that each post with changed shards is rolled up once."""
+        post_ref = post_with_shards({}, {'0': {'likes_count': 1}, '1': {'likes_count': 1}})
+        gone_ref = post_with_shards({}, {})
+        gone_ref.path = 'posts/gone'
+        gone_ref.update.side_effect = NotFound("deleted")
+        shards = []
+        for shard_post in (post_ref, post_ref, gone_ref):
+            shard = Mock()
+            shard.reference.parent.parent = shard_post
+            shards.append(shard)
+        db = Mock()
+        db.collection_group.return_value.where.return_value.stream.side_effect = lambda: async_stream(shards)
+        since = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        
+        summary = await rollup_counters_since(db, since)
+        
+        assert summary == {"posts": 2, "rolled_up": 1, "deleted": 1, "failed": 0}
+        db.collection_group.assert_called_once_with('counter_shards')
+        db.collection_group.return_value.where.assert_called_once_with('updated_at', '>=', since)
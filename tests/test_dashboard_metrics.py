@@ -1,13 +1,25 @@
 """Tests for dashboard metrics API."""
 
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+import asyncio
+import json
+from unittest.mock import Mock, patch, MagicMock, AsyncMock, call
 from fastapi.testclient import TestClient
 from firebase_admin import firestore
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
 from src.coworkly_partner_api.app import app
-from src.coworkly_partner_api.services.amplitude_service import AmplitudeService
+from src.coworkly_partner_api.models.partner_profile import PartnerContext
+from tests.firestore_mocks import mock_snapshot, mock_document
+from src.coworkly_partner_api.services.metrics_cache import dashboard_metrics_cache, dashboard_cache_key
+from src.coworkly_partner_api.services.amplitude_service import (
+    AmplitudeService,
+    AmplitudeError,
+    AmplitudeUnavailableError,
+    TokenBucket,
+    parse_retry_after,
+    rollup_daily_series,
+)
 
 
 @pytest.fixture
@@ -16,28 +28,51 @@ def client():
     return TestClient(app)
 
 
+def partner_context_override(space_ids=None):
+    """Build a partner context dependency override."""
+    async def mock_partner_context(authorization: str = None):
+        return PartnerContext(
+            uid="test-user-id",
+            email="partner@example.com",
+            status="active",
+            spaceIds=["test-space-id"] if space_ids is None else space_ids
+        )
+    return mock_partner_context
+
+
 @pytest.fixture
-def mock_verify_firebase_token():
-    """Mock Firebase token verification."""
-    async def mock_verify_firebase_token(authorization: str = None):
-        return "test-user-id"
-    return mock_verify_firebase_token
+def mock_partner_context():
+    """Mock the authenticated partner context."""
+    return partner_context_override()
 
 
 @pytest.fixture
 def mock_firestore():
-    """Mock Firestore client."""
-    with patch('src.coworkly_partner_api.api.dashboard_metrics.get_firestore_client') as mock:
+    """Mock async Firestore client; snapshot documents are missing by default."""
+    with patch('src.coworkly_partner_api.api.dashboard_metrics.get_async_firestore_client') as mock:
         mock_client = Mock()
+        mock_client.collection.return_value.document.return_value = mock_document(
+            mock_snapshot('snapshot', exists=False)
+        )
         mock.return_value = mock_client
         yield mock_client
 
 
+def amplitude_response(series, status_code=200, text="", x_values=None, headers=None):
+    """Build a mock Amplitude segmentation response."""
+    mock_response = Mock()
+    mock_response.status_code = status_code
+    mock_response.text = text
+    mock_response.headers = headers or {}
+    mock_response.json.return_value = {"data": {"series": series, "xValues": x_values or []}}
+    return mock_response
+
+
 @pytest.fixture
 def mock_amplitude_service():
     """Mock Amplitude service."""
     with patch('src.coworkly_partner_api.api.dashboard_metrics.get_amplitude_service') as mock:
-        mock_service = Mock()
+        mock_service = AsyncMock()
         mock.return_value = mock_service
         yield mock_service
 
@@ -50,26 +85,14 @@ class TestDashboardMetrics:
         client, 
         mock_firestore, 
         mock_amplitude_service,
-        mock_verify_firebase_token
+        mock_partner_context
     ):
         """Test successful dashboard metrics retrieval."""
         # Override the dependency for this test
         import src.coworkly_partner_api.api.dashboard_metrics as dashboard_metrics_module
-        app.dependency_overrides[dashboard_metrics_module.verify_firebase_token] = mock_verify_firebase_token
+        app.dependency_overrides[dashboard_metrics_module.get_partner_context] = mock_partner_context
         
         try:
-            # Mock user profile data
-            mock_user_doc = Mock()
-            mock_user_doc.exists = True
-            mock_user_doc.to_dict.return_value = {
-                'id': 'test-user-id',
-                'status': 'active',
-                'spaceIds': ['test-space-id']
-            }
-            mock_user_doc.id = 'test-user-id'
-            
-            mock_firestore.collection.return_value.document.return_value.get.return_value = mock_user_doc
-            
             # Mock Amplitude metrics response
             mock_amplitude_service.get_dashboard_metrics.return_value = {
                 'profileViews': 123,
@@ -100,8 +123,8 @@ class TestDashboardMetrics:
             assert data['reviewsAdded'] == 8
             assert data['externalLinks'] == 15
             
-            # Verify calls
-            mock_firestore.collection.assert_called_once_with('partner_profiles')
+            # Verify calls; the space IDs come from the partner context
+            assert call('partner_profiles') not in mock_firestore.collection.call_args_list
             mock_amplitude_service.get_dashboard_metrics.assert_called_once_with(['test-space-id'], start_date=None, end_date=None)
         finally:
             app.dependency_overrides = {}
@@ -111,26 +134,14 @@ class TestDashboardMetrics:
         client, 
         mock_firestore, 
         mock_amplitude_service,
-        mock_verify_firebase_token
+        mock_partner_context
     ):
         """Test successful dashboard metrics retrieval with date range."""
         # Override the dependency for this test
         import src.coworkly_partner_api.api.dashboard_metrics as dashboard_metrics_module
-        app.dependency_overrides[dashboard_metrics_module.verify_firebase_token] = mock_verify_firebase_token
+        app.dependency_overrides[dashboard_metrics_module.get_partner_context] = mock_partner_context
         
         try:
-            # Mock user profile data
-            mock_user_doc = Mock()
-            mock_user_doc.exists = True
-            mock_user_doc.to_dict.return_value = {
-                'id': 'test-user-id',
-                'status': 'active',
-                'spaceIds': ['test-space-id']
-            }
-            mock_user_doc.id = 'test-user-id'
-            
-            mock_firestore.collection.return_value.document.return_value.get.return_value = mock_user_doc
-            
             # Mock Amplitude metrics response
             mock_amplitude_service.get_dashboard_metrics.return_value = {
                 'profileViews': 50,
@@ -168,26 +179,14 @@ class TestDashboardMetrics:
         self, 
         client, 
         mock_firestore,
-        mock_verify_firebase_token
+        mock_partner_context
     ):
         """Test error when date format is invalid."""
         # Override the dependency for this test
         import src.coworkly_partner_api.api.dashboard_metrics as dashboard_metrics_module
-        app.dependency_overrides[dashboard_metrics_module.verify_firebase_token] = mock_verify_firebase_token
+        app.dependency_overrides[dashboard_metrics_module.get_partner_context] = mock_partner_context
         
         try:
-            # Mock user profile data
-            mock_user_doc = Mock()
-            mock_user_doc.exists = True
-            mock_user_doc.to_dict.return_value = {
-                'id': 'test-user-id',
-                'status': 'active',
-                'spaceIds': ['test-space-id']
-            }
-            mock_user_doc.id = 'test-user-id'
-            
-            mock_firestore.collection.return_value.document.return_value.get.return_value = mock_user_doc
-            
             # Make request with invalid date format
             response = client.get(
                 "/dashboard-metrics/?start_date=2024/01/01",
@@ -204,26 +203,14 @@ class TestDashboardMetrics:
         self, 
         client, 
         mock_firestore,
-        mock_verify_firebase_token
+        mock_partner_context
     ):
         """Test error when start_date is after end_date."""
         # Override the dependency for this test
         import src.coworkly_partner_api.api.dashboard_metrics as dashboard_metrics_module
-        app.dependency_overrides[dashboard_metrics_module.verify_firebase_token] = mock_verify_firebase_token
+        app.dependency_overrides[dashboard_metrics_module.get_partner_context] = mock_partner_context
         
         try:
-            # Mock user profile data
-            mock_user_doc = Mock()
-            mock_user_doc.exists = True
-            mock_user_doc.to_dict.return_value = {
-                'id': 'test-user-id',
-                'status': 'active',
-                'spaceIds': ['test-space-id']
-            }
-            mock_user_doc.id = 'test-user-id'
-            
-            mock_firestore.collection.return_value.document.return_value.get.return_value = mock_user_doc
-            
             # Make request with invalid date range
             response = client.get(
                 "/dashboard-metrics/?start_date=2024-01-31&end_date=2024-01-01",
@@ -236,60 +223,69 @@ class TestDashboardMetrics:
         finally:
             app.dependency_overrides = {}
     
-    def test_get_dashboard_metrics_user_profile_not_found(
-        self, 
-        client, 
-        mock_firestore,
-        mock_verify_firebase_token
-    ):
-        """Test error when user profile is not found."""
-        # Override the dependency for this test
-        import src.coworkly_partner_api.api.dashboard_metrics as dashboard_metrics_module
-        app.dependency_overrides[dashboard_metrics_module.verify_firebase_token] = mock_verify_firebase_token
-        
-        try:
-            # Mock user profile not found
-            mock_user_doc = Mock()
-            mock_user_doc.exists = False
-            
-            mock_firestore.collection.return_value.document.return_value.get.return_value = mock_user_doc
+    def test_get_dashboard_metrics_user_profile_not_found(self, client):
+        """Test that a user without a partner profile is rejected by authentication."""
+        with patch(
+            'src.coworkly_partner_api.services.auth.get_token_verifier'
+        ) as mock_get_verifier, patch(
+            'src.coworkly_partner_api.services.firestore.get_async_firestore_client'
+        ) as mock_get_client:
+            mock_get_verifier.return_value.verify = AsyncMock(return_value={
+                "uid": "test-user-id",
+                "exp": datetime.now().timestamp() + 3600
+            })
+            mock_get_client.return_value.collection.return_value.document.return_value = mock_document(
+                mock_snapshot('test-user-id', exists=False)
+            )
             
-            # Make request
             response = client.get(
                 "/dashboard-metrics/",
                 headers={"Authorization": "Bearer test-token"}
             )
             
-            # Assertions
-            assert response.status_code == 404
-            assert response.json()['detail'] == "User profile not found"
-        finally:
-            app.dependency_overrides = {}
+            assert response.status_code == 401
+            assert "User profile not found" in response.json()['detail']
+    
+    def test_get_dashboard_metrics_reads_profile_once(self, client, mock_firestore, mock_amplitude_service):
+        """Test that the profile loaded during authentication supplies the space IDs."""
+        with patch(
+            'src.coworkly_partner_api.services.auth.get_token_verifier'
+        ) as mock_get_verifier, patch(
+            'src.coworkly_partner_api.services.firestore.get_async_firestore_client'
+        ) as mock_get_client:
+            mock_get_verifier.return_value.verify = AsyncMock(return_value={
+                "uid": "test-user-id",
+                "exp": datetime.now().timestamp() + 3600
+            })
+            profile_ref = mock_document(
+                mock_snapshot('test-user-id', {'status': 'active', 'spaceIds': ['test-space-id']})
+            )
+            mock_get_client.return_value.collection.return_value.document.return_value = profile_ref
+            profile_get = profile_ref.get
+            mock_amplitude_service.get_dashboard_metrics.return_value = {'profileViews': 3}
+            
+            response = client.get(
+                "/dashboard-metrics/?start_date=2024-01-01&end_date=2024-01-31",
+                headers={"Authorization": "Bearer test-token"}
+            )
+            
+            assert response.status_code == 200
+            profile_get.assert_called_once()
+            mock_firestore.collection.assert_not_called()
+            mock_amplitude_service.get_dashboard_metrics.assert_called_once()
+            assert mock_amplitude_service.get_dashboard_metrics.call_args[0][0] == ['test-space-id']
     
     def test_get_dashboard_metrics_no_space_ids(
         self, 
         client, 
-        mock_firestore,
-        mock_verify_firebase_token
+        mock_firestore
     ):
         """Test error when user profile has no spaceIds."""
         # Override the dependency for this test
         import src.coworkly_partner_api.api.dashboard_metrics as dashboard_metrics_module
-        app.dependency_overrides[dashboard_metrics_module.verify_firebase_token] = mock_verify_firebase_token
+        app.dependency_overrides[dashboard_metrics_module.get_partner_context] = partner_context_override(space_ids=[])
         
         try:
-            # Mock user profile data without spaceIds
-            mock_user_doc = Mock()
-            mock_user_doc.exists = True
-            mock_user_doc.to_dict.return_value = {
-                'id': 'test-user-id',
-                'status': 'active'
-                # No spaceIds
-            }
-            mock_user_doc.id = 'test-user-id'
-            
-            mock_firestore.collection.return_value.document.return_value.get.return_value = mock_user_doc
-            
             # Make request
             response = client.get(
                 "/dashboard-metrics/",
@@ -322,17 +318,17 @@ class TestDashboardMetrics:
         # Assertions
         assert response.status_code == 401
         assert "Invalid token" in response.json()['detail']
-
+    
     def test_get_dashboard_metrics_with_space_ids_query_param(
         self, 
         client, 
         mock_amplitude_service,
-        mock_verify_firebase_token
+        mock_partner_context
     ):
         """Test successful dashboard metrics retrieval with space_ids query parameter."""
         # Override the dependency for this test
         import src.coworkly_partner_api.api.dashboard_metrics as dashboard_metrics_module
-        app.dependency_overrides[dashboard_metrics_module.verify_firebase_token] = mock_verify_firebase_token
+        app.dependency_overrides[dashboard_metrics_module.get_partner_context] = mock_partner_context
         
         try:
             # Mock Amplitude metrics response
@@ -367,6 +363,194 @@ class TestDashboardMetrics:
             assert call_args[1]['end_date'] is None
         finally:
             app.dependency_overrides = {}
+    
+    def test_get_dashboard_metrics_time_series(
+        self, 
+        client, 
+        mock_amplitude_service,
+        mock_partner_context
+    ):
+        """Test dashboard metrics retrieval as a weekly time series."""
+        import src.coworkly_partner_api.api.dashboard_metrics as dashboard_metrics_module
+        app.dependency_overrides[dashboard_metrics_module.get_partner_context] = mock_partner_context
+        
+        try:
+            mock_amplitude_service.get_dashboard_timeseries.return_value = {
+                'granularity': 'week',
+                'buckets': [datetime(2024, 1, 1).date(), datetime(2024, 1, 8).date()],
+                'profileViews': [10, 20],
+                'favoritesAdded': [1, 2]
+            }
+            
+            response = client.get(
+                "/dashboard-metrics/?space_ids=space1&start_date=2024-01-01&end_date=2024-01-14&granularity=week",
+                headers={"Authorization": "Bearer test-token"}
+            )
+            
+            assert response.status_code == 200
+            data = response.json()
+            assert data['granularity'] == 'week'
+            assert data['buckets'] == ['2024-01-01', '2024-01-08']
+            assert data['profileViews'] == [10, 20]
+            assert data['markerTaps'] == []
+            
+            call_args = mock_amplitude_service.get_dashboard_timeseries.call_args
+            assert call_args[1]['granularity'] == 'week'
+            mock_amplitude_service.get_dashboard_metrics.assert_not_called()
+        finally:
+            app.dependency_overrides = {}
+    
+    def test_get_dashboard_metrics_amplitude_unavailable(
+        self, 
+        client, 
+        mock_amplitude_service,
+        mock_partner_context
+    ):
+        """Test that an unavailable Amplitude is reported instead of zero metrics."""
+        import src.coworkly_partner_api.api.dashboard_metrics as dashboard_metrics_module
+        app.dependency_overrides[dashboard_metrics_module.get_partner_context] = mock_partner_context
+        
+        try:
+            mock_amplitude_service.get_dashboard_metrics.side_effect = AmplitudeUnavailableError(
+                "rate limited", retry_after=12.5
+            )
+            
+            response = client.get(
+                "/dashboard-metrics/?space_ids=space1&start_date=2024-01-01&end_date=2024-01-31",
+                headers={"Authorization": "Bearer test-token"}
+            )
+            
+            assert response.status_code == 503
+            assert response.headers["Retry-After"] == "13"
+            assert "unavailable" in response.json()['detail']
+        finally:
+            app.dependency_overrides = {}
+    
+    def test_get_dashboard_metrics_served_from_cache(
+        self, 
+        client, 
+        mock_amplitude_service,
+        mock_partner_context
+    ):
+        """Test that a repeated request is served from the response cache."""
+        import src.coworkly_partner_api.api.dashboard_metrics as dashboard_metrics_module
+        app.dependency_overrides[dashboard_metrics_module.get_partner_context] = mock_partner_context
+        
+        try:
+            mock_amplitude_service.get_dashboard_metrics.return_value = {'profileViews': 5}
+            
+            first = client.get(
+                "/dashboard-metrics/?space_ids=space1",
+                headers={"Authorization": "Bearer test-token"}
+            )
+            second = client.get(
+                "/dashboard-metrics/?space_ids=space1",
+                headers={"Authorization": "Bearer test-token"}
+            )
+            
+            assert first.headers["X-Cache"] == "MISS"
+            assert second.headers["X-Cache"] == "HIT"
+            assert second.json()['profileViews'] == 5
+            assert "Age" in second.headers
+            mock_amplitude_service.get_dashboard_metrics.assert_called_once()
+        finally:
+            app.dependency_overrides = {}
+    
+    @pytest.mark.asyncio
+    async def test_get_dashboard_metrics_stale_refreshed_in_background(
+        self, 
+        mock_amplitude_service,
+        mock_partner_context
+    ):
+        """Test that stale metrics are served without waiting for the refresh.
+        
+        The app is driven like main.handle_request, which only responds
+        once the ASGI call returns.
+        """
+        import src.coworkly_partner_api.api.dashboard_metrics as dashboard_metrics_module
+        app.dependency_overrides[dashboard_metrics_module.get_partner_context] = mock_partner_context
+        
+        try:
+            cache_key = dashboard_cache_key("test-user-id", ("space1",), None, None, None)
+            dashboard_metrics_cache.set(
+                cache_key,
+                {'profileViews': 1},
+                datetime.now(timezone.utc) - timedelta(minutes=10)
+            )
+            
+            async def slow_metrics(*args, **kwargs):
+                await asyncio.sleep(1)
+                return {'profileViews': 7}
+            mock_amplitude_service.get_dashboard_metrics.side_effect = slow_metrics
+            
+            scope = {
+                'type': 'http',
+                'asgi': {'version': '3.0'},
+                'http_version': '1.1',
+                'method': 'GET',
+                'scheme': 'https',
+                'server': ('localhost', 8080),
+                'path': '/dashboard-metrics/',
+                'query_string': b'space_ids=space1',
+                'headers': [(b'authorization', b'Bearer test-token')],
+                'client': ('127.0.0.1', 0),
+            }
+            messages = []
+            
+            async def receive():
+                return {'type': 'http.request', 'body': b''}
+            
+            async def send(message):
+                messages.append(message)
+            
+            started = asyncio.get_running_loop().time()
+            await app(scope, receive, send)
+            elapsed = asyncio.get_running_loop().time() - started
+            
+            # The stale response is returned, then replaced by the detached refresh
+            start_message = messages[0]
+            headers = {name.decode(): value.decode() for name, value in start_message['headers']}
+            assert start_message['status'] == 200
+            assert json.loads(b''.join(m.get('body', b'') for m in messages[1:])) == {'profileViews': 1}
+            assert headers['x-cache'] == "STALE"
+            assert int(headers['age']) >= 600
+            assert elapsed < 0.5
+            assert dashboard_metrics_cache.get(cache_key).data['profileViews'] == 1
+            
+            await asyncio.gather(*dashboard_metrics_module._refresh_tasks)
+            mock_amplitude_service.get_dashboard_metrics.assert_called_once()
+            assert dashboard_metrics_cache.get(cache_key).data['profileViews'] == 7
+        finally:
+            app.dependency_overrides = {}
+    
+    def test_get_dashboard_metrics_beyond_stale_tolerance_recomputed(
+        self, 
+        client, 
+        mock_amplitude_service,
+        mock_partner_context
+    ):
+        """Test that metrics older than the stale tolerance are not served."""
+        import src.coworkly_partner_api.api.dashboard_metrics as dashboard_metrics_module
+        app.dependency_overrides[dashboard_metrics_module.get_partner_context] = mock_partner_context
+        
+        try:
+            dashboard_metrics_cache.set(
+                dashboard_cache_key("test-user-id", ("space1",), None, None, None),
+                {'profileViews': 1},
+                datetime.now(timezone.utc) - timedelta(days=1)
+            )
+            mock_amplitude_service.get_dashboard_metrics.return_value = {'profileViews': 7}
+            
+            response = client.get(
+                "/dashboard-metrics/?space_ids=space1",
+                headers={"Authorization": "Bearer test-token"}
+            )
+            
+            assert response.json()['profileViews'] == 7
+            assert response.headers["X-Cache"] == "MISS"
+            assert int(response.headers["Age"]) < 60
+        finally:
+            app.dependency_overrides = {}
 
 
 class TestAmplitudeService:
@@ -382,95 +566,50 @@ class TestAmplitudeService:
         with pytest.raises(ValueError, match="Amplitude API credentials not configured"):
             AmplitudeService()
     
-    @patch('src.coworkly_partner_api.services.amplitude_service.settings')
-    @patch('src.coworkly_partner_api.services.amplitude_service.requests.get')
-    def test_get_event_metrics_success(self, mock_get, mock_settings):
+    @pytest.mark.asyncio
+    async def test_get_event_metrics_success(self, amplitude_settings, mock_amplitude_get):
         """Test successful event metrics retrieval."""
-        # Mock settings
-        mock_settings.AMPLITUDE_API_KEY = "test-api-key"
-        mock_settings.AMPLITUDE_SECRET_KEY = "test-secret-key"
-        mock_settings.AMPLITUDE_BASE_URL = "https://amplitude.com/api/2/segmentation"
-        mock_settings.FERNET_KEY = "test-fernet-key"
-        
-        # Mock API response
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            "data": {
-                "series": [[10, 15, 20, 25]]  # 4 days of data
-            }
-        }
-        mock_get.return_value = mock_response
+        mock_amplitude_get.return_value = amplitude_response([[10, 15, 20, 25]])  # 4 days of data
         
         # Create service and test
         service = AmplitudeService()
-        result = service.get_event_metrics("test-space-id", "test-event")
+        result = await service.get_event_metrics("test-space-id", "test-event")
         
         # Assertions
         assert result == 70  # 10 + 15 + 20 + 25
-        mock_get.assert_called_once()
+        mock_amplitude_get.assert_called_once()
     
-    @patch('src.coworkly_partner_api.services.amplitude_service.settings')
-    @patch('src.coworkly_partner_api.services.amplitude_service.requests.get')
-    def test_get_event_metrics_with_date_range(self, mock_get, mock_settings):
+    @pytest.mark.asyncio
+    async def test_get_event_metrics_with_date_range(self, amplitude_settings, mock_amplitude_get):
         """Test successful event metrics retrieval with date range."""
-        # Mock settings
-        mock_settings.AMPLITUDE_API_KEY = "test-api-key"
-        mock_settings.AMPLITUDE_SECRET_KEY = "test-secret-key"
-        mock_settings.AMPLITUDE_BASE_URL = "https://amplitude.com/api/2/segmentation"
-        mock_settings.FERNET_KEY = "test-fernet-key"
-        
-        # Mock API response
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            "data": {
-                "series": [[5, 10, 15]]  # 3 days of data
-            }
-        }
-        mock_get.return_value = mock_response
+        mock_amplitude_get.return_value = amplitude_response([[5, 10, 15]])  # 3 days of data
         
         # Create service and test with date range
         service = AmplitudeService()
         start_date = datetime(2024, 1, 1)
         end_date = datetime(2024, 1, 3)
-        result = service.get_event_metrics("test-space-id", "test-event", start_date, end_date)
+        result = await service.get_event_metrics("test-space-id", "test-event", start_date, end_date)
         
         # Assertions
         assert result == 30  # 5 + 10 + 15
-        mock_get.assert_called_once()
+        mock_amplitude_get.assert_called_once()
         
         # Verify the API call parameters
-        call_args = mock_get.call_args
-        params = call_args[1]['params']
+        params = mock_amplitude_get.call_args[1]['params']
         assert params['start'] == '20240101'
         assert params['end'] == '20240103'
     
-    @patch('src.coworkly_partner_api.services.amplitude_service.settings')
-    @patch('src.coworkly_partner_api.services.amplitude_service.requests.get')
-    def test_get_dashboard_metrics_with_date_range(self, mock_get, mock_settings):
+    @pytest.mark.asyncio
+    async def test_get_dashboard_metrics_with_date_range(self, amplitude_settings, mock_amplitude_get):
         """Test successful dashboard metrics retrieval with date range."""
-        # Mock settings
-        mock_settings.AMPLITUDE_API_KEY = "test-api-key"
-        mock_settings.AMPLITUDE_SECRET_KEY = "test-secret-key"
-        mock_settings.AMPLITUDE_BASE_URL = "https://amplitude.com/api/2/segmentation"
-        mock_settings.FERNET_KEY = "test-fernet-key"
-        
-        # Mock API response for multiple events
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            "data": {
-                "series": [[10, 15]]  # 2 days of data
-            }
-        }
-        mock_get.return_value = mock_response
+        # Two events per request, 2 days of data each
+        mock_amplitude_get.return_value = amplitude_response([[10, 15], [10, 15]])
         
         # Create service and test
         service = AmplitudeService()
         start_date = datetime(2024, 1, 1)
         end_date = datetime(2024, 1, 2)
-        result = service.get_dashboard_metrics("test-space-id", start_date, end_date)
+        result = await service.get_dashboard_metrics("test-space-id", start_date, end_date)
         
         # Assertions - should have metrics for all target events
         expected_events = [
@@ -482,41 +621,272 @@ class TestAmplitudeService:
             assert event in result
             assert result[event] == 25  # 10 + 15 for each event
         
-        # Verify API was called for each event
-        assert mock_get.call_count == 8  # One call per event
+        # Verify events were packed two to a request
+        assert mock_amplitude_get.call_count == 4
     
-    @patch('src.coworkly_partner_api.services.amplitude_service.settings')
-    @patch('src.coworkly_partner_api.services.amplitude_service.requests.get')
-    def test_get_event_metrics_api_error(self, mock_get, mock_settings):
-        """Test handling of Amplitude API errors."""
-        # Mock settings
-        mock_settings.AMPLITUDE_API_KEY = "test-api-key"
-        mock_settings.AMPLITUDE_SECRET_KEY = "test-secret-key"
-        mock_settings.AMPLITUDE_BASE_URL = "https://amplitude.com/api/2/segmentation"
-        mock_settings.FERNET_KEY = "test-fernet-key"
-        
-        # Mock API error response
-        mock_response = Mock()
-        mock_response.status_code = 401
-        mock_response.text = "Unauthorized"
-        mock_get.return_value = mock_response
+    @pytest.mark.asyncio
+    async def test_get_events_metrics_splits_series_per_event(
+        self, 
+        amplitude_settings, 
+        mock_amplitude_get
+    ):
+        """Test that one multi-event request is split back into per-event counts."""
+        mock_amplitude_get.return_value = amplitude_response([[1, 2, 3], [4, 5]])
+        
+        service = AmplitudeService()
+        result = await service.get_events_metrics(
+            ["space1", "space2"], 
+            ["add_favorite", "remove_favorite"]
+        )
+        
+        assert result == {"add_favorite": 6, "remove_favorite": 9}
+        mock_amplitude_get.assert_called_once()
+        
+        params = mock_amplitude_get.call_args[1]['params']
+        assert json.loads(params['e'])['event_type'] == "add_favorite"
+        assert json.loads(params['e2'])['event_type'] == "remove_favorite"
+        assert json.loads(params['e2'])['user_properties'] == {"partner_space_id": ["space1", "space2"]}
+    
+    @pytest.mark.asyncio
+    async def test_get_events_metrics_rejects_too_many_events(self, amplitude_settings):
+        """Test that a request cannot carry more events than the API accepts."""
+        service = AmplitudeService()
+        
+        with pytest.raises(ValueError):
+            await service.get_events_metrics("space1", ["a", "b", "c"])
+    
+    @pytest.mark.asyncio
+    async def test_get_dashboard_metrics_runs_queries_concurrently(
+        self, 
+        amplitude_settings, 
+        mock_amplitude_get
+    ):
+        """Test that event queries overlap but respect the concurrency cap."""
+        amplitude_settings.AMPLITUDE_MAX_CONCURRENCY = 2
+        in_flight = 0
+        max_in_flight = 0
+        
+        async def slow_get(*args, **kwargs):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return amplitude_response([[1], [1]])
+        
+        mock_amplitude_get.side_effect = slow_get
+        
+        service = AmplitudeService()
+        result = await service.get_dashboard_metrics(["space1", "space2"])
+        
+        assert result["profileViews"] == 1
+        assert max_in_flight == 2
+    
+    @pytest.mark.asyncio
+    async def test_closed_days_are_served_from_day_cache(self, amplitude_settings, mock_amplitude_get):
+        """Test that only days missing from the cache are fetched."""
+        mock_amplitude_get.return_value = amplitude_response(
+            [[1, 2, 3]], 
+            x_values=["2024-01-01", "2024-01-02", "2024-01-03"]
+        )
+        
+        service = AmplitudeService()
+        first = await service.get_event_metrics(
+            "test-space-id", "test-event", datetime(2024, 1, 1), datetime(2024, 1, 3)
+        )
+        
+        # The same range is now fully cached
+        second = await service.get_event_metrics(
+            "test-space-id", "test-event", datetime(2024, 1, 2), datetime(2024, 1, 3)
+        )
+        assert first == 6
+        assert second == 5
+        assert mock_amplitude_get.call_count == 1
+        
+        # Extending the range only fetches the new days
+        mock_amplitude_get.return_value = amplitude_response(
+            [[4, 5]], 
+            x_values=["2024-01-04", "2024-01-05"]
+        )
+        third = await service.get_event_metrics(
+            "test-space-id", "test-event", datetime(2024, 1, 1), datetime(2024, 1, 5)
+        )
+        assert third == 15
+        params = mock_amplitude_get.call_args[1]['params']
+        assert params['start'] == '20240104'
+        assert params['end'] == '20240105'
+    
+    @pytest.mark.asyncio
+    async def test_recent_days_are_not_cached(self, amplitude_settings, mock_amplitude_get):
+        """Test that today and yesterday are always refetched."""
+        mock_amplitude_get.return_value = amplitude_response([[1, 1]])
+        
+        service = AmplitudeService()
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=1)
+        await service.get_event_metrics("test-space-id", "test-event", start_date, end_date)
+        await service.get_event_metrics("test-space-id", "test-event", start_date, end_date)
+        
+        assert mock_amplitude_get.call_count == 2
+        assert len(service.day_cache) == 0
+    
+    @pytest.mark.asyncio
+    async def test_identical_concurrent_queries_share_one_request(
+        self, 
+        amplitude_settings, 
+        mock_amplitude_get
+    ):
+        """Test that concurrent identical queries are coalesced into one upstream call."""
+        async def slow_get(*args, **kwargs):
+            await asyncio.sleep(0.01)
+            return amplitude_response([[2, 3]], x_values=["2024-01-01", "2024-01-02"])
+        
+        mock_amplitude_get.side_effect = slow_get
+        
+        service = AmplitudeService()
+        results = await asyncio.gather(*(
+            service.get_event_metrics(
+                ["space2", "space1"], "test-event", datetime(2024, 1, 1), datetime(2024, 1, 2)
+            )
+            for _ in range(5)
+        ))
+        
+        assert results == [5] * 5
+        assert mock_amplitude_get.call_count == 1
+        stats = service.get_stats()
+        assert stats["upstream_requests"] == 1
+        assert stats["coalesced_requests"] == 4
+        assert stats["in_flight"] == 0
+    
+    def test_rollup_daily_series(self):
+        """Test rolling daily counts up into weekly and monthly buckets."""
+        series = {
+            datetime(2024, 1, 30).date(): 1,  # Tuesday
+            datetime(2024, 1, 31).date(): 2,
+            datetime(2024, 2, 1).date(): 3,
+            datetime(2024, 2, 5).date(): 4,  # Following Monday
+        }
+        
+        assert rollup_daily_series(series, "day") == series
+        assert rollup_daily_series(series, "week") == {
+            datetime(2024, 1, 29).date(): 6,
+            datetime(2024, 2, 5).date(): 4,
+        }
+        assert rollup_daily_series(series, "month") == {
+            datetime(2024, 1, 1).date(): 3,
+            datetime(2024, 2, 1).date(): 7,
+        }
+    
+    @pytest.mark.asyncio
+    async def test_get_dashboard_timeseries_uses_daily_data(self, amplitude_settings, mock_amplitude_get):
+        """Test that a monthly series costs no more upstream requests than totals."""
+        mock_amplitude_get.return_value = amplitude_response(
+            [[1, 2, 3], [1, 1, 1]], 
+            x_values=["2024-01-31", "2024-02-01", "2024-02-02"]
+        )
+        
+        service = AmplitudeService()
+        result = await service.get_dashboard_timeseries(
+            "test-space-id", datetime(2024, 1, 31), datetime(2024, 2, 2), granularity="month"
+        )
+        
+        assert result["buckets"] == [datetime(2024, 1, 1).date(), datetime(2024, 2, 1).date()]
+        assert result["profileViews"] == [1, 5]
+        assert result["favoritesAdded"] == [1, 2]
+        assert mock_amplitude_get.call_count == 4
+    
+    @pytest.mark.asyncio
+    async def test_pooled_client_is_reused_and_closed(self, amplitude_settings, mock_amplitude_get):
+        """Test that queries share one pooled client until the service is closed."""
+        mock_amplitude_get.return_value = amplitude_response([[1]])
+        
+        service = AmplitudeService()
+        await service.get_event_metrics("test-space-id", "test-event")
+        client = service._client
+        await service.get_event_metrics("test-space-id", "test-event")
+        
+        assert service._client is client
+        assert client.headers["Authorization"] == service.auth_header
+        assert client.timeout.connect == 5
+        assert client.timeout.read == 30
+        
+        await service.aclose()
+        assert client.is_closed
+        assert service._client is None
+    
+    @pytest.mark.asyncio
+    async def test_get_event_metrics_api_error(self, amplitude_settings, mock_amplitude_get):
+        """Test that rejected queries raise instead of reporting zero events."""
+        mock_amplitude_get.return_value = amplitude_response([], status_code=401, text="Unauthorized")
         
         # Create service and test
         service = AmplitudeService()
         
-        # The method should return 0 instead of raising an exception
-        result = service.get_event_metrics("test-space-id", "test-event")
-        assert result == 0
+        with pytest.raises(AmplitudeError) as exc_info:
+            await service.get_event_metrics("test-space-id", "test-event")
+        
+        assert not isinstance(exc_info.value, AmplitudeUnavailableError)
+        mock_amplitude_get.assert_called_once()  # Not retried
     
-    @patch('src.coworkly_partner_api.services.amplitude_service.settings')
-    def test_event_to_metric_key_mapping(self, mock_settings):
-        """Test event name to metric key mapping."""
-        # Mock settings
-        mock_settings.AMPLITUDE_API_KEY = "test-api-key"
-        mock_settings.AMPLITUDE_SECRET_KEY = "test-secret-key"
-        mock_settings.AMPLITUDE_BASE_URL = "https://amplitude.com/api/2/segmentation"
-        mock_settings.FERNET_KEY = "test-fernet-key"
+    @pytest.mark.asyncio
+    async def test_rate_limited_request_is_retried(self, amplitude_settings, mock_amplitude_get):
+        """Test that a 429 is retried after its Retry-After delay."""
+        mock_amplitude_get.side_effect = [
+            amplitude_response([], status_code=429, text="Too many requests", headers={"Retry-After": "0"}),
+            amplitude_response([[3, 4]], x_values=["2024-01-01", "2024-01-02"]),
+        ]
         
+        service = AmplitudeService()
+        result = await service.get_event_metrics(
+            "test-space-id", "test-event", datetime(2024, 1, 1), datetime(2024, 1, 2)
+        )
+        
+        assert result == 7
+        assert mock_amplitude_get.call_count == 2
+        assert service.get_stats()["rate_limited"] == 1
+        assert service.get_stats()["retries"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_unavailable_after_retries_and_circuit_opens(self, amplitude_settings, mock_amplitude_get):
+        """Test that persistent failures surface as unavailable and trip the breaker."""
+        mock_amplitude_get.return_value = amplitude_response([], status_code=503, text="Unavailable")
+        
+        service = AmplitudeService()
+        for _ in range(2):
+            with pytest.raises(AmplitudeUnavailableError):
+                await service.get_event_metrics("test-space-id", "test-event")
+        
+        # One initial attempt plus two retries per query
+        assert mock_amplitude_get.call_count == 6
+        assert service.get_stats()["circuit_open"] == 1
+        
+        # While open, queries fail fast without reaching Amplitude
+        with pytest.raises(AmplitudeUnavailableError) as exc_info:
+            await service.get_event_metrics("test-space-id", "test-event")
+        assert mock_amplitude_get.call_count == 6
+        assert exc_info.value.retry_after > 0
+    
+    @pytest.mark.asyncio
+    async def test_token_bucket_limits_request_rate(self):
+        """Test that the token bucket delays requests beyond its burst."""
+        bucket = TokenBucket(rate=50, capacity=1)
+        loop = asyncio.get_running_loop()
+        
+        started = loop.time()
+        for _ in range(3):
+            await bucket.acquire()
+        
+        assert loop.time() - started >= 0.035
+    
+    def test_parse_retry_after(self):
+        """Test Retry-After parsing in seconds and HTTP-date form."""
+        assert parse_retry_after("12") == 12
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("not a date") is None
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+    
+    def test_event_to_metric_key_mapping(self, amplitude_settings):
+        """Test event name to metric key mapping."""
         service = AmplitudeService()
         
         # Test mappings
@@ -528,4 +898,4 @@ class TestAmplitudeService:
         assert service._event_to_metric_key("browse_reviews") == "reviewsBrowsed"
         assert service._event_to_metric_key("add_review") == "reviewsAdded"
         assert service._event_to_metric_key("external_link_navigation") == "externalLinks"
-        assert service._event_to_metric_key("unknown_event") == "unknown_event" 
\ No newline at end of file
+        assert service._event_to_metric_key("unknown_event") == "unknown_event"
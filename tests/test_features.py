@@ -0,0 +1,142 @@
+"""Tests for features API and the feature catalogue."""
+
+import pytest
+import asyncio
+from unittest.mock import Mock, patch
+from fastapi.testclient import TestClient
+
+from src.coworkly_partner_api.app import app
+from src.coworkly_partner_api.models.partner_profile import PartnerContext
+from src.coworkly_partner_api.services.auth import get_partner_context
+from src.coworkly_partner_api.services.feature_catalogue import FeatureCatalogue
+from tests.firestore_mocks import async_stream, mock_snapshot
+
+client = TestClient(app)
+
+
+def feature_doc(feature_type, subtype, feature_id, translations):
+    """Build a mock feature document under ``{feature_type}/{subtype}/features``."""
+    doc = mock_snapshot(feature_id, translations)
+    if feature_type is None:
+        # Document of a top-level collection named "features"
+        doc.reference.parent.parent = None
+    else:
+        doc.reference.parent.parent.id = subtype
+        doc.reference.parent.parent.parent.id = feature_type
+    return doc
+
+
+FEATURE_DOCS = [
+    feature_doc("coliving_features", "kitchen", "oven", {"en": "Oven", "es": "Horno", "fr": "Four"}),
+    feature_doc("workspace_features", "desks", "standing", {"en": "Standing desk", "es": "Escritorio de pie"}),
+    feature_doc("workspace_features", "tech", "wifi", {"en": "Wi-Fi", "es": "Wifi", "fr": "Wi-Fi"}),
+    feature_doc(None, None, "stray", {"en": "Not a catalogue feature"}),
+]
+
+
+@pytest.fixture(autouse=True)
+def override_auth_dependency():
+    async def mock_partner_context(authorization: str = None):
+        return PartnerContext(uid="test_uid", status="active", spaceIds=["space1"])
+    app.dependency_overrides[get_partner_context] = mock_partner_context
+    yield
+    app.dependency_overrides.pop(get_partner_context, None)
+
+
+@pytest.fixture
+def mock_firestore():
+    """Mock the features collection group."""
+    with patch('src.coworkly_partner_api.services.feature_catalogue.get_async_firestore_client') as mock:
+        db = Mock()
+        db.collection_group.return_value.stream.side_effect = lambda: async_stream(FEATURE_DOCS)
+        mock.return_value = db
+        yield db
+
+
+class TestFeaturesAPI:
+    """Test cases for the features endpoint."""
+    
+    def test_get_features_by_type(self, mock_firestore):
+        """Test that features are loaded with one collection-group query and filtered by type."""
+        response = client.get("/features/?feature_type=workspace_features")
+        
+        assert response.status_code == 200
+        assert response.json() == [
+            {"id": "standing", "translations": {"en": "Standing desk", "es": "Escritorio de pie", "fr": ""}},
+            {"id": "wifi", "translations": {"en": "Wi-Fi", "es": "Wifi", "fr": "Wi-Fi"}},
+        ]
+        assert "max-age" in response.headers["Cache-Control"]
+        mock_firestore.collection_group.assert_called_once_with('features')
+    
+    def test_catalogue_served_from_memory(self, mock_firestore):
+        """Test that repeated requests for any type reuse the loaded catalogue."""
+        client.get("/features/?feature_type=workspace_features")
+        response = client.get("/features/?feature_type=coliving_features")
+        
+        assert [feature["id"] for feature in response.json()] == ["oven"]
+        mock_firestore.collection_group.return_value.stream.assert_called_once()
+    
+    def test_lang_filter(self, mock_firestore):
+        """Test that a language filter keeps only that translation."""
+        response = client.get("/features/?feature_type=coliving_features&lang=es")
+        
+        assert response.json() == [{"id": "oven", "translations": {"es": "Horno"}}]
+    
+    def test_if_none_match_returns_not_modified(self, mock_firestore):
+        """Test revalidation with the ETag of the previous response."""
+        first = client.get("/features/?feature_type=workspace_features")
+        etag = first.headers["ETag"]
+        
+        second = client.get(
+            "/features/?feature_type=workspace_features",
+            headers={"If-None-Match": etag}
+        )
+        other_lang = client.get(
+            "/features/?feature_type=workspace_features&lang=fr",
+            headers={"If-None-Match": etag}
+        )
+        
+        assert second.status_code == 304
+        assert second.content == b""
+        assert second.headers["ETag"] == etag
+        assert other_lang.status_code == 200
+
+
+class TestFeatureCatalogue:
+    """Test cases for catalogue reloading and versioning."""
+    
+    @pytest.mark.asyncio
+    async def test_reload_after_ttl_keeps_version_when_unchanged(self, mock_firestore):
+        """Test that the version only changes when the content does."""
+        catalogue = FeatureCatalogue(ttl=0)
+        
+        first = await catalogue.get_snapshot()
+        second = await catalogue.get_snapshot()
+        FEATURE_DOCS[0].to_dict.return_value = {"en": "Oven", "es": "Horno", "fr": "Four à pain"}
+        try:
+            third = await catalogue.get_snapshot()
+        finally:
+            FEATURE_DOCS[0].to_dict.return_value = {"en": "Oven", "es": "Horno", "fr": "Four"}
+        
+        assert mock_firestore.collection_group.return_value.stream.call_count == 3
+        assert first.version == second.version == 1
+        assert third.version == 2
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_loads_are_shared(self, mock_firestore):
+        """Test that concurrent requests on a cold catalogue run one query."""
+        catalogue = FeatureCatalogue(ttl=60)
+        
+        snapshots = await asyncio.gather(*(catalogue.get_snapshot() for _ in range(5)))
+        
+        assert all(snapshot is snapshots[0] for snapshot in snapshots)
+        mock_firestore.collection_group.return_value.stream.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_failed_reload_serves_previous_version(self, mock_firestore):
+        """Test that a Firestore error does not take the catalogue down."""
+        catalogue = FeatureCatalogue(ttl=0)
+        first = await catalogue.get_snapshot()
+        mock_firestore.collection_group.return_value.stream.side_effect = RuntimeError("unavailable")
+        
+        assert await catalogue.get_snapshot() is first
@@ -0,0 +1,74 @@
+"""Tests for sparse fieldsets."""
+
+import pytest
+from datetime import datetime, timezone
+
+from src.coworkly_partner_api.models.partner_profile import PartnerProfile
+from src.coworkly_partner_api.models.post import CommunityPost
+from src.coworkly_partner_api.models.space import Space
+from src.coworkly_partner_api.utils.fieldsets import Fieldset, InvalidFieldsError
+
+
+class TestFieldset:
+    """Test cases for parsing and applying fieldsets."""
+    
+    def test_no_fields_selects_everything(self):
+        assert Fieldset.parse(Space, None) is None
+        assert Fieldset.parse(Space, " ") is None
+    
+    def test_parse_nested_paths(self):
+        fieldset = Fieldset.parse(Space, "name, details.businessHours,name")
+        
+        assert fieldset.paths == [("name",), ("details", "businessHours")]
+    
+    def test_unknown_fields(self):
+        with pytest.raises(InvalidFieldsError, match="password, details.nope, name.first"):
+            Fieldset.parse(Space, "name,password,details.nope,name.first")
+    
+    def test_field_mask_uses_stored_names(self):
+        """Test that the mask covers the alias and the field name."""
+        fieldset = Fieldset.parse(Space, "id,name,fullAddress,details.businessHours")
+        
+        assert fieldset.field_paths() == [
+            "details.businessHours",
+            "details.business_hours",
+            "fullAddress",
+            "full_address",
+            "name",
+        ]
+    
+    def test_dump_validates_selected_fields(self):
+        fieldset = Fieldset.parse(Space, "name,rating,details.contact,details.bio")
+        
+        data = {
+            "id": "space1",
+            "name": "Space",
+            "details": {"contact": {"email": "a@b.c", "facebook": None}, "gallery": ["x"]},
+        }
+        
+        assert fieldset.dump(data) == {
+            "id": "space1",
+            "name": "Space",
+            "rating": 0.0,
+            "details": {
+                "contact": {
+                    "phone": "", "website": "", "emailAddress": "a@b.c", "facebook": "",
+                    "instagram": "", "twitter": "", "tiktok": "", "linkedIn": ""
+                },
+                "bio": "",
+            },
+        }
+    
+    def test_dump_reads_either_stored_name(self):
+        """Test that profiles store spaceIds by name and timestamps by alias."""
+        fieldset = Fieldset.parse(PartnerProfile, "spaceIds,createdAt")
+        created_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        
+        dumped = fieldset.dump({"id": "uid1", "spaceIds": ["space1"], "created_at": created_at})
+        
+        assert dumped == {"id": "uid1", "spaceIds": ["space1"], "createdAt": created_at}
+    
+    def test_dump_missing_fields(self):
+        fieldset = Fieldset.parse(CommunityPost, "content,imageUrls")
+        
+        assert fieldset.dump({"id": "post1"}) == {"id": "post1", "content": None, "imageUrls": []}
@@ -0,0 +1,269 @@
+"""Tests for Firestore services."""
+
+import pytest
+import asyncio
+from unittest.mock import Mock, patch
+from google.api_core.exceptions import FailedPrecondition
+
+from src.coworkly_partner_api.services import firestore as firestore_module
+from src.coworkly_partner_api.services.firestore import (
+    get_async_firestore_client,
+    merge_update,
+    read_document,
+    update_document,
+    ConcurrentUpdateError,
+    DocumentMirror,
+    MirroredDocument,
+)
+from tests.firestore_fake import FakeFirestore
+from tests.firestore_mocks import mock_snapshot, mock_document
+
+
+class TestAsyncFirestoreClient:
+    """Test cases for the per-loop async Firestore client."""
+    
+    def test_one_client_per_event_loop(self):
+        """Test that a loop reuses its client and other loops get their own."""
+        async def get_twice():
+            return get_async_firestore_client(), get_async_firestore_client()
+        
+        with patch.object(firestore_module, '_create_async_client', side_effect=lambda: Mock()) as mock_create:
+            first_a, first_b = asyncio.run(get_twice())
+            second_a, _ = asyncio.run(get_twice())
+        
+        assert first_a is first_b
+        assert second_a is not first_a
+        assert mock_create.call_count == 2
+
+
+class TestUpdateDocument:
+    """Test cases for precondition-based updates."""
+    
+    def test_merge_update_follows_field_paths(self):
+        """Test that top-level keys replace fields and dotted paths replace nested ones."""
+        data = {'name': 'Old', 'details': {'bio': 'Old bio', 'gallery': ['a']}}
+        
+        merged = merge_update(data, {'name': 'New', 'details.bio': 'New bio'})
+        
+        assert merged == {'name': 'New', 'details': {'bio': 'New bio', 'gallery': ['a']}}
+        assert data['details']['bio'] == 'Old bio'
+    
+    @pytest.mark.asyncio
+    async def test_retries_when_document_changed(self):
+        """Test that a failed precondition re-reads and merges into the latest version."""
+        first = mock_snapshot('doc1', {'name': 'A', 'rating': 1})
+        second = mock_snapshot('doc1', {'name': 'A', 'rating': 2})
+        doc_ref = mock_document()
+        doc_ref.get.side_effect = [first, second]
+        doc_ref.update.side_effect = [FailedPrecondition("changed"), None]
+        
+        updated = await update_document(doc_ref, {'name': 'B'})
+        
+        assert updated == {'id': 'doc1', 'name': 'B', 'rating': 2}
+        assert doc_ref.update.await_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_attempts(self):
+        """Test that a document that keeps changing raises a conflict."""
+        doc_ref = mock_document(mock_snapshot('doc1', {'name': 'A'}))
+        doc_ref.update.side_effect = FailedPrecondition("changed")
+        
+        with pytest.raises(ConcurrentUpdateError):
+            await update_document(doc_ref, {'name': 'B'})
+
+
+@pytest.fixture
+def fake_firestore():
+    fake = FakeFirestore()
+    fake.set('spaces', 'space1', {'name': 'Space', 'status': 'active'})
+    return fake
+
+
+def make_mirror(fake, max_entries=10, max_staleness=30, max_listeners=10):
+    return DocumentMirror(
+        ['spaces', 'partner_profiles'],
+        max_entries,
+        max_staleness,
+        max_listeners,
+        listen_client=lambda: fake,
+        read_client=lambda: fake
+    )
+
+
+async def wait_for(condition):
+    """Wait for listeners stopped on executor threads."""
+    for _ in range(100):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not met")
+
+
+class TestDocumentMirror:
+    """Test cases for the listener-backed document mirror."""
+    
+    @pytest.mark.asyncio
+    async def test_hot_documents_cost_no_rpc(self, fake_firestore):
+        """Test that only the first read of a document is an RPC."""
+        mirror = make_mirror(fake_firestore)
+        
+        first = await mirror.get('spaces', 'space1')
+        second = await mirror.get('spaces', 'space1')
+        
+        assert first == second == {'name': 'Space', 'status': 'active', 'id': 'space1'}
+        assert fake_firestore.reads == 1
+        assert mirror.stats['hits'] == 1
+        assert mirror.staleness('spaces', 'space1') == 0.0
+    
+    @pytest.mark.asyncio
+    async def test_listener_applies_changes_and_deletes(self, fake_firestore):
+        """Test that writes elsewhere reach the mirror, deletions as tombstones."""
+        mirror = make_mirror(fake_firestore)
+        await mirror.get('spaces', 'space1')
+        
+        fake_firestore.set('spaces', 'space1', {'name': 'Renamed', 'status': 'active'})
+        assert (await mirror.get('spaces', 'space1'))['name'] == 'Renamed'
+        
+        fake_firestore.delete('spaces', 'space1')
+        assert await mirror.get('spaces', 'space1') is None
+        assert await mirror.get('spaces', 'space1') is None
+        assert fake_firestore.reads == 1
+    
+    @pytest.mark.asyncio
+    async def test_missing_documents_are_mirrored(self, fake_firestore):
+        """Test that a document created after a miss is picked up by its listener."""
+        mirror = make_mirror(fake_firestore)
+        
+        assert await mirror.get('partner_profiles', 'uid1') is None
+        fake_firestore.set('partner_profiles', 'uid1', {'status': 'active'})
+        
+        assert await mirror.get('partner_profiles', 'uid1') == {'status': 'active', 'id': 'uid1'}
+        assert fake_firestore.reads == 1
+    
+    @pytest.mark.asyncio
+    async def test_returned_data_is_a_copy(self, fake_firestore):
+        mirror = make_mirror(fake_firestore)
+        
+        (await mirror.get('spaces', 'space1'))['name'] = 'Changed'
+        
+        assert (await mirror.get('spaces', 'space1'))['name'] == 'Space'
+    
+    @pytest.mark.asyncio
+    async def test_lru_eviction_stops_listeners(self, fake_firestore):
+        """Test that evicted documents stop their listener and are read again."""
+        fake_firestore.set('spaces', 'space2', {'name': 'Other'})
+        mirror = make_mirror(fake_firestore, max_entries=1)
+        
+        await mirror.get('spaces', 'space1')
+        await mirror.get('spaces', 'space2')
+        await wait_for(lambda: len(fake_firestore.listeners) == 1)
+        
+        assert len(mirror) == 1
+        assert mirror.stats['evictions'] == 1
+        assert fake_firestore.listeners[0].key == ('spaces', 'space2')
+        await mirror.get('spaces', 'space1')
+        assert fake_firestore.reads == 3
+    
+    @pytest.mark.asyncio
+    async def test_listener_cap_releases_least_recently_used(self, fake_firestore):
+        """Test that listeners are capped apart from entries, the LRU one released first."""
+        fake_firestore.set('spaces', 'space2', {'name': 'Other'})
+        fake_firestore.set('spaces', 'space3', {'name': 'Third'})
+        mirror = make_mirror(fake_firestore, max_staleness=0, max_listeners=2)
+        
+        for space_id in ('space1', 'space2', 'space1', 'space3'):
+            await mirror.get('spaces', space_id)
+        await wait_for(lambda: len(fake_firestore.listeners) == 2)
+        
+        assert len(mirror) == 3
+        assert mirror.stats['listener_evictions'] == 1
+        assert {watch.key for watch in fake_firestore.listeners} == {('spaces', 'space1'), ('spaces', 'space3')}
+        fake_firestore.set('spaces', 'space2', {'name': 'Renamed'})
+        assert (await mirror.get('spaces', 'space2'))['name'] == 'Renamed'
+        await wait_for(lambda: len(fake_firestore.listeners) == 2)
+        assert {watch.key for watch in fake_firestore.listeners} == {('spaces', 'space3'), ('spaces', 'space2')}
+    
+    @pytest.mark.asyncio
+    async def test_stopped_listener_bounds_staleness(self, fake_firestore):
+        """Test that documents without a running listener are re-read once stale."""
+        mirror = make_mirror(fake_firestore, max_staleness=0)
+        await mirror.get('spaces', 'space1')
+        fake_firestore.listeners[0].is_active = False
+        fake_firestore.set('spaces', 'space1', {'name': 'Renamed'})
+        
+        assert mirror.lookup('spaces', 'space1') is None
+        assert (await mirror.get('spaces', 'space1'))['name'] == 'Renamed'
+        assert fake_firestore.reads == 2
+        await wait_for(lambda: len(fake_firestore.listeners) == 1)
+        assert fake_firestore.listeners[0].is_active
+    
+    @pytest.mark.asyncio
+    async def test_older_snapshots_are_ignored(self, fake_firestore):
+        """Test that an out-of-order snapshot never replaces newer data."""
+        mirror = make_mirror(fake_firestore)
+        await mirror.get('spaces', 'space1')
+        current = mirror.lookup('spaces', 'space1')
+        
+        older = mock_snapshot('space1', {'name': 'Old'})
+        mirror._on_snapshot(('spaces', 'space1'), [older], [], current.read_time.replace(year=2000))
+        
+        assert (await mirror.get('spaces', 'space1'))['name'] == 'Space'
+    
+    @pytest.mark.asyncio
+    async def test_close_stops_listeners(self, fake_firestore):
+        mirror = make_mirror(fake_firestore)
+        await mirror.get('spaces', 'space1')
+        
+        await mirror.close()
+        
+        assert fake_firestore.listeners == []
+        assert len(mirror) == 0
+    
+    @pytest.mark.asyncio
+    async def test_update_from_mirror_is_one_rpc(self, fake_firestore):
+        """Test that updating a mirrored document needs no read."""
+        mirror = make_mirror(fake_firestore)
+        await mirror.get('spaces', 'space1')
+        doc_ref = fake_firestore.collection('spaces').document('space1')
+        
+        with patch.object(firestore_module, 'get_document_mirror', return_value=mirror):
+            updated = await update_document(doc_ref, {'status': 'inactive'})
+        
+        assert updated == {'name': 'Space', 'status': 'inactive', 'id': 'space1'}
+        assert (fake_firestore.reads, fake_firestore.writes) == (1, 1)
+        assert (await mirror.get('spaces', 'space1'))['status'] == 'inactive'
+    
+    @pytest.mark.asyncio
+    async def test_update_from_stale_mirror_retries(self, fake_firestore):
+        """Test that a stale mirrored copy fails the precondition and is re-read."""
+        mirror = make_mirror(fake_firestore)
+        await mirror.get('spaces', 'space1')
+        key = ('spaces', 'space1')
+        entry = mirror.lookup(*key)
+        mirror._entries[key] = MirroredDocument({'name': 'Stale', 'id': 'space1'}, entry.update_time.replace(year=2000), entry.read_time, entry.received_at)
+        doc_ref = fake_firestore.collection('spaces').document('space1')
+        
+        with patch.object(firestore_module, 'get_document_mirror', return_value=mirror):
+            updated = await update_document(doc_ref, {'status': 'inactive'})
+        
+        assert updated['name'] == 'Space'
+        assert fake_firestore.writes == 2
+    
+    @pytest.mark.asyncio
+    async def test_read_document_without_mirror(self, fake_firestore):
+        """Test that reads go to Firestore when the mirror is disabled."""
+        with patch.object(firestore_module.settings, 'FIRESTORE_MIRROR_ENABLED', False):
+            assert await read_document(fake_firestore, 'spaces', 'space1') is not None
+            assert await read_document(fake_firestore, 'spaces', 'space1') is not None
+        
+        assert fake_firestore.reads == 2
+    
+    @pytest.mark.asyncio
+    async def test_read_document_with_mirror(self, fake_firestore):
+        mirror = make_mirror(fake_firestore)
+        
+        with patch.object(firestore_module, 'get_document_mirror', return_value=mirror):
+            await read_document(fake_firestore, 'spaces', 'space1')
+            await read_document(fake_firestore, 'spaces', 'space1')
+        
+        assert fake_firestore.reads == 1
@@ -0,0 +1,255 @@
+"""Tests for materialized dashboard metrics snapshots."""
+
+import asyncio
+import httpx
+import pytest
+from unittest.mock import Mock, AsyncMock, patch
+from datetime import datetime, timedelta, timezone
+from fastapi.testclient import TestClient
+
+from src.coworkly_partner_api.app import app
+from src.coworkly_partner_api.models.partner_profile import PartnerContext
+from src.coworkly_partner_api.services.metrics_snapshots import (
+    match_standard_window,
+    read_snapshot,
+    precompute_partner_metrics,
+    precompute_all_partner_metrics,
+)
+from tests.firestore_mocks import async_stream, mock_document
+
+
+def snapshot_doc(metrics, computed_at=None, end_date=None, space_ids=("space1", "space2")):
+    """Build a mock snapshot document."""
+    doc = Mock()
+    doc.exists = True
+    doc.to_dict.return_value = {
+        "space_ids": list(space_ids),
+        "metrics": metrics,
+        "computed_at": computed_at or datetime.now(timezone.utc),
+        "end_date": end_date or datetime.now().date().isoformat(),
+    }
+    return doc
+
+
+class TestStandardWindows:
+    """Test cases for matching requests to precomputed windows."""
+    
+    def test_default_range_matches_default_window(self):
+        """Test that a request without dates matches the 30-day window."""
+        assert match_standard_window(None, None) == 30
+    
+    def test_range_ending_today_matches_window(self):
+        """Test that N days back to today matches a standard window."""
+        today = datetime.now()
+        assert match_standard_window(today - timedelta(days=7), today) == 7
+        assert match_standard_window(today - timedelta(days=90), None) == 90
+    
+    def test_other_ranges_do_not_match(self):
+        """Test that custom ranges fall back to live queries."""
+        today = datetime.now()
+        assert match_standard_window(today - timedelta(days=14), today) is None
+        assert match_standard_window(
+            today - timedelta(days=37), today - timedelta(days=7)
+        ) is None
+        assert match_standard_window(None, today - timedelta(days=1)) is None
+
+
+class TestReadSnapshot:
+    """Test cases for reading snapshots."""
+    
+    @pytest.mark.asyncio
+    @patch('src.coworkly_partner_api.services.metrics_snapshots.settings')
+    async def test_fresh_snapshot_is_returned(self, mock_settings):
+        """Test that a snapshot computed today within the max age is used."""
+        mock_settings.COLLECTIONS = {"dashboard_metrics": "dashboard_metrics_snapshots"}
+        mock_settings.DASHBOARD_METRICS_SNAPSHOT_MAX_AGE_SECONDS = 3600
+        db = Mock()
+        db.collection.return_value.document.return_value = mock_document(snapshot_doc({"profileViews": 5}))
+        
+        snapshot = await read_snapshot(db, "uid1", 30, ["space2", "space1", "space2"])
+        
+        assert snapshot["metrics"] == {"profileViews": 5}
+        db.collection.assert_called_once_with("dashboard_metrics_snapshots")
+        db.collection.return_value.document.assert_called_once_with("uid1_30d")
+    
+    @pytest.mark.asyncio
+    @patch('src.coworkly_partner_api.services.metrics_snapshots.settings')
+    async def test_stale_snapshot_is_ignored(self, mock_settings):
+        """Test that old or previous-day snapshots are not served."""
+        mock_settings.COLLECTIONS = {"dashboard_metrics": "dashboard_metrics_snapshots"}
+        mock_settings.DASHBOARD_METRICS_SNAPSHOT_MAX_AGE_SECONDS = 3600
+        db = Mock()
+        
+        db.collection.return_value.document.return_value = mock_document(snapshot_doc(
+            {"profileViews": 5}, computed_at=datetime.now(timezone.utc) - timedelta(hours=2)
+        ))
+        assert await read_snapshot(db, "uid1", 30, ["space1", "space2"]) is None
+        
+        yesterday = (datetime.now() - timedelta(days=1)).date().isoformat()
+        db.collection.return_value.document.return_value = mock_document(snapshot_doc(
+            {"profileViews": 5}, end_date=yesterday
+        ))
+        assert await read_snapshot(db, "uid1", 30, ["space1", "space2"]) is None
+    
+    @pytest.mark.asyncio
+    @patch('src.coworkly_partner_api.services.metrics_snapshots.settings')
+    async def test_snapshot_of_other_spaces_is_ignored(self, mock_settings):
+        """Test that a snapshot is not served once the partner's spaces have changed."""
+        mock_settings.COLLECTIONS = {"dashboard_metrics": "dashboard_metrics_snapshots"}
+        mock_settings.DASHBOARD_METRICS_SNAPSHOT_MAX_AGE_SECONDS = 3600
+        db = Mock()
+        db.collection.return_value.document.return_value = mock_document(snapshot_doc({"profileViews": 5}))
+        
+        assert await read_snapshot(db, "uid1", 30, ["space1", "space2", "space3"]) is None
+        assert await read_snapshot(db, "uid1", 30, ["space1"]) is None
+
+
+class TestPrecompute:
+    """Test cases for the precomputation job."""
+    
+    @pytest.mark.asyncio
+    async def test_precompute_partner_metrics_writes_every_window(self):
+        """Test that all windows are summed from one daily series fetch."""
+        today = datetime.now().date()
+        amplitude_service = Mock()
+        amplitude_service.get_dashboard_daily_series = AsyncMock(return_value={
+            "profileViews": {
+                today: 1,
+                today - timedelta(days=10): 10,
+                today - timedelta(days=60): 100,
+            }
+        })
+        db = Mock()
+        db.collection.return_value.document.return_value = mock_document()
+        
+        results = await precompute_partner_metrics(db, amplitude_service, "uid1", ["b", "a"])
+        
+        assert results == {
+            7: {"profileViews": 1},
+            30: {"profileViews": 11},
+            90: {"profileViews": 111},
+        }
+        amplitude_service.get_dashboard_daily_series.assert_awaited_once()
+        written = db.collection.return_value.document.return_value.set.await_args_list
+        assert len(written) == 3
+        assert written[0][0][0]["space_ids"] == ["a", "b"]
+    
+    @pytest.mark.asyncio
+    async def test_precompute_all_skips_partners_without_spaces(self):
+        """Test the job summary over active partner profiles."""
+        profile_with_spaces = Mock(id="uid1")
+        profile_with_spaces.to_dict.return_value = {"spaceIds": ["space1"]}
+        profile_without_spaces = Mock(id="uid2")
+        profile_without_spaces.to_dict.return_value = {"spaceIds": []}
+        db = Mock()
+        db.collection.return_value.where.return_value.stream.return_value = async_stream([
+            profile_with_spaces, profile_without_spaces
+        ])
+        db.collection.return_value.document.return_value = mock_document()
+        amplitude_service = Mock()
+        amplitude_service.get_dashboard_daily_series = AsyncMock(return_value={})
+        
+        summary = await precompute_all_partner_metrics(db, amplitude_service, concurrency=2)
+        
+        assert summary == {"computed": 1, "skipped": 1, "failed": 0}
+        db.collection.return_value.where.assert_called_once_with('status', '==', 'active')
+
+
+class TestSnapshotRoute:
+    """Test cases for serving snapshots from the dashboard metrics route."""
+    
+    def test_route_serves_snapshot_without_amplitude(self):
+        """Test that a matching window is served from the materialized snapshot."""
+        import src.coworkly_partner_api.api.dashboard_metrics as dashboard_metrics_module
+        
+        async def mock_partner_context(authorization: str = None):
+            return PartnerContext(uid="test-user-id", status="active", spaceIds=["space1"])
+        
+        app.dependency_overrides[dashboard_metrics_module.get_partner_context] = mock_partner_context
+        try:
+            with patch.object(dashboard_metrics_module, 'get_async_firestore_client'), \
+                 patch.object(dashboard_metrics_module, 'read_snapshot') as mock_read_snapshot, \
+                 patch.object(dashboard_metrics_module, 'get_amplitude_service') as mock_get_service:
+                mock_read_snapshot.return_value = {
+                    "metrics": {"profileViews": 42},
+                    "computed_at": datetime.now(timezone.utc) - timedelta(seconds=120)
+                }
+                
+                response = TestClient(app).get(
+                    "/dashboard-metrics/",
+                    headers={"Authorization": "Bearer test-token"}
+                )
+                
+                assert response.status_code == 200
+                assert response.json()["profileViews"] == 42
+                # The age of the data is the age of the snapshot
+                assert int(response.headers["Age"]) >= 120
+                assert mock_read_snapshot.call_args[0][1:] == ("test-user-id", 30, ["space1"])
+                mock_get_service.assert_not_called()
+        finally:
+            app.dependency_overrides = {}
+    
+    @pytest.mark.asyncio
+    async def test_stale_snapshot_response_refreshed_live(self):
+        """Test that a stale response from a snapshot is refreshed from Amplitude, not the same snapshot."""
+        import src.coworkly_partner_api.api.dashboard_metrics as dashboard_metrics_module
+        
+        async def mock_partner_context(authorization: str = None):
+            return PartnerContext(uid="test-user-id", status="active", spaceIds=["space1"])
+        
+        app.dependency_overrides[dashboard_metrics_module.get_partner_context] = mock_partner_context
+        try:
+            with patch.object(dashboard_metrics_module, 'get_async_firestore_client'), \
+                 patch.object(dashboard_metrics_module, 'read_snapshot') as mock_read_snapshot, \
+                 patch.object(dashboard_metrics_module, 'get_amplitude_service') as mock_get_service:
+                mock_read_snapshot.return_value = {
+                    "metrics": {"profileViews": 42},
+                    "computed_at": datetime.now(timezone.utc) - timedelta(minutes=20)
+                }
+                mock_get_service.return_value.get_dashboard_metrics = AsyncMock(return_value={"profileViews": 43})
+                
+                transport = httpx.ASGITransport(app=app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+                    first = await http.get("/dashboard-metrics/", headers={"Authorization": "Bearer test-token"})
+                    second = await http.get("/dashboard-metrics/", headers={"Authorization": "Bearer test-token"})
+                    await asyncio.gather(*dashboard_metrics_module._refresh_tasks)
+                    third = await http.get("/dashboard-metrics/", headers={"Authorization": "Bearer test-token"})
+                
+                # Cached with the snapshot's age, so it is stale from the start
+                assert (first.headers["X-Cache"], first.json()["profileViews"]) == ("MISS", 42)
+                assert (second.headers["X-Cache"], second.json()["profileViews"]) == ("STALE", 42)
+                assert int(second.headers["Age"]) >= 1200
+                assert third.headers["X-Cache"] == "HIT"
+                assert third.json()["profileViews"] == 43
+                mock_get_service.return_value.get_dashboard_metrics.assert_awaited_once()
+        finally:
+            app.dependency_overrides = {}
+    
+    def test_snapshot_beyond_stale_tolerance_not_served(self):
+        """Test that a snapshot older than the stale tolerance is computed live instead."""
+        import src.coworkly_partner_api.api.dashboard_metrics as dashboard_metrics_module
+        
+        async def mock_partner_context(authorization: str = None):
+            return PartnerContext(uid="test-user-id", status="active", spaceIds=["space1"])
+        
+        app.dependency_overrides[dashboard_metrics_module.get_partner_context] = mock_partner_context
+        try:
+            with patch.object(dashboard_metrics_module, 'get_async_firestore_client'), \
+                 patch.object(dashboard_metrics_module, 'read_snapshot') as mock_read_snapshot, \
+                 patch.object(dashboard_metrics_module, 'get_amplitude_service') as mock_get_service:
+                mock_read_snapshot.return_value = {
+                    "metrics": {"profileViews": 42},
+                    "computed_at": datetime.now(timezone.utc) - timedelta(minutes=70)
+                }
+                mock_get_service.return_value.get_dashboard_metrics = AsyncMock(return_value={"profileViews": 43})
+                
+                response = TestClient(app).get(
+                    "/dashboard-metrics/",
+                    headers={"Authorization": "Bearer test-token"}
+                )
+                
+                assert response.json()["profileViews"] == 43
+                assert response.headers["X-Cache"] == "MISS"
+                assert int(response.headers["Age"]) < 60
+        finally:
+            app.dependency_overrides = {}
@@ -1,14 +1,16 @@
 """Tests for partner profiles API."""
 
 import pytest
-from unittest.mock import Mock, patch
+from datetime import datetime, timezone
+from unittest.mock import Mock, AsyncMock, patch
 from fastapi.testclient import TestClient
-from firebase_admin import firestore
+from google.api_core.exceptions import AlreadyExists
 
 from src.coworkly_partner_api.app import app
 from src.coworkly_partner_api.models.partner_profile import PartnerProfileCreate
 from src.coworkly_partner_api.services.auth import get_user_info
 from src.coworkly_partner_api.utils.encoding import encrypt_space_id
+from tests.firestore_mocks import async_stream, mock_snapshot, mock_document, mock_async_db
 
 client = TestClient(app)
 
@@ -18,48 +20,59 @@ def override_auth_dependency():
     yield
     app.dependency_overrides.pop(get_user_info, None)
 
+
+def partner_profiles_db(existing_profiles, space_snapshot, created_profile=None):
+    """Mock the collections read and written when creating a profile.
+    
+    The batch committing the claim and profile is ``db.write_batch``.
+    """
+    profiles = Mock()
+    profiles.where.return_value.limit.return_value.stream.side_effect = lambda: async_stream(existing_profiles)
+    new_profile_ref = mock_document(created_profile)
+    profiles.document.return_value = new_profile_ref
+    
+    spaces = Mock()
+    spaces.document.return_value = mock_document(space_snapshot)
+    
+    claims = Mock()
+    claims.document.side_effect = lambda space_id: Mock(id=space_id)
+    
+    db = mock_async_db({'partner_profiles': profiles, 'spaces': spaces, 'space_claims': claims})
+    db.write_batch = Mock()
+    db.write_batch.commit = AsyncMock()
+    db.batch.return_value = db.write_batch
+    return db, new_profile_ref
+
+
+def matching_space(space_id='space123'):
+    return mock_snapshot(space_id, {
+        'name': 'Test Space',
+        'details': {
+            'contact': {
+                'email': 'test@example.com'
+            }
+        }
+    })
+
+
 class TestPartnerProfilesAPI:
     """Test cases for partner profiles API endpoints."""
     
-    @patch('src.coworkly_partner_api.services.firestore.get_firestore_client')
+    @patch('src.coworkly_partner_api.api.partner_profiles.get_async_firestore_client')
     def test_create_partner_profile_success(self, mock_get_firestore):
         """Test successful partner profile creation."""
-        # Mock Firestore client
-        mock_db = Mock()
-        mock_get_firestore.return_value = mock_db
-        
-        # Mock existing profiles query (no existing profiles)
-        mock_profiles_query = Mock()
-        mock_db.collection.return_value.where.return_value.stream.return_value = []
-        
-        # Mock space document (exists)
-        mock_space_doc = Mock()
-        mock_space_doc.exists = True
-        mock_space_doc.to_dict.return_value = {
-            'id': 'space123',
+        now = datetime.now(timezone.utc)
+        space_doc = mock_snapshot('space123', {
             'name': 'Test Space',
             'details': {
                 'contact': {
                     'email': 'test@example.com'
                 }
             }
-        }
-        mock_db.collection.return_value.document.return_value.get.return_value = mock_space_doc
-        
-        # Mock partner profile creation
-        mock_new_profile_ref = Mock()
-        mock_db.collection.return_value.document.return_value = mock_new_profile_ref
-        
-        # Mock created profile data
-        mock_created_profile = Mock()
-        mock_created_profile.to_dict.return_value = {
-            'email': 'test@example.com',
-            'spaceIds': ['space123'],
-            'status': 'active',
-            'created_at': firestore.SERVER_TIMESTAMP,
-            'updated_at': firestore.SERVER_TIMESTAMP
-        }
-        mock_new_profile_ref.get.return_value = mock_created_profile
+        })
+        mock_db, new_profile_ref = partner_profiles_db([], space_doc)
+        mock_db.write_batch.commit.return_value = [Mock(update_time=now), Mock(update_time=now)]
+        mock_get_firestore.return_value = mock_db
         
         # Test data with properly encrypted space ID
         test_data = {
@@ -75,20 +88,24 @@ class TestPartnerProfilesAPI:
         assert data['email'] == 'test@example.com'
         assert data['spaceIds'] == ['space123']
         assert data['status'] == 'active'
+        assert datetime.fromisoformat(data['createdAt']) == now
+        # The claim and the profile are written in one commit
+        (claim_ref, claim), (profile_ref, profile) = [c[0] for c in mock_db.write_batch.create.call_args_list]
+        assert claim_ref.id == 'space123'
+        assert claim['uid'] == 'test_uid'
+        assert profile_ref is new_profile_ref
+        assert profile['spaceIds'] == ['space123']
+        mock_db.write_batch.commit.assert_awaited_once()
+        # The response is built from the commit time, not a read-back
+        new_profile_ref.get.assert_not_awaited()
     
-    @patch('src.coworkly_partner_api.services.firestore.get_firestore_client')
+    @patch('src.coworkly_partner_api.api.partner_profiles.get_async_firestore_client')
     def test_create_partner_profile_already_exists(self, mock_get_firestore):
         """Test partner profile creation when profile already exists."""
-        # Mock Firestore client
-        mock_db = Mock()
+        existing_doc = mock_snapshot('other_uid', {'spaceIds': ['space123']})
+        mock_db, _ = partner_profiles_db([existing_doc], None)
         mock_get_firestore.return_value = mock_db
         
-        # Mock existing profiles query (profile exists)
-        mock_existing_doc = Mock()
-        mock_existing_doc.exists = True
-        mock_profiles_query = Mock()
-        mock_db.collection.return_value.where.return_value.stream.return_value = [mock_existing_doc]
-        
         # Test data with properly encrypted space ID
         test_data = {
             "hashed_space_id": encrypt_space_id("space123")
@@ -100,22 +117,56 @@ class TestPartnerProfilesAPI:
         # Assertions
         assert response.status_code == 409
         assert "already exists" in response.json()['detail']
+        mock_db.write_batch.commit.assert_not_awaited()
     
-    @patch('src.coworkly_partner_api.services.firestore.get_firestore_client')
-    def test_create_partner_profile_space_not_found(self, mock_get_firestore):
-        """Test partner profile creation when space doesn't exist."""
-        # Mock Firestore client
-        mock_db = Mock()
+    @patch('src.coworkly_partner_api.api.partner_profiles.get_async_firestore_client')
+    def test_create_partner_profile_space_already_claimed(self, mock_get_firestore):
+        """Test that a concurrent registration losing the claim gets 409."""
+        mock_db, _ = partner_profiles_db([], matching_space(), mock_snapshot('test_uid', exists=False))
+        mock_db.write_batch.commit.side_effect = AlreadyExists("claim exists")
         mock_get_firestore.return_value = mock_db
         
-        # Mock existing profiles query (no existing profiles)
-        mock_profiles_query = Mock()
-        mock_db.collection.return_value.where.return_value.stream.return_value = []
+        response = client.post("/partner-profiles/", json={"hashed_space_id": encrypt_space_id("space123")})
         
-        # Mock space document (doesn't exist)
-        mock_space_doc = Mock()
-        mock_space_doc.exists = False
-        mock_db.collection.return_value.document.return_value.get.return_value = mock_space_doc
+        assert response.status_code == 409
+        assert response.json()['detail'] == "Partner profile already exists with this space ID"
+    
+    @patch('src.coworkly_partner_api.api.partner_profiles.get_async_firestore_client')
+    def test_create_partner_profile_user_has_profile(self, mock_get_firestore):
+        """Test that a user with a profile cannot replace it by registering another space."""
+        existing_profile = mock_snapshot('test_uid', {'spaceIds': ['spaceA']})
+        mock_db, profile_ref = partner_profiles_db([], matching_space(), existing_profile)
+        mock_db.write_batch.commit.side_effect = AlreadyExists("profile exists")
+        mock_get_firestore.return_value = mock_db
+        
+        response = client.post("/partner-profiles/", json={"hashed_space_id": encrypt_space_id("space123")})
+        
+        assert response.status_code == 409
+        assert response.json()['detail'] == "Partner profile already exists for this user"
+        # The profile is created with a precondition, never overwritten
+        mock_db.write_batch.set.assert_not_called()
+        assert mock_db.write_batch.create.call_args_list[1][0][0] is profile_ref
+    
+    @patch('src.coworkly_partner_api.api.partner_profiles.get_async_firestore_client')
+    def test_create_partner_profile_without_legacy_check(self, mock_get_firestore):
+        """Test that only the claim guards uniqueness once the legacy check is off."""
+        now = datetime.now(timezone.utc)
+        mock_db, _ = partner_profiles_db([], matching_space())
+        mock_db.write_batch.commit.return_value = [Mock(update_time=now), Mock(update_time=now)]
+        mock_get_firestore.return_value = mock_db
+        
+        with patch('src.coworkly_partner_api.api.partner_profiles.settings.PARTNER_PROFILE_LEGACY_CLAIM_CHECK', False):
+            response = client.post("/partner-profiles/", json={"hashed_space_id": encrypt_space_id("space123")})
+        
+        assert response.status_code == 200
+        mock_db.collection('partner_profiles').where.assert_not_called()
+    
+    @patch('src.coworkly_partner_api.api.partner_profiles.get_async_firestore_client')
+    def test_create_partner_profile_space_not_found(self, mock_get_firestore):
+        """Test partner profile creation when space doesn't exist."""
+        space_doc = mock_snapshot('nonexistent_space', exists=False)
+        mock_db, _ = partner_profiles_db([], space_doc)
+        mock_get_firestore.return_value = mock_db
         
         # Test data with properly encrypted space ID
         test_data = {
@@ -129,30 +180,19 @@ class TestPartnerProfilesAPI:
         assert response.status_code == 404
         assert "Space not found" in response.json()['detail']
     
-    @patch('src.coworkly_partner_api.services.firestore.get_firestore_client')
+    @patch('src.coworkly_partner_api.api.partner_profiles.get_async_firestore_client')
     def test_create_partner_profile_email_mismatch(self, mock_get_firestore):
         """Test partner profile creation when user email doesn't match space email."""
-        # Mock Firestore client
-        mock_db = Mock()
-        mock_get_firestore.return_value = mock_db
-        
-        # Mock existing profiles query (no existing profiles)
-        mock_profiles_query = Mock()
-        mock_db.collection.return_value.where.return_value.stream.return_value = []
-        
-        # Mock space document (exists but with different email)
-        mock_space_doc = Mock()
-        mock_space_doc.exists = True
-        mock_space_doc.to_dict.return_value = {
-            'id': 'space123',
+        space_doc = mock_snapshot('space123', {
             'name': 'Test Space',
             'details': {
                 'contact': {
                     'email': 'different@example.com'  # Different email
                 }
             }
-        }
-        mock_db.collection.return_value.document.return_value.get.return_value = mock_space_doc
+        })
+        mock_db, _ = partner_profiles_db([], space_doc)
+        mock_get_firestore.return_value = mock_db
         
         # Test data with properly encrypted space ID
         test_data = {
@@ -164,4 +204,46 @@ class TestPartnerProfilesAPI:
         
         # Assertions
         assert response.status_code == 403
-        assert "User email does not match" in response.json()['detail'] 
\ No newline at end of file
+        assert "User email does not match" in response.json()['detail']
+        mock_db.write_batch.commit.assert_not_awaited()
+    
+    @patch('src.coworkly_partner_api.api.partner_profiles.get_async_firestore_client')
+    def test_get_my_partner_profile(self, mock_get_firestore):
+        """Test fetching the caller's own profile."""
+        profile_doc = mock_snapshot('test_uid', {
+            'email': 'test@example.com',
+            'spaceIds': ['space123'],
+            'status': 'active'
+        })
+        mock_db, profile_ref = partner_profiles_db([], None, profile_doc)
+        mock_get_firestore.return_value = mock_db
+        
+        response = client.get("/partner-profiles/me")
+        
+        assert response.status_code == 200
+        assert response.json()['spaceIds'] == ['space123']
+        assert response.json()['id'] == 'test_uid'
+        profile_ref.get.assert_awaited_once_with(field_paths=None)
+    
+    @patch('src.coworkly_partner_api.api.partner_profiles.get_async_firestore_client')
+    def test_get_my_partner_profile_fields(self, mock_get_firestore):
+        """Test that a fieldset is pushed down to Firestore and trims the response."""
+        profile_doc = mock_snapshot('test_uid', {'status': 'active'})
+        mock_db, profile_ref = partner_profiles_db([], None, profile_doc)
+        mock_get_firestore.return_value = mock_db
+        
+        response = client.get("/partner-profiles/me?fields=status")
+        
+        assert response.status_code == 200
+        assert response.json() == {'id': 'test_uid', 'status': 'active'}
+        profile_ref.get.assert_awaited_once_with(field_paths=['status'])
+    
+    @patch('src.coworkly_partner_api.api.partner_profiles.get_async_firestore_client')
+    def test_get_my_partner_profile_not_found(self, mock_get_firestore):
+        """Test that a user without a profile gets 404."""
+        mock_db, _ = partner_profiles_db([], None, mock_snapshot('test_uid', exists=False))
+        mock_get_firestore.return_value = mock_db
+        
+        response = client.get("/partner-profiles/me")
+        
+        assert response.status_code == 404
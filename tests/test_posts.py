@@ -0,0 +1,452 @@
+"""Tests for posts API."""
+
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import Mock, AsyncMock, patch
+from fastapi.testclient import TestClient
+from google.api_core.exceptions import AlreadyExists, NotFound
+
+from src.coworkly_partner_api.app import app
+from src.coworkly_partner_api.models.partner_profile import PartnerContext
+from src.coworkly_partner_api.services.auth import get_partner_context
+from src.coworkly_partner_api.utils.pagination import encode_cursor, decode_cursor, InvalidCursorError
+from tests.firestore_mocks import async_stream, mock_snapshot, mock_document, mock_async_db
+
+client = TestClient(app)
+
+POST_DATA = {
+    'author': {'id': 'author1', 'name': 'Author'},
+    'content': 'Hello',
+    'space_id': 'space1',
+    'likes_count': 2,
+}
+
+
+@pytest.fixture(autouse=True)
+def override_auth_dependency():
+    async def mock_partner_context(authorization: str = None):
+        return PartnerContext(uid="test_uid", status="active", spaceIds=["space1"])
+    app.dependency_overrides[get_partner_context] = mock_partner_context
+    yield
+    app.dependency_overrides.pop(get_partner_context, None)
+
+
+@pytest.fixture
+def posts_collection():
+    """Mock the posts collection of the async Firestore client."""
+    with patch('src.coworkly_partner_api.api.posts.get_async_firestore_client') as mock_get_firestore:
+        posts = Mock()
+        mock_get_firestore.return_value = mock_async_db({'posts': posts})
+        yield posts
+
+
+@pytest.fixture
+def posts_query(posts_collection):
+    """Mock the ordered posts-by-space query, returning it for chained calls."""
+    query = Mock()
+    posts_collection.where.return_value.order_by.return_value.order_by.return_value = query
+    query.start_after.return_value = query
+    query.select.return_value = query
+    query.docs = []
+    query.limit.return_value.stream.side_effect = lambda: async_stream(query.docs)
+    return query
+
+
+def mock_subcollections(post_ref, documents):
+    """Mock a post's subcollections from a ``{name: [document IDs]}`` mapping."""
+    def collection(name):
+        subcollection = Mock()
+        subcollection.list_documents.side_effect = lambda: async_stream([
+            Mock(id=doc_id, path=f'posts/{post_ref.id}/{name}/{doc_id}') for doc_id in documents.get(name, [])
+        ])
+        return subcollection
+    post_ref.collection.side_effect = collection
+
+
+@pytest.fixture
+def bulk_db():
+    """Mock an AsyncClient for batched post writes.
+    
+    ``db.posts`` holds the IDs of existing posts, ``db.subcollections`` the
+    subcollection documents of posts by ID and ``db.batches`` every batch
+    created.
+    """
+    with patch('src.coworkly_partner_api.api.posts.get_async_firestore_client') as mock_get_firestore:
+        posts = Mock()
+        auto_ids = iter(range(100000))
+        
+        def document(post_id=None):
+            post_ref = Mock()
+            post_ref.id = post_id if post_id is not None else f"auto{next(auto_ids)}"
+            mock_subcollections(post_ref, db.subcollections.get(post_ref.id, {}))
+            return post_ref
+        
+        posts.document.side_effect = document
+        db = mock_async_db({'posts': posts})
+        db.posts = set()
+        db.subcollections = {}
+        db.batches = []
+        
+        def batch():
+            write_batch = Mock()
+            write_batch.commit = AsyncMock(side_effect=lambda: [
+                Mock(update_time=datetime(2024, 1, 1, tzinfo=timezone.utc))
+                for _ in write_batch.create.call_args_list + write_batch.delete.call_args_list
+            ])
+            db.batches.append(write_batch)
+            return write_batch
+        
+        def get_all(references, field_paths=None):
+            snapshots = []
+            for post_ref in references:
+                snapshot = mock_snapshot(post_ref.id, exists=post_ref.id in db.posts)
+                snapshot.reference = post_ref
+                snapshots.append(snapshot)
+            return async_stream(snapshots)
+        
+        db.batch.side_effect = batch
+        db.get_all = Mock(side_effect=get_all)
+        mock_get_firestore.return_value = db
+        yield db
+
+
+def feed_posts(count):
+    """Build post snapshots, newest first."""
+    return [
+        mock_snapshot(f'post{i}', {
+            **POST_DATA,
+            'created_at': datetime(2024, 1, 1, 12, 0, count - i, tzinfo=timezone.utc)
+        })
+        for i in range(count)
+    ]
+
+
+class TestPostsAPI:
+    """Test cases for posts API endpoints."""
+    
+    def test_create_post_ignores_counts(self, posts_collection):
+        """Test that a new post's counts start at zero whatever the client sent."""
+        new_post_ref = mock_document()
+        new_post_ref.id = 'post1'
+        posts_collection.add = AsyncMock(return_value=(datetime.now(timezone.utc), new_post_ref))
+        
+        response = client.post("/posts/", json={
+            'author': {'id': 'a1', 'name': 'A'}, 'content': 'Hi', 'likesCount': 1000, 'commentsCount': 50
+        })
+        
+        assert response.status_code == 200
+        stored = posts_collection.add.call_args[0][0]
+        assert (stored['likes_count'], stored['comments_count']) == (0, 0)
+        assert (response.json()['likesCount'], response.json()['commentsCount']) == (0, 0)
+    
+    def test_create_post_without_read_back(self, posts_collection):
+        """Test that a created post is returned from the write result."""
+        now = datetime.now(timezone.utc)
+        new_post_ref = mock_document()
+        new_post_ref.id = 'post1'
+        posts_collection.add = AsyncMock(return_value=(now, new_post_ref))
+        
+        response = client.post("/posts/", json={'author': {'id': 'a1', 'name': 'A'}, 'content': 'Hi'})
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data['id'] == 'post1'
+        assert datetime.fromisoformat(data['createdAt']) == now
+        new_post_ref.get.assert_not_awaited()
+    
+    def test_update_post_merges_locally(self, posts_collection):
+        """Test that the update is applied with a precondition and merged locally."""
+        snapshot = mock_snapshot('post1', POST_DATA)
+        snapshot.update_time = datetime.now(timezone.utc)
+        post_ref = mock_document(snapshot)
+        posts_collection.document.return_value = post_ref
+        
+        response = client.patch("/posts/post1", json={'content': 'Updated'})
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data['content'] == 'Updated'
+        assert data['likesCount'] == 2
+        post_ref.get.assert_awaited_once()
+        assert post_ref.update.await_args[0][0] == {'content': 'Updated'}
+        assert post_ref.update.await_args[1]['option'] is not None
+    
+    def test_update_post_not_found(self, posts_collection):
+        """Test that updating a missing post returns 404."""
+        post_ref = mock_document(mock_snapshot('missing', exists=False))
+        posts_collection.document.return_value = post_ref
+        
+        response = client.patch("/posts/missing", json={'content': 'Updated'})
+        
+        assert response.status_code == 404
+        post_ref.update.assert_not_awaited()
+    
+    def test_delete_post_with_exists_precondition(self, posts_collection):
+        """Test that a post without shards or likes is deleted in one call."""
+        post_ref = mock_document()
+        mock_subcollections(post_ref, {})
+        posts_collection.document.return_value = post_ref
+        
+        response = client.delete("/posts/post1")
+        
+        assert response.status_code == 200
+        post_ref.get.assert_not_awaited()
+        post_ref.delete.assert_awaited_once()
+    
+    def test_delete_post_with_shards_and_likes(self, bulk_db):
+        """Test that a post's counter shards and likes are deleted before it."""
+        bulk_db.subcollections = {'post1': {'counter_shards': ['0', 'base'], 'likes': ['uid1']}}
+        post_ref = bulk_db.collection('posts').document('post1')
+        post_ref.delete = AsyncMock()
+        bulk_db.collection('posts').document.side_effect = None
+        bulk_db.collection('posts').document.return_value = post_ref
+        
+        response = client.delete("/posts/post1")
+        
+        assert response.status_code == 200
+        assert [call[0][0].path for call in bulk_db.batches[0].delete.call_args_list] == [
+            'posts/post1/counter_shards/0', 'posts/post1/counter_shards/base', 'posts/post1/likes/uid1'
+        ]
+        post_ref.delete.assert_awaited_once()
+    
+    def test_delete_post_not_found(self, posts_collection):
+        """Test that deleting a missing post returns 404."""
+        post_ref = mock_document()
+        mock_subcollections(post_ref, {})
+        post_ref.delete.side_effect = NotFound("no document")
+        posts_collection.document.return_value = post_ref
+        
+        response = client.delete("/posts/missing")
+        
+        assert response.status_code == 404
+    
+    def test_get_post_aggregates_counter_shards(self, posts_collection):
+        """Test that like and comment counts are summed from the shards."""
+        post_ref = mock_document(mock_snapshot('post1', POST_DATA))
+        post_ref.collection.return_value.stream.side_effect = lambda: async_stream([
+            mock_snapshot('0', {'likes_count': 3}),
+            mock_snapshot('4', {'likes_count': 1, 'comments_count': 2}),
+        ])
+        posts_collection.document.return_value = post_ref
+        
+        response = client.get("/posts/post1")
+        
+        assert response.status_code == 200
+        # Not rolled up yet, so the count stored on the post is added
+        assert response.json()['likesCount'] == 2 + 4
+        assert response.json()['commentsCount'] == 2
+        post_ref.collection.assert_called_with('counter_shards')
+    
+    def test_get_post_fields_without_counts(self, posts_collection):
+        """Test that shards are not read when no count is requested."""
+        post_ref = mock_document(mock_snapshot('post1', {'content': 'Hello'}))
+        posts_collection.document.return_value = post_ref
+        
+        response = client.get("/posts/post1?fields=content")
+        
+        assert response.json() == {'id': 'post1', 'content': 'Hello'}
+        post_ref.collection.assert_not_called()
+    
+    def test_update_post_cannot_set_counts(self, posts_collection):
+        """Test that counts are no longer writable through PATCH."""
+        response = client.patch("/posts/post1", json={'likesCount': 100})
+        
+        assert response.status_code == 400
+        posts_collection.document.assert_not_called()
+    
+    def test_like_post(self, bulk_db):
+        """Test that a like creates the user's like document and increments a shard."""
+        post_ref = mock_document(mock_snapshot('post1', POST_DATA))
+        bulk_db.collection('posts').document.side_effect = None
+        bulk_db.collection('posts').document.return_value = post_ref
+        
+        response = client.post("/posts/post1/like")
+        
+        assert response.status_code == 200
+        assert response.json() == {'postId': 'post1', 'liked': True, 'changed': True}
+        batch = bulk_db.batches[0]
+        assert batch.create.call_args[0][1]['uid'] == 'test_uid'
+        post_ref.collection.return_value.document.assert_any_call('test_uid')
+        shard_data = batch.set.call_args[0][1]
+        assert shard_data['likes_count'].value == 1
+        assert batch.set.call_args[1] == {'merge': True}
+    
+    def test_like_post_twice(self, bulk_db):
+        """Test that liking again does not increment the counter."""
+        post_ref = mock_document(mock_snapshot('post1', POST_DATA))
+        bulk_db.collection('posts').document.side_effect = None
+        bulk_db.collection('posts').document.return_value = post_ref
+        bulk_db.batch.side_effect = lambda: Mock(commit=AsyncMock(side_effect=AlreadyExists("liked")))
+        
+        response = client.post("/posts/post1/like")
+        
+        assert response.status_code == 200
+        assert response.json()['changed'] is False
+    
+    def test_like_missing_post(self, bulk_db):
+        post_ref = mock_document(mock_snapshot('missing', exists=False))
+        bulk_db.collection('posts').document.side_effect = None
+        bulk_db.collection('posts').document.return_value = post_ref
+        
+        response = client.post("/posts/missing/like")
+        
+        assert response.status_code == 404
+        assert bulk_db.batches == []
+    
+    def test_unlike_post(self, bulk_db):
+        """Test that unliking deletes the like with a precondition and decrements."""
+        response = client.delete("/posts/post1/like")
+        
+        assert response.status_code == 200
+        assert response.json() == {'postId': 'post1', 'liked': False, 'changed': True}
+        batch = bulk_db.batches[0]
+        assert batch.delete.call_args[1]['option'] is not None
+        assert batch.set.call_args[0][1]['likes_count'].value == -1
+    
+    def test_unlike_post_not_liked(self, bulk_db):
+        """Test that unliking without a like does not decrement the counter."""
+        bulk_db.batch.side_effect = lambda: Mock(commit=AsyncMock(side_effect=NotFound("no like")))
+        
+        response = client.delete("/posts/post1/like")
+        
+        assert response.status_code == 200
+        assert response.json()['changed'] is False
+    
+    def test_posts_by_space_first_page(self, posts_query):
+        """Test that one extra post is read to build the next cursor."""
+        posts_query.docs = feed_posts(3)
+        
+        response = client.get("/posts/space/space1?limit=2")
+        
+        assert response.status_code == 200
+        assert [post['id'] for post in response.json()] == ['post0', 'post1']
+        posts_query.limit.assert_called_once_with(3)
+        posts_query.start_after.assert_not_called()
+        created_at, doc_id = decode_cursor(response.headers['X-Next-Cursor'])
+        assert doc_id == 'post1'
+        assert created_at == datetime(2024, 1, 1, 12, 0, 2, tzinfo=timezone.utc)
+    
+    def test_posts_by_space_next_page(self, posts_query):
+        """Test that a cursor resumes after the last post of the previous page."""
+        posts_query.docs = feed_posts(1)
+        created_at = datetime(2024, 1, 1, 12, 0, 2, tzinfo=timezone.utc)
+        
+        response = client.get(f"/posts/space/space1?cursor={encode_cursor(created_at, 'post1')}")
+        
+        assert response.status_code == 200
+        assert len(response.json()) == 1
+        assert 'X-Next-Cursor' not in response.headers
+        posts_query.start_after.assert_called_once_with({'created_at': created_at, '__name__': 'post1'})
+        posts_query.limit.assert_called_once_with(21)
+    
+    def test_posts_by_space_invalid_cursor(self, posts_query):
+        """Test that a malformed cursor is rejected."""
+        response = client.get("/posts/space/space1?cursor=not-a-cursor")
+        
+        assert response.status_code == 400
+    
+    def test_posts_by_space_limit_bounds(self, posts_query):
+        """Test that the page size is capped."""
+        assert client.get("/posts/space/space1?limit=0").status_code == 422
+        assert client.get("/posts/space/space1?limit=101").status_code == 422
+    
+    def test_posts_by_space_projection(self, posts_query):
+        """Test that only the requested fields are read and returned."""
+        posts_query.docs = [mock_snapshot('post0', {
+            'content': 'Hello',
+            'created_at': datetime(2024, 1, 1, tzinfo=timezone.utc)
+        })]
+        
+        response = client.get("/posts/space/space1?fields=content,likesCount")
+        
+        assert response.status_code == 200
+        assert response.json() == [{'id': 'post0', 'content': 'Hello', 'likesCount': 0}]
+        posts_query.select.assert_called_once_with(['content', 'created_at', 'likesCount', 'likes_count'])
+    
+    def test_posts_by_space_unknown_field(self, posts_query):
+        """Test that unknown projection fields are rejected."""
+        response = client.get("/posts/space/space1?fields=content,password")
+        
+        assert response.status_code == 400
+        assert 'password' in response.json()['detail']
+    
+    
+    def test_bulk_create_in_batches(self, bulk_db):
+        """Test that posts are created in batches of at most 500 writes."""
+        posts = [{'author': {'id': 'a1', 'name': 'A'}, 'content': f'Post {i}', 'likesCount': 7} for i in range(501)]
+        
+        response = client.post("/posts/bulk", json={'posts': posts})
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data) == 501
+        assert all(item['status'] == 'created' for item in data)
+        assert data[0]['post']['content'] == 'Post 0'
+        assert data[0]['post']['createdAt'] == '2024-01-01T00:00:00Z'
+        assert len({item['id'] for item in data}) == 501
+        assert [batch.create.call_count for batch in bulk_db.batches] == [500, 1]
+        assert data[0]['post']['likesCount'] == 0
+        assert bulk_db.batches[0].create.call_args[0][1]['likes_count'] == 0
+    
+    def test_bulk_create_failed_batch(self, bulk_db):
+        """Test that a failed commit is reported for every post in its batch."""
+        def failing_batch():
+            write_batch = Mock()
+            write_batch.commit = AsyncMock(side_effect=RuntimeError("unavailable"))
+            return write_batch
+        bulk_db.batch.side_effect = failing_batch
+        
+        response = client.post("/posts/bulk", json={'posts': [{'author': {'id': 'a1', 'name': 'A'}, 'content': 'Hi'}]})
+        
+        assert response.status_code == 200
+        assert response.json()[0]['status'] == 'failed'
+        assert 'unavailable' in response.json()[0]['error']
+    
+    def test_bulk_size_limits(self, bulk_db):
+        """Test that empty and oversized bulk requests are rejected."""
+        assert client.post("/posts/bulk", json={'posts': []}).status_code == 400
+        
+        ids = [f'post{i}' for i in range(1001)]
+        response = client.request("DELETE", "/posts/bulk", json={'ids': ids})
+        
+        assert response.status_code == 400
+        bulk_db.get_all.assert_not_called()
+    
+    def test_bulk_delete(self, bulk_db):
+        """Test that existing posts are read once and deleted in one batch, after their shards and likes."""
+        bulk_db.posts = {'post1', 'post2'}
+        bulk_db.subcollections = {'post1': {'counter_shards': ['0']}, 'post2': {'likes': ['uid1']}}
+        
+        response = client.request("DELETE", "/posts/bulk", json={'ids': ['post1', 'missing', 'post2', 'a/b', 'post1']})
+        
+        assert response.status_code == 200
+        assert [(item['id'], item['status']) for item in response.json()] == [
+            ('post1', 'deleted'), ('missing', 'not_found'), ('post2', 'deleted'), ('a/b', 'invalid')
+        ]
+        bulk_db.get_all.assert_called_once()
+        assert len(bulk_db.batches) == 2
+        assert [call[0][0].path for call in bulk_db.batches[0].delete.call_args_list] == [
+            'posts/post1/counter_shards/0', 'posts/post2/likes/uid1'
+        ]
+        assert [call[0][0].id for call in bulk_db.batches[1].delete.call_args_list] == ['post1', 'post2']
+    
+    def test_bulk_delete_is_not_a_post_id(self, bulk_db):
+        """Test that DELETE /posts/bulk is not routed to the single delete."""
+        response = client.request("DELETE", "/posts/bulk", json={'ids': ['post1']})
+        
+        assert response.status_code == 200
+        assert response.json() == [{'id': 'post1', 'status': 'not_found', 'post': None, 'error': None}]
+
+
+class TestCursor:
+    """Test cases for pagination cursors."""
+    
+    def test_round_trip(self):
+        created_at = datetime(2024, 5, 6, 7, 8, 9, 123456, tzinfo=timezone.utc)
+        
+        assert decode_cursor(encode_cursor(created_at, 'post1')) == (created_at, 'post1')
+    
+    @pytest.mark.parametrize("cursor", ["", "!!!", "bnVsbA", encode_cursor(datetime.now(), "")])
+    def test_invalid(self, cursor):
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(cursor)
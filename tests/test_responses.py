@@ -0,0 +1,76 @@
+"""Tests for model JSON responses."""
+
+import json
+from datetime import datetime, timezone
+from typing import List
+
+import pytest
+from google.api_core.datetime_helpers import DatetimeWithNanoseconds
+from pydantic import TypeAdapter
+
+from src.coworkly_partner_api.models.post import CommunityPost
+from src.coworkly_partner_api.utils import responses
+from src.coworkly_partner_api.utils.responses import ModelJSONResponse, dumps
+
+
+def make_post(post_id: str, **kwargs) -> CommunityPost:
+    return CommunityPost(
+        id=post_id,
+        author={'id': 'a1', 'name': 'Ana'},
+        content='Hola ☕',
+        created_at=datetime(2024, 1, 1, 12, 30, tzinfo=timezone.utc),
+        **kwargs
+    )
+
+
+class TestModelJSONResponse:
+    """Test cases for ModelJSONResponse."""
+    
+    def test_renders_model(self):
+        """Test that a model is rendered with field names and UTC as Z."""
+        response = ModelJSONResponse(make_post('p1', likes_count=3))
+        
+        data = json.loads(response.body)
+        assert data['id'] == 'p1'
+        assert data['likesCount'] == 3
+        assert data['createdAt'] == '2024-01-01T12:30:00Z'
+        assert response.headers['content-type'] == 'application/json'
+    
+    def test_renders_list_with_adapter(self):
+        """Test that a list of models is rendered by the given adapter."""
+        posts = [make_post('p1'), make_post('p2')]
+        adapter = TypeAdapter(List[CommunityPost])
+        
+        response = ModelJSONResponse(posts, headers={'X-Next-Cursor': 'abc'}, adapter=adapter)
+        
+        assert response.body == adapter.dump_json(posts)
+        assert [post['id'] for post in json.loads(response.body)] == ['p1', 'p2']
+        assert response.headers['X-Next-Cursor'] == 'abc'
+    
+    def test_renders_plain_data_with_models_and_timestamps(self):
+        """Test that plain data may hold models and Firestore timestamps."""
+        timestamp = DatetimeWithNanoseconds(2024, 1, 1, 12, 30, tzinfo=timezone.utc)
+        content = {'createdAt': timestamp, 'items': [{'id': 'p1', 'post': make_post('p1')}]}
+        
+        data = json.loads(ModelJSONResponse(content).body)
+        
+        assert data['createdAt'] == '2024-01-01T12:30:00Z'
+        assert data['items'][0]['post']['content'] == 'Hola ☕'
+        assert data['items'][0]['post']['createdAt'] == '2024-01-01T12:30:00Z'
+    
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_dumps_with_and_without_orjson(self, monkeypatch, use_orjson):
+        """Test that the stdlib fallback produces the same JSON as orjson."""
+        if use_orjson and responses.orjson is None:
+            pytest.skip("orjson is not installed")
+        if not use_orjson:
+            monkeypatch.setattr(responses, 'orjson', None)
+        
+        body = dumps({'post': make_post('p1'), 'at': datetime(2024, 1, 1, tzinfo=timezone.utc), 'n': None})
+        
+        assert json.loads(body) == {
+            'post': json.loads(make_post('p1').model_dump_json()),
+            'at': '2024-01-01T00:00:00Z',
+            'n': None,
+        }
+        assert '☕'.encode() in body
@@ -0,0 +1,80 @@
+"""Tests for space claims."""
+
+import pytest
+from unittest.mock import Mock, AsyncMock
+from google.api_core.exceptions import AlreadyExists
+
+from src.coworkly_partner_api.services.space_claims import (
+    backfill_space_claims,
+    claim_space_for_profile,
+    ProfileAlreadyExistsError,
+    SpaceAlreadyClaimedError,
+)
+from tests.firestore_mocks import async_stream, mock_snapshot, mock_document, mock_async_db
+
+
+def claims_db(profiles, claimed=()):
+    """Mock the partner_profiles and space_claims collections."""
+    profiles_collection = Mock()
+    profiles_collection.select.return_value.stream.side_effect = lambda: async_stream(profiles)
+    
+    claims = Mock()
+    claims.created = []
+    
+    def document(space_id):
+        claim_ref = Mock(id=space_id)
+        
+        async def create(data):
+            if space_id in claimed or space_id in claims.created:
+                raise AlreadyExists("claim exists")
+            claims.created.append(space_id)
+        
+        claim_ref.create = AsyncMock(side_effect=create)
+        return claim_ref
+    
+    claims.document.side_effect = document
+    return mock_async_db({'partner_profiles': profiles_collection, 'space_claims': claims}), claims
+
+
+class TestSpaceClaims:
+    """Test cases for claiming spaces."""
+    
+    @pytest.mark.asyncio
+    async def test_claim_conflict(self):
+        """Test that a failed claim precondition is reported as already claimed."""
+        db, _ = claims_db([])
+        db.collection('partner_profiles').document.return_value = mock_document(mock_snapshot('uid1', exists=False))
+        db.batch.return_value.commit = AsyncMock(side_effect=AlreadyExists("claim exists"))
+        
+        with pytest.raises(SpaceAlreadyClaimedError):
+            await claim_space_for_profile(db, 'uid1', 'space1', {'spaceIds': ['space1']})
+    
+    @pytest.mark.asyncio
+    async def test_claim_by_user_with_profile(self):
+        """Test that an existing profile is not replaced when its user claims another space."""
+        db, _ = claims_db([])
+        profile_ref = mock_document(mock_snapshot('uid1', {'spaceIds': ['spaceA']}))
+        db.collection('partner_profiles').document.return_value = profile_ref
+        db.batch.return_value.commit = AsyncMock(side_effect=AlreadyExists("profile exists"))
+        
+        with pytest.raises(ProfileAlreadyExistsError):
+            await claim_space_for_profile(db, 'uid1', 'spaceB', {'spaceIds': ['spaceB']})
+        
+        batch = db.batch.return_value
+        batch.set.assert_not_called()
+        assert batch.create.call_args_list[1][0][0] is profile_ref
+    
+    @pytest.mark.asyncio
+    async def test_backfill_creates_missing_claims(self):
+        """Test that every space of every profile ends up claimed once."""
+        profiles = [
+            mock_snapshot('uid1', {'spaceIds': ['space1', 'space2']}),
+            mock_snapshot('uid2', {'spaceIds': 'space3'}),
+            mock_snapshot('uid3', {}),
+        ]
+        db, claims = claims_db(profiles, claimed={'space2'})
+        
+        summary = await backfill_space_claims(db)
+        
+        assert summary == {"profiles": 3, "created": 2, "existing": 1}
+        assert claims.created == ['space1', 'space3']
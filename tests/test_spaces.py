@@ -0,0 +1,163 @@
+"""Tests for spaces API."""
+
+import pytest
+from unittest.mock import Mock, patch
+from fastapi.testclient import TestClient
+
+from src.coworkly_partner_api.app import app
+from src.coworkly_partner_api.models.partner_profile import PartnerContext
+from src.coworkly_partner_api.services.auth import get_partner_context
+from tests.firestore_mocks import async_stream, mock_snapshot, mock_document
+
+client = TestClient(app)
+
+DAY = {'open': '09:00', 'close': '17:00'}
+
+SPACE_DATA = {
+    'name': 'Space',
+    'geolocation': {'lat': 0, 'lng': 0},
+    'full_address': '1 Main St',
+    'type': 'coworking',
+    'details': {
+        'contact': {'phone': '123'},
+        'business_hours': {day: DAY for day in (
+            'monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday'
+        )},
+    },
+}
+
+
+def partner_context_override(space_ids):
+    async def mock_partner_context(authorization: str = None):
+        return PartnerContext(uid="test_uid", status="active", spaceIds=space_ids)
+    return mock_partner_context
+
+
+@pytest.fixture(autouse=True)
+def override_auth_dependency():
+    app.dependency_overrides[get_partner_context] = partner_context_override(["space1", "space2"])
+    yield
+    app.dependency_overrides.pop(get_partner_context, None)
+
+
+@pytest.fixture
+def spaces_db():
+    """Mock an AsyncClient whose get_all serves the given space documents."""
+    with patch('src.coworkly_partner_api.api.spaces.get_async_firestore_client') as mock_get_firestore:
+        db = Mock()
+        db.collection.return_value.document.side_effect = lambda space_id: Mock(id=space_id)
+        db.spaces = {}
+        
+        def get_all(references, field_paths=None):
+            # Return documents in reverse order, as get_all does not keep it
+            return async_stream([
+                mock_snapshot(ref.id, db.spaces.get(ref.id), exists=ref.id in db.spaces)
+                for ref in reversed(references)
+            ])
+        
+        db.get_all = Mock(side_effect=get_all)
+        mock_get_firestore.return_value = db
+        yield db
+
+
+class TestSpacesAPI:
+    """Test cases for spaces API endpoints."""
+    
+    def test_get_spaces_in_one_call(self, spaces_db):
+        """Test that every ID is loaded with a single get_all, in request order."""
+        spaces_db.spaces = {'space1': SPACE_DATA, 'space2': dict(SPACE_DATA, name='Other')}
+        
+        response = client.get("/spaces/?ids=space1,missing,space2,space1")
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert [(item['id'], item['status']) for item in data] == [
+            ('space1', 'found'), ('missing', 'not_found'), ('space2', 'found')
+        ]
+        assert data[0]['space']['fullAddress'] == '1 Main St'
+        assert data[2]['space']['name'] == 'Other'
+        assert data[1]['space'] is None
+        spaces_db.get_all.assert_called_once()
+        assert len(spaces_db.get_all.call_args[0][0]) == 3
+    
+    def test_get_spaces_reports_invalid_items(self, spaces_db):
+        """Test that invalid IDs and documents are reported per item."""
+        spaces_db.spaces = {'space1': SPACE_DATA, 'broken': {'name': 'No details'}}
+        
+        response = client.get("/spaces/?ids=space1,broken,a/b")
+        
+        assert response.status_code == 200
+        assert [(item['id'], item['status']) for item in response.json()] == [
+            ('space1', 'found'), ('broken', 'invalid'), ('a/b', 'invalid')
+        ]
+    
+    def test_get_spaces_limits(self, spaces_db):
+        """Test that empty and oversized ID lists are rejected."""
+        assert client.get("/spaces/?ids=,").status_code == 400
+        
+        ids = ",".join(f"space{i}" for i in range(101))
+        assert client.get(f"/spaces/?ids={ids}").status_code == 400
+        spaces_db.get_all.assert_not_called()
+    
+    def test_get_my_spaces(self, spaces_db):
+        """Test that the profile's spaces are fetched with one get_all."""
+        spaces_db.spaces = {'space1': SPACE_DATA}
+        
+        response = client.get("/spaces/mine")
+        
+        assert response.status_code == 200
+        assert [(item['id'], item['status']) for item in response.json()] == [
+            ('space1', 'found'), ('space2', 'not_found')
+        ]
+        spaces_db.get_all.assert_called_once()
+    
+    def test_get_my_spaces_without_spaces(self, spaces_db):
+        """Test that a profile without spaces skips Firestore."""
+        app.dependency_overrides[get_partner_context] = partner_context_override([])
+        
+        response = client.get("/spaces/mine")
+        
+        assert response.status_code == 200
+        assert response.json() == []
+        spaces_db.get_all.assert_not_called()
+    
+    def test_get_space(self, spaces_db):
+        """Test that single space fetches still work next to the batch routes."""
+        spaces_db.collection.return_value.document.side_effect = None
+        spaces_db.collection.return_value.document.return_value = mock_document(
+            mock_snapshot('space1', SPACE_DATA)
+        )
+        
+        response = client.get("/spaces/space1")
+        
+        assert response.status_code == 200
+        assert response.json()['id'] == 'space1'
+    
+    def test_get_space_fields(self, spaces_db):
+        """Test that a fieldset is pushed down to Firestore and trims the response."""
+        space_ref = mock_document(mock_snapshot('space1', {'name': 'Space', 'status': 'active'}))
+        spaces_db.collection.return_value.document.side_effect = None
+        spaces_db.collection.return_value.document.return_value = space_ref
+        
+        response = client.get("/spaces/space1?fields=name,status")
+        
+        assert response.status_code == 200
+        assert response.json() == {'id': 'space1', 'name': 'Space', 'status': 'active'}
+        space_ref.get.assert_awaited_once_with(field_paths=['name', 'status'])
+    
+    def test_get_space_unknown_field(self, spaces_db):
+        """Test that unknown fields are rejected before reading Firestore."""
+        response = client.get("/spaces/space1?fields=name,secret")
+        
+        assert response.status_code == 400
+        assert 'secret' in response.json()['detail']
+    
+    def test_get_spaces_fields(self, spaces_db):
+        """Test that batch fetches apply the fieldset to every space."""
+        spaces_db.spaces = {'space1': {'name': 'Space'}}
+        
+        response = client.get("/spaces/?ids=space1,missing&fields=name")
+        
+        assert response.status_code == 200
+        assert [item['space'] for item in response.json()] == [{'id': 'space1', 'name': 'Space'}, None]
+        assert spaces_db.get_all.call_args[1]['field_paths'] == ['name']
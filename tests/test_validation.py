@@ -0,0 +1,93 @@
+"""Tests for model validation modes."""
+
+import logging
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import pytest
+from pydantic import ValidationError
+
+from src.coworkly_partner_api.models.partner_profile import PartnerProfile
+from src.coworkly_partner_api.models.space import Space
+from src.coworkly_partner_api.utils.config import settings
+from src.coworkly_partner_api.utils.validation import changed_fields, load_model
+from tests.test_spaces import SPACE_DATA
+
+
+@pytest.fixture
+def validation_mode():
+    """Set MODEL_VALIDATION_MODE, sampling every read."""
+    with patch.object(settings, 'MODEL_VALIDATION_MODE', 'strict'), \
+         patch.object(settings, 'MODEL_VALIDATION_SAMPLE_RATE', 1):
+        def set_mode(mode):
+            settings.MODEL_VALIDATION_MODE = mode
+        yield set_mode
+
+
+def space_with_null_link():
+    data = dict(SPACE_DATA, id='space1')
+    data['details'] = dict(SPACE_DATA['details'], contact={'phone': '123', 'facebook': None})
+    return data
+
+
+class TestLoadModel:
+    """Test cases for MODEL_VALIDATION_MODE."""
+    
+    @pytest.mark.parametrize("mode", ["strict", "sampled"])
+    def test_validates_in_every_mode(self, validation_mode, mode):
+        """Test that invalid documents are rejected whatever the mode."""
+        validation_mode(mode)
+        
+        with pytest.raises(ValidationError):
+            load_model(PartnerProfile, {'id': 'uid1', 'email': 'e@example.com', 'space_ids': 'space1'})
+        space = load_model(Space, space_with_null_link())
+        assert space.details.contact.facebook == ""
+    
+    def test_strict_does_not_log(self, validation_mode, caplog):
+        """Test that strict mode does not compare documents."""
+        validation_mode("strict")
+        
+        with caplog.at_level(logging.WARNING):
+            load_model(Space, space_with_null_link())
+        
+        assert caplog.text == ""
+    
+    def test_sampled_logs_changed_documents(self, validation_mode, caplog):
+        """Test that a sampled document changed by validation is logged."""
+        validation_mode("sampled")
+        
+        with caplog.at_level(logging.WARNING):
+            load_model(Space, space_with_null_link())
+        
+        assert "Space space1 is changed by validation in details.contact.facebook" in caplog.text
+    
+    def test_sampled_skips_unsampled_reads(self, validation_mode, caplog):
+        """Test that reads outside the sample are not compared."""
+        validation_mode("sampled")
+        
+        with patch('src.coworkly_partner_api.utils.validation.random.randrange', return_value=1), \
+             caplog.at_level(logging.WARNING):
+            load_model(Space, space_with_null_link())
+        
+        assert caplog.text == ""
+
+
+class TestChangedFields:
+    """Test cases for comparing validated and stored documents."""
+    
+    def test_unchanged_document(self):
+        """Test that aliases, defaults and timestamps are not reported as changes."""
+        data = {
+            'id': 'uid1',
+            'email': 'e@example.com',
+            'space_ids': ['space1'],
+            'created_at': datetime(2024, 1, 1, tzinfo=timezone.utc),
+        }
+        
+        assert changed_fields(PartnerProfile.model_validate(data), data) == []
+    
+    def test_coerced_values(self):
+        """Test that coerced values are reported by path."""
+        data = dict(SPACE_DATA, id='space1', rating='4.5')
+        
+        assert changed_fields(Space.model_validate(data), data) == ['rating']